@@ -1,6 +1,6 @@
 from flask import Flask
 from config import config
-from app.extensions import db, migrate, login_manager
+from app.extensions import db, migrate, login_manager, report_cache, timetable_cache, course_cache, dashboard_cache, pubsub
 
 def create_app(config_name='default'):
     app = Flask(__name__)
@@ -9,14 +9,53 @@ def create_app(config_name='default'):
     db.init_app(app)
     migrate.init_app(app, db)
     login_manager.init_app(app)
+    report_cache.init_app(app)
+    timetable_cache.init_app(app)
+    course_cache.init_app(app)
+    dashboard_cache.init_app(app)
+    pubsub.init_app(app)
 
-    # Register Filters
-    import base64
-    @app.template_filter('b64encode')
-    def b64encode_filter(data):
-        if not data:
-            return ''
-        return base64.b64encode(data).decode('utf-8')
+    # Keep materialized academic summaries in sync with result writes
+    from app.services.summaries import register_summary_hooks
+    register_summary_hooks()
+
+    # Subject-wise attendance counters follow attendance writes
+    from app.services.attendance_counters import register_attendance_counter_hooks
+    register_attendance_counter_hooks()
+
+    # Stored media digests (ETags) are dropped when the bytes change
+    from app.services.media import register_media_hooks, Image
+    register_media_hooks()
+    if Image is None:
+        app.logger.warning("Pillow is not installed: media thumbnails are disabled, pages link full-size images")
+
+    # Report responses are only valid until marks or attendance change
+    from app.models import Attendance, StudentResult
+    report_cache.watch(Attendance, StudentResult)
+
+    # Cached timetable grids follow schedule, subject, course and faculty edits
+    from app.models import Timetable, ScheduleSettings, Subject, Course, FacultyProfile
+    timetable_cache.watch(Timetable, ScheduleSettings, Subject, Course, FacultyProfile)
+
+    # Course aliases: reloaded after course writes, applied to course fields on flush
+    from app.services.courses import register_course_hooks
+    course_cache.watch(Course)
+    register_course_hooks()
+
+    # Dashboard widgets follow attendance, notices, events, fees, results and profile edits
+    from app.models import Notice, UniversityEvent, FeeRecord, StudentAcademicSummary, ExamEvent, StudentProfile
+    dashboard_cache.watch(Attendance, Notice, UniversityEvent, FeeRecord, StudentResult,
+                          StudentAcademicSummary, ExamEvent, StudentProfile)
+
+    # Committed chat messages and status changes are pushed to open chats
+    from app.services.messages import register_message_hooks
+    register_message_hooks()
+
+    # Template Helpers
+    from app.services.media import media_url
+    from app.services.messages import event_stream_enabled
+    app.add_template_global(media_url)
+    app.add_template_global(event_stream_enabled)
 
     # Register Blueprints
     from app.modules.main import main_bp
@@ -34,4 +73,7 @@ def create_app(config_name='default'):
     from app.modules.student import student_bp
     app.register_blueprint(student_bp, url_prefix='/student')
 
+    from app.modules.media import media_bp
+    app.register_blueprint(media_bp, url_prefix='/media')
+
     return app
@@ -1,8 +1,25 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from flask_login import LoginManager
+from app.services.cache import ResponseCache
+from app.services.pubsub import PubSub
 
 db = SQLAlchemy()
 migrate = Migrate()
 login_manager = LoginManager()
 login_manager.login_view = 'auth.login'
+
+# JSON report endpoints, invalidated on Attendance / StudentResult writes
+report_cache = ResponseCache('REPORT_CACHE')
+
+# Resolved cohort timetables, invalidated on Timetable / ScheduleSettings / Subject / Course / FacultyProfile writes
+timetable_cache = ResponseCache('TIMETABLE_CACHE')
+
+# Course name / code aliases, invalidated on Course writes
+course_cache = ResponseCache('COURSE_CACHE')
+
+# Student dashboard widgets, invalidated on writes to the data they show
+dashboard_cache = ResponseCache('DASHBOARD_CACHE')
+
+# Live page updates (query chat events)
+pubsub = PubSub()
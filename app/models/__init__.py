@@ -1,7 +1,9 @@
 from .user import User
 from .profiles import StudentProfile, FacultyProfile
 from .notice import Notice
-from .academics import Course, Exam, Attendance, Subject, Timetable, ScheduleSettings, ExamEvent, ExamPaper, StudentResult, Syllabus
+from .academics import Course, Exam, Attendance, Subject, Timetable, ScheduleSettings, ExamEvent, ExamPaper, StudentResult, Syllabus, StudentAcademicSummary, AttendanceCounter
 from .event import UniversityEvent, EventRegistration
 from .finance import FeeRecord
 from .support import StudentQuery, QueryMessage
+from .media import MediaDigest, MediaThumbnail
+from .jobs import ImportJob
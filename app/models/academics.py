@@ -1,6 +1,9 @@
-from datetime import date, datetime, timezone
+from datetime import date, datetime, time, timezone
+from functools import lru_cache
 from app.extensions import db
 
+MINUTES_PER_DAY = 24 * 60
+
 class Course(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), unique=True, nullable=False) # e.g. Bachelor of Technology
@@ -33,6 +36,14 @@ class Attendance(db.Model):
     subject_id = db.Column(db.Integer, db.ForeignKey('subject.id'), nullable=True) # Added Subject Link
     faculty_id = db.Column(db.Integer, db.ForeignKey('faculty_profile.id'), nullable=True) # Added Faculty Link
 
+    # One mark per student per lecture; the bulk writer upserts against it.
+    # A unique index (not a table constraint) so create-indexes can add it to existing databases.
+    # (subject_id, date) serves the marking sheet and the lecture ledger
+    __table_args__ = (
+        db.Index('uq_attendance_student_subject_date', 'student_id', 'subject_id', 'date', unique=True),
+        db.Index('ix_attendance_subject_date', 'subject_id', 'date'),
+    )
+
     # Relationship
     student = db.relationship('StudentProfile', backref=db.backref('attendance_records', lazy=True, cascade="all, delete-orphan"))
     subject = db.relationship('Subject', backref=db.backref('attendance_records', lazy=True))
@@ -55,6 +66,7 @@ class Subject(db.Model):
     
     # Relationship
     faculty = db.relationship('FacultyProfile', backref=db.backref('subjects_taught', lazy=True))
+    __table_args__ = (db.Index('ix_subject_course_semester', 'course_name', 'semester'),)
 
     def __repr__(self):
         return f'<Subject {self.name}>'
@@ -63,7 +75,7 @@ class Syllabus(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     subject_id = db.Column(db.Integer, db.ForeignKey('subject.id'), nullable=False)
     filename = db.Column(db.String(255), nullable=False)
-    file_data = db.Column(db.LargeBinary, nullable=False) # Storing PDF as BLOB
+    file_data = db.deferred(db.Column(db.LargeBinary, nullable=False)) # Storing PDF as BLOB (loaded on access only)
     upload_date = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
     
     subject = db.relationship('Subject', backref=db.backref('syllabus', uselist=False, cascade="all, delete-orphan"))
@@ -86,6 +98,7 @@ class Timetable(db.Model):
     # Relationship
     subject = db.relationship('Subject', backref=db.backref('timetable_slots', lazy=True, cascade="all, delete-orphan"))
     faculty = db.relationship('FacultyProfile', backref=db.backref('timetable_slots', lazy=True, cascade="all, delete-orphan"))
+    __table_args__ = (db.Index('ix_timetable_course_semester', 'course_name', 'semester'),)
 
     def __repr__(self):
         return f'<Timetable {self.course_name} {self.day_of_week} P{self.period_number}>'
@@ -102,43 +115,85 @@ class ScheduleSettings(db.Model):
     # Recess Settings
     recess_duration = db.Column(db.Integer, default=0) # in minutes
     recess_after_slot = db.Column(db.Integer, default=0) # e.g. after slot 3
+    __table_args__ = (db.Index('ix_schedule_settings_course_semester', 'course_name', 'semester'),)
     
+    def period_layout(self):
+        """(start minute, slot duration, recess duration, recess after slot) of the day."""
+        return period_layout(self.start_time, self.end_time, self.slots_per_day,
+                             self.recess_duration, self.recess_after_slot)
+
+    @property
+    def period_table(self):
+        """((start_time, end_time), ...) of periods 1..slots_per_day, shared by equal settings."""
+        return period_table(self.start_time, self.end_time, self.slots_per_day,
+                            self.recess_duration, self.recess_after_slot)
+
     def get_period_times(self, period_number):
         """Returns (start_time, end_time) as datetime.time objects for a 1-based period number."""
-        from datetime import datetime, timedelta, date
-        
-        # 1. Total available minutes for teaching
-        start_min = self.start_time.hour * 60 + self.start_time.minute
-        end_min = self.end_time.hour * 60 + self.end_time.minute
-        
-        recess_dur = self.recess_duration or 0
-        recess_after = self.recess_after_slot or (self.slots_per_day // 2)
-        
-        total_minutes = (end_min - start_min) - recess_dur
-        if total_minutes <= 0:
-            # Fallback if settings are invalid
-            total_minutes = self.slots_per_day * 60
-            
-        slot_duration = total_minutes // self.slots_per_day
-        
-        # 2. Calculate offset
-        # period_number is 1-based. offset = (period_number - 1)
-        p_idx = period_number - 1
-        current_start_min = start_min + (p_idx * slot_duration)
-        
-        # Add recess if we are after the break
-        if recess_after > 0 and p_idx >= recess_after:
-            current_start_min += recess_dur
-            
-        # 3. Create datetime objects to handle math easily
-        base_date = date.today()
-        start_dt = datetime.combine(base_date, datetime.min.time()) + timedelta(minutes=current_start_min)
-        end_dt = start_dt + timedelta(minutes=slot_duration)
-        
-        return start_dt.time(), end_dt.time()
+        table = self.period_table
+        if 1 <= period_number <= len(table):
+            return table[period_number - 1]
+        # Periods past the configured day (extra slots added in the editor)
+        return period_times(self.period_layout(), period_number)
+
+    def get_period_times_batch(self, period_numbers):
+        """get_period_times() for many period numbers at once, as a list of (start, end)."""
+        table = self.period_table
+        layout = None
+        times = []
+        for period_number in period_numbers:
+            if 1 <= period_number <= len(table):
+                times.append(table[period_number - 1])
+            else:
+                layout = layout or self.period_layout()
+                times.append(period_times(layout, period_number))
+        return times
     
     # Composite unique constraint could be useful but we'll handle in logic
 
+def period_layout(start_time, end_time, slots_per_day, recess_duration, recess_after_slot):
+    """(start minute, slot duration, recess duration, recess after slot) of a schedule."""
+    # 1. Total available minutes for teaching
+    start_min = start_time.hour * 60 + start_time.minute
+    end_min = end_time.hour * 60 + end_time.minute
+    
+    recess_dur = recess_duration or 0
+    recess_after = recess_after_slot or (slots_per_day // 2)
+    
+    total_minutes = (end_min - start_min) - recess_dur
+    if total_minutes <= 0:
+        # Fallback if settings are invalid
+        total_minutes = slots_per_day * 60
+        
+    return start_min, total_minutes // slots_per_day, recess_dur, recess_after
+
+def period_times(layout, period_number):
+    """(start, end) of a 1-based period from a ScheduleSettings.period_layout()."""
+    start_min, slot_duration, recess_dur, recess_after = layout
+    
+    # 2. Calculate offset
+    # period_number is 1-based. offset = (period_number - 1)
+    p_idx = period_number - 1
+    current_start_min = start_min + (p_idx * slot_duration)
+    
+    # Add recess if we are after the break
+    if recess_after > 0 and p_idx >= recess_after:
+        current_start_min += recess_dur
+        
+    # 3. Wrap around midnight like datetime arithmetic would
+    start = current_start_min % MINUTES_PER_DAY
+    end = (current_start_min + slot_duration) % MINUTES_PER_DAY
+    return time(start // 60, start % 60), time(end // 60, end % 60)
+
+@lru_cache(maxsize=256)
+def period_table(start_time, end_time, slots_per_day, recess_duration, recess_after_slot):
+    """
+    The day's (start, end) period times, worked out once per distinct
+    schedule: changed settings hash to a new entry.
+    """
+    layout = period_layout(start_time, end_time, slots_per_day, recess_duration, recess_after_slot)
+    return tuple(period_times(layout, p) for p in range(1, slots_per_day + 1))
+
 class ExamEvent(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False) # e.g. "End Semester Exam 2024"
@@ -151,6 +206,7 @@ class ExamEvent(db.Model):
     
     # Relationships
     papers = db.relationship('ExamPaper', backref='exam_event', lazy=True, cascade="all, delete-orphan")
+    __table_args__ = (db.Index('ix_exam_event_course_semester', 'course_name', 'semester'),)
 
     def __repr__(self):
         return f'<ExamEvent {self.name}>'
@@ -178,6 +234,9 @@ class StudentResult(db.Model):
     marks_obtained = db.Column(db.Float, nullable=True) # Check for None if Absent
     status = db.Column(db.String(20), default='Present') # Present, Absent, Explelled
     is_fail = db.Column(db.Boolean, default=False)
+
+    # One result per student per paper; marks entry upserts against it (an index so create-indexes can add it)
+    __table_args__ = (db.Index('uq_student_result_paper_student', 'exam_paper_id', 'student_id', unique=True),)
     
     # Relationships
     paper = db.relationship('ExamPaper', backref=db.backref('results', lazy=True, cascade="all, delete-orphan"))
@@ -185,3 +244,63 @@ class StudentResult(db.Model):
 
     def __repr__(self):
         return f'<Result {self.student.enrollment_number} - {self.marks_obtained}>'
+
+class StudentAcademicSummary(db.Model):
+    # Materialized per-student aggregates of StudentResult.
+    # One row per (student, exam event) plus an overall row with exam_event_id = NULL.
+    # Maintained by app.services.summaries; rebuild with `python manage.py rebuild-summaries`.
+    id = db.Column(db.Integer, primary_key=True)
+    student_id = db.Column(db.Integer, db.ForeignKey('student_profile.id'), nullable=False, index=True)
+    exam_event_id = db.Column(db.Integer, db.ForeignKey('exam_event.id'), nullable=True)
+    
+    result_count = db.Column(db.Integer, default=0) # All results (drive credits)
+    marks_count = db.Column(db.Integer, default=0) # Results with a recorded mark
+    marks_sum = db.Column(db.Float, default=0.0)
+    marks_sq_sum = db.Column(db.Float, default=0.0) # For stdev without raw rows
+    total_credits = db.Column(db.Integer, default=0)
+    total_points = db.Column(db.Integer, default=0) # Sum of grade points * credits
+    
+    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+    
+    __table_args__ = (db.UniqueConstraint('student_id', 'exam_event_id', name='uq_summary_student_event'),)
+    
+    # Relationships
+    student = db.relationship('StudentProfile', backref=db.backref('academic_summaries', lazy=True, cascade="all, delete-orphan"))
+    exam_event = db.relationship('ExamEvent', backref=db.backref('academic_summaries', lazy=True, cascade="all, delete-orphan"))
+
+    @property
+    def average(self):
+        return (self.marks_sum / self.marks_count) if self.marks_count else 0
+
+    @property
+    def spi(self):
+        return round(self.total_points / self.total_credits, 2) if self.total_credits else 0.0
+
+    def __repr__(self):
+        return f'<AcademicSummary Stud:{self.student_id} Event:{self.exam_event_id or "overall"}>'
+
+class AttendanceCounter(db.Model):
+    # Materialized per-student attendance counts behind the student attendance page.
+    # Rows with a subject_id count lectures marked against that subject (weekday = NULL);
+    # legacy day-based rows without a subject are counted per weekday (subject_id = NULL,
+    # 0 = Monday) and expanded over the timetable when read.
+    # Maintained by app.services.attendance_counters; rebuild with `python manage.py rebuild-attendance-counters`.
+    id = db.Column(db.Integer, primary_key=True)
+    student_id = db.Column(db.Integer, db.ForeignKey('student_profile.id'), nullable=False, index=True)
+    subject_id = db.Column(db.Integer, db.ForeignKey('subject.id'), nullable=True)
+    weekday = db.Column(db.Integer, nullable=True)
+
+    present = db.Column(db.Integer, default=0)
+    total = db.Column(db.Integer, default=0)
+
+    # ix_attendance_counter_subject covers the per-subject below-threshold query (low_attendance)
+    __table_args__ = (
+        db.UniqueConstraint('student_id', 'subject_id', 'weekday', name='uq_attendance_counter'),
+        db.Index('ix_attendance_counter_subject', 'subject_id', 'present', 'total'),
+    )
+
+    # Relationships
+    student = db.relationship('StudentProfile', backref=db.backref('attendance_counters', lazy=True, cascade="all, delete-orphan"))
+
+    def __repr__(self):
+        return f'<AttendanceCounter Stud:{self.student_id} Sub:{self.subject_id} Day:{self.weekday}>'
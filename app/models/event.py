@@ -10,7 +10,8 @@ class UniversityEvent(db.Model):
     location = db.Column(db.String(100), nullable=True)
     organizer = db.Column(db.String(100), default="University Admin")
     category = db.Column(db.String(50), default="General") # Academic, Cultural, Sports, Tech
-    image_data = db.Column(db.LargeBinary, nullable=True)
+    image_data = db.deferred(db.Column(db.LargeBinary, nullable=True)) # Loaded on access only
+    has_image = db.column_property(image_data.expression.isnot(None))
     image_mimetype = db.Column(db.String(50), nullable=True) # e.g. 'image/png'
     is_upcoming = db.Column(db.Boolean, default=True)
     
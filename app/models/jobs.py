@@ -0,0 +1,23 @@
+from datetime import datetime, timezone
+from app.extensions import db
+
+class ImportJob(db.Model):
+    # Progress of a background CSV import (app.services.student_import).
+    # Kept in the database so every app process sees it and it outlives restarts;
+    # `updated_at` is the worker's heartbeat, a queued / running job that stops
+    # beating is reported as failed.
+    id = db.Column(db.String(32), primary_key=True) # uuid4 hex
+    filename = db.Column(db.String(255), nullable=True)
+    status = db.Column(db.String(20), nullable=False, default='queued') # queued, running, done, failed
+    rows = db.Column(db.Integer, default=0)
+    imported = db.Column(db.Integer, default=0)
+    skipped = db.Column(db.Integer, default=0)
+    error_count = db.Column(db.Integer, default=0)
+    errors = db.Column(db.JSON, default=list) # First MAX_REPORTED_ERRORS row errors
+    message = db.Column(db.Text, nullable=True)
+    started_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f'<ImportJob {self.id} {self.status}>'
@@ -0,0 +1,35 @@
+from datetime import datetime, timezone
+from app.extensions import db
+
+class MediaDigest(db.Model):
+    # Fingerprint of a BLOB column (syllabus PDF, event image, faculty photo, chat image).
+    # Computed lazily on first download by app.services.media and dropped whenever the
+    # underlying bytes change, so `updated_at` doubles as the content's Last-Modified.
+    id = db.Column(db.Integer, primary_key=True)
+    owner_type = db.Column(db.String(30), nullable=False) # e.g. 'syllabus', 'event_image'
+    owner_id = db.Column(db.Integer, nullable=False)
+    sha256 = db.Column(db.String(64), nullable=False, index=True)
+    size = db.Column(db.Integer, nullable=False) # Bytes
+    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+
+    __table_args__ = (db.UniqueConstraint('owner_type', 'owner_id', name='uq_media_digest_owner'),)
+
+    def __repr__(self):
+        return f'<MediaDigest {self.owner_type}:{self.owner_id} {self.sha256[:12]}>'
+
+class MediaThumbnail(db.Model):
+    # Downscaled copy of an image, generated once per (source content, bounding box).
+    # Keyed by the source sha256, so a changed image simply gets new thumbnails;
+    # orphans are removed with `python manage.py prune-thumbnails`.
+    id = db.Column(db.Integer, primary_key=True)
+    source_sha256 = db.Column(db.String(64), nullable=False)
+    size = db.Column(db.Integer, nullable=False) # Max width / height in px
+    mimetype = db.Column(db.String(50), nullable=False)
+    data = db.deferred(db.Column(db.LargeBinary, nullable=False))
+    byte_size = db.Column(db.Integer, nullable=False)
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+
+    __table_args__ = (db.UniqueConstraint('source_sha256', 'size', name='uq_media_thumbnail_source_size'),)
+
+    def __repr__(self):
+        return f'<MediaThumbnail {self.source_sha256[:12]} {self.size}px>'
@@ -21,6 +21,15 @@ class Notice(db.Model):
     
     created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
     
+    # Feed order (created_at, id) per audience, see app.services.notices
+    __table_args__ = (
+        db.Index('ix_notice_created', 'created_at', 'id'),
+        db.Index('ix_notice_target_created', 'target_type', 'created_at', 'id'),
+        db.Index('ix_notice_class_created', 'target_type', 'target_course', 'target_semester', 'created_at'),
+        db.Index('ix_notice_student_created', 'target_student_id', 'created_at'),
+        db.Index('ix_notice_sender_created', 'sender_faculty_id', 'created_at'),
+    )
+    
     # Relationships
     sender = db.relationship('FacultyProfile', foreign_keys=[sender_faculty_id], backref='sent_notices')
     target_student = db.relationship('StudentProfile', foreign_keys=[target_student_id], backref='received_notices')
@@ -1,3 +1,5 @@
+from flask import g
+from sqlalchemy import func, case
 from app.extensions import db
 
 class StudentProfile(db.Model):
@@ -24,16 +26,53 @@ class StudentProfile(db.Model):
 
     # Relationship with User
     user = db.relationship('User', backref=db.backref('student_profile', uselist=False, cascade="all, delete-orphan"))
+    __table_args__ = (db.Index('ix_student_profile_course_semester', 'course_name', 'semester'),)
 
     def __repr__(self):
         return f'<StudentProfile {self.enrollment_number}>'
 
     def get_overall_attendance(self):
+        return self.attendance_percentages([self.id])[self.id]
+
+    def cached_overall_attendance(self):
+        """get_overall_attendance() memoized for the rest of the request (see prime_attendance)."""
+        cache = g.setdefault('_attendance_pct', {})
+        if self.id not in cache:
+            cache.update(self.attendance_percentages([self.id]))
+        return cache[self.id]
+
+    @classmethod
+    def prime_attendance(cls, students):
+        """Fills the request memo for a whole list of students with one query."""
+        cache = g.setdefault('_attendance_pct', {})
+        missing = [s.id for s in students if s.id not in cache]
+        if missing:
+            cache.update(cls.attendance_percentages(missing))
+
+    @classmethod
+    def attendance_percentages(cls, student_ids):
+        """
+        Overall attendance % per student id, from one conditional-aggregate query.
+        Students without attendance rows get 0.
+        """
         # Local import to avoid circular dependency
         from app.models.academics import Attendance
-        total = Attendance.query.filter_by(student_id=self.id).count()
-        present = Attendance.query.filter_by(student_id=self.id, status='Present').count()
-        return round((present / total * 100), 1) if total > 0 else 0
+        student_ids = list(student_ids)
+        result = dict.fromkeys(student_ids, 0)
+        if not student_ids:
+            return result
+
+        rows = db.session.query(
+            Attendance.student_id,
+            func.sum(case((Attendance.status == 'Present', 1), else_=0)),
+            func.count(Attendance.id)
+        ).filter(Attendance.student_id.in_(student_ids))\
+         .group_by(Attendance.student_id).all()
+
+        for student_id, present, total in rows:
+            if total:
+                result[student_id] = round((present / total * 100), 1)
+        return result
 
 class FacultyProfile(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -44,7 +83,8 @@ class FacultyProfile(db.Model):
     experience = db.Column(db.Integer) # Years of experience
     specialization = db.Column(db.String(200)) # e.g., AI, ML
     assigned_subject = db.Column(db.String(100)) # e.g., Data Structures
-    photo_data = db.Column(db.LargeBinary) # Binary data for photo
+    photo_data = db.deferred(db.Column(db.LargeBinary)) # Binary data for photo (loaded on access only)
+    has_photo = db.column_property(photo_data.expression.isnot(None))
     photo_mimetype = db.Column(db.String(50)) # Mimetype e.g. 'image/jpeg'
     
     # Relationship with User
@@ -30,10 +30,14 @@ class QueryMessage(db.Model):
     content = db.Column(db.Text, nullable=True)
     
     # Image Support
-    image_data = db.Column(db.LargeBinary, nullable=True)
+    image_data = db.deferred(db.Column(db.LargeBinary, nullable=True)) # Loaded on access only
+    has_image = db.column_property(image_data.expression.isnot(None))
     image_mimetype = db.Column(db.String(50), nullable=True)
     
     timestamp = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
 
+    # Thread pages and polls seek on (query_id, id)
+    __table_args__ = (db.Index('ix_query_message_thread', 'query_id', 'id'),)
+
     def __repr__(self):
         return f'<Msg {self.id} from {self.sender_type}>'
@@ -1,10 +1,8 @@
-from app.extensions import db, login_manager
+from app.extensions import db
 from flask_login import UserMixin
 from werkzeug.security import generate_password_hash, check_password_hash
 
-@login_manager.user_loader
-def load_user(user_id):
-    return User.query.get(int(user_id))
+# The Flask-Login user loader lives in app/modules/auth/identity.py
 
 class User(UserMixin, db.Model):
     __tablename__ = 'users'
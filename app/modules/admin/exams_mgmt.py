@@ -2,6 +2,7 @@ from flask import Blueprint, render_template, request, flash, redirect, url_for,
 from flask_login import login_required
 from app.extensions import db
 from app.models import ExamEvent, ExamPaper, Subject, StudentProfile, StudentResult, Course
+from app.services.pagination import request_page, desc
 from datetime import datetime
 
 exams_bp = Blueprint('exams', __name__)
@@ -10,8 +11,8 @@ exams_bp = Blueprint('exams', __name__)
 @login_required
 def exams_dashboard():
     # List all exam events
-    events = ExamEvent.query.order_by(ExamEvent.start_date.desc()).all()
-    return render_template('exams/dashboard.html', events=events)
+    page = request_page(ExamEvent.query, [desc(ExamEvent.start_date), desc(ExamEvent.id)])
+    return render_template('exams/dashboard.html', events=page.items, page=page)
 
 @exams_bp.route('/exams/create', methods=['GET', 'POST'])
 @login_required
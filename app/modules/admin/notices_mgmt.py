@@ -2,13 +2,15 @@ from flask import render_template, request, flash, redirect, url_for
 from flask_login import login_required
 from app.extensions import db
 from app.models import Notice, FacultyProfile, StudentProfile
+from app.services.notices import NOTICE_ORDER
+from app.services.pagination import request_page
 from . import admin_bp
 
 @admin_bp.route('/notices')
 @login_required
 def notices_list():
-    notices = Notice.query.order_by(Notice.created_at.desc()).all()
-    return render_template('notices_list.html', notices=notices)
+    page = request_page(Notice.query, NOTICE_ORDER)
+    return render_template('notices_list.html', notices=page.items, page=page)
 
 @admin_bp.route('/notices/add', methods=['GET', 'POST'])
 @login_required
@@ -1,10 +1,13 @@
 from flask import Blueprint, render_template, jsonify
 from flask_login import login_required
-from app.extensions import db
-from app.models import StudentResult, Attendance, Subject, StudentProfile, ExamEvent, ExamPaper, FacultyProfile
-from sqlalchemy import func
+from app.extensions import db, report_cache
+from app.services.attendance_counters import students_below_threshold, ATTENDANCE_THRESHOLD
+from app.models import StudentResult, Attendance, Subject, StudentProfile, ExamEvent, ExamPaper, FacultyProfile, StudentAcademicSummary
+from app.services.analytics import (summary_mark_stats, summary_global_average, project_career, stats_from_sums,
+                                    student_mark_stats, global_mark_average, attendance_by_weekday,
+                                    subject_mark_stats)
+from sqlalchemy import func, case
 import statistics
-import random
 
 reports_bp = Blueprint('reports', __name__)
 
@@ -18,69 +21,40 @@ def dashboard():
     total_faculty = FacultyProfile.query.count()
     
     # 2. Daily Attendance (Real Data)
-    # Calculate global average attendance %
-    total_att_records = Attendance.query.count()
+    # Calculate global average attendance % (single conditional aggregate)
+    total_att_records, present_count = db.session.query(
+        func.count(Attendance.id),
+        func.sum(case((Attendance.status == 'Present', 1), else_=0))
+    ).one()
     if total_att_records > 0:
-        present_count = Attendance.query.filter_by(status='Present').count()
-        avg_att_global = round((present_count / total_att_records) * 100, 1)
+        avg_att_global = round(((present_count or 0) / total_att_records) * 100, 1)
     else:
         avg_att_global = 0
     
     # 3. Academic Health
-    # Get recent batch average
-    results = db.session.query(StudentResult.marks_obtained).all()
-    if results:
-        marks = [r.marks_obtained for r in results if r.marks_obtained is not None]
-        global_avg_score = round(statistics.mean(marks), 1) if marks else 0
-    else:
-        global_avg_score = 0
+    # Get recent batch average (rolled up from the materialized summaries)
+    global_avg = summary_global_average()
+    global_avg_score = round(global_avg, 1) if global_avg is not None else 0
         
-    # 4. Critical Alerts (Danger Zone)
-    # Count students with avg < 40
-    # In prod: Use SQL Group By + Having. Here: Python iteration (cached/optimized)
-    danger_zone_count = 0
-    all_students_ids = [s[0] for s in db.session.query(StudentProfile.id).all()]
-    
-    # Pre-fetch all marks
-    all_marks_rows = db.session.query(StudentResult.student_id, StudentResult.marks_obtained).all()
-    student_marks_map = {sid: [] for sid in all_students_ids}
-    for sid, mark in all_marks_rows:
-        if mark is not None and sid in student_marks_map:
-            student_marks_map[sid].append(mark)
-            
-    for sid, marks in student_marks_map.items():
-        if marks:
-            s_avg = statistics.mean(marks)
-            if s_avg < 40:
-                danger_zone_count += 1
+    # 4. Critical Alerts (Danger Zone) & 5. Top Performer / Max Package
+    # One row per student from the materialized summaries: count / mean / stdev
+    student_stats = summary_mark_stats()
+
+    danger_zone_count = len([s for s in student_stats if s.mean < 40])
     
-    # 5. Top Performer & Max Package
     top_student = "N/A"
     highest_avg = -1
     highest_pkg = 0
-    for sid, marks in student_marks_map.items():
-        if marks:
-            s_avg = statistics.mean(marks)
-            s_var = statistics.stdev(marks) if len(marks) > 1 else 0
-            
-            # Predict Package (Consistent with future_predictions logic)
-            if s_avg > 85:
-                base_pkg = 12.0 if s_var < 5 else 18.0
-            elif s_avg > 70:
-                base_pkg = 8.5
-            elif s_avg > 60:
-                base_pkg = 6.5
-            else:
-                base_pkg = 4.5
-            
-            potential_package = base_pkg + (s_var * 0.1)
-            
-            if potential_package > highest_pkg:
-                highest_pkg = potential_package
+    for s in student_stats:
+        # Predict Package (Consistent with future_predictions logic)
+        _, potential_package = project_career(s.mean, s.stdev)
+        
+        if potential_package > highest_pkg:
+            highest_pkg = potential_package
 
-            if s_avg > highest_avg:
-                highest_avg = s_avg
-                top_student = StudentProfile.query.get(sid).display_name
+        if s.mean > highest_avg:
+            highest_avg = s.mean
+            top_student = s.name
     
     projected_pkg = f"{round(highest_pkg, 1)} LPA" if highest_pkg > 0 else "N/A"
 
@@ -103,66 +77,57 @@ def student_performance_view():
 
 @reports_bp.route('/api/reports/student-performance', methods=['GET'])
 @login_required
+@report_cache.cached('student-performance')
 def student_performance_data():
     # 1. Academic DNA (Radar): Avg Marks per Subject (Sem 3)
     # 2. Consistency (Scatter): Avg vs StdDev
     # 3. Growth Velocity: Compare Sem 1 vs Sem 3 Avg
     
-    # Fetch all results
-    results = db.session.query(StudentResult).all()
-    # Group by Student -> Sem -> Marks
-    # This is heavy, in prod we'd use SQL aggregation.
-    
-    student_data = {} 
-    
-    # Pre-fetch Student Profiles for name/sem
-    students = {s.id: s for s in StudentProfile.query.all()}
-    
-    for r in results:
-        sid = r.student_id
-        if sid not in student_data: 
-            student_data[sid] = {'marks': [], 'sem_marks': {}, 'name': students.get(sid).display_name}
-        
-        if r.marks_obtained is not None:
-            student_data[sid]['marks'].append(r.marks_obtained)
-            # Infer sem from ExamEvent
-            # This is an N+1 issue technically but we need it. 
-            # Better optimization: Join ExamEvent in the initial query.
-            # But for now, let's use the Paper -> Event relationship if accessible or just map via subject logic?
-            # Actually, `r.exam_paper.exam_event.semester` works if relationships are set, but let's query safer.
-            pass
-    
-    # Re-query with explicit Join for Semester Analysis (Growth Velocity)
-    # Get average marks per student per semester
-    sem_avgs = db.session.query(
-        StudentResult.student_id, 
-        ExamEvent.semester, 
-        func.avg(StudentResult.marks_obtained)
-    ).select_from(StudentResult).join(ExamPaper).join(ExamEvent).group_by(StudentResult.student_id, ExamEvent.semester).all()
-    
-    # Populate semester data
-    for sid, sem, avg in sem_avgs:
-        if sid in student_data:
-            student_data[sid]['sem_marks'][sem] = avg
+    # Overall summaries: one materialized row per student with results, listed
+    # (as always) in the order of each student's first result
+    first_result = db.session.query(
+        StudentResult.student_id,
+        func.min(StudentResult.id).label('first_id')
+    ).group_by(StudentResult.student_id).subquery()
+    overall_rows = db.session.query(StudentAcademicSummary, StudentProfile.display_name)\
+        .join(StudentProfile, StudentAcademicSummary.student_id == StudentProfile.id)\
+        .join(first_result, first_result.c.student_id == StudentAcademicSummary.student_id)\
+        .filter(StudentAcademicSummary.exam_event_id.is_(None))\
+        .order_by(first_result.c.first_id).all()
+    
+    # Semester averages (Growth Velocity): roll up the per-event summaries
+    sem_totals = db.session.query(
+        StudentAcademicSummary.student_id,
+        ExamEvent.semester,
+        func.sum(StudentAcademicSummary.marks_count),
+        func.sum(StudentAcademicSummary.marks_sum)
+    ).join(ExamEvent, StudentAcademicSummary.exam_event_id == ExamEvent.id)\
+     .group_by(StudentAcademicSummary.student_id, ExamEvent.semester).all()
+    
+    sem_marks = {}
+    for sid, sem, count, total in sem_totals:
+        if count:
+            sem_marks.setdefault(sid, {})[sem] = total / count
 
     # Optimized Consistency & Velocity
     consistency = []
     
     # 1. Consistency: Just take all marks for a student across all time
-    for sid, data in student_data.items():
-        if len(data['marks']) > 1:
-            avg = statistics.mean(data['marks'])
-            std = statistics.stdev(data['marks'])
+    for summary, name in overall_rows:
+        if summary.marks_count > 1:
+            # From the stored float sums: a mean right on a .x5 boundary may round to the
+            # other neighbour than statistics.mean over the raw marks did (at most 0.1 apart)
+            avg, std = stats_from_sums(summary.marks_count, summary.marks_sum, summary.marks_sq_sum)
             
             # Growth Velocity: (Sem 3 Avg - Sem 1 Avg)
             growth = 0
-            s1 = data['sem_marks'].get(1, 0)
-            s3 = data['sem_marks'].get(3, 0)
+            s1 = sem_marks.get(summary.student_id, {}).get(1, 0)
+            s3 = sem_marks.get(summary.student_id, {}).get(3, 0)
             if s1 > 0 and s3 > 0:
                 growth = round(((s3 - s1) / s1) * 100, 1)
             
             consistency.append({
-                'name': data['name'], 
+                'name': name, 
                 'x': round(avg, 1), 
                 'y': round(std, 1),
                 'growth': growth
@@ -170,19 +135,16 @@ def student_performance_data():
             
     # 2. Danger Zone (Avg < 40 or Fail Count > 2)
     danger_zone = []
-    for sid, data in student_data.items():
-        avg = statistics.mean(data['marks']) if data['marks'] else 0
+    for summary, name in overall_rows:
+        avg = summary.average
         if avg < 40:
-            danger_zone.append({'name': data['name'], 'avg': round(avg, 1), 'risk': 'Critical'})
+            danger_zone.append({'name': name, 'avg': round(avg, 1), 'risk': 'Critical'})
 
     # 3. Radar Data (Real Aggregation)
     # 3. Radar Data (Real Aggregation)
     radar_labels = []
     radar_data = []
     
-    # FETCH ALL SUBJECTS (Safe Fallback)
-    active_subjects = Subject.query.all()
-    
     # 3. Radar Data (Optimized & Limited)
     # Fetch top 7 subjects with most results to prevent UI clutter
     radar_query = db.session.query(
@@ -242,44 +204,30 @@ def attendance_analytics_view():
 
 @reports_bp.route('/api/reports/attendance', methods=['GET'])
 @login_required
+@report_cache.cached('attendance')
 def attendance_data():
-    # 1. Fatigue Index (Day of Week)
-    attendances = Attendance.query.all()
-    day_counts = {0:0, 1:0, 2:0, 3:0, 4:0}
-    day_presents = {0:0, 1:0, 2:0, 3:0, 4:0}
-    
-    for att in attendances:
-        wd = att.date.weekday()
-        if wd <= 4:
-            day_counts[wd] += 1
-            if att.status == 'Present': day_presents[wd] += 1
+    # 1. Fatigue Index (Day of Week), grouped by weekday in SQL
+    by_weekday = attendance_by_weekday()
             
     fatigue = []
     for i in range(5):
-        rate = (day_presents[i] / day_counts[i]) if day_counts[i] > 0 else 0
+        day_presents, day_counts = by_weekday.get(i, (0, 0))
+        rate = (day_presents / day_counts) if day_counts > 0 else 0
         fatigue.append(round(rate * 100, 1)) # Percentage
 
     # 2. Truancy Prediction (Students with < 75% Attendance)
-    # Get all students and their attendance count
+    # Risk Factor: < 75% is standard detention threshold, filtered on the attendance counters
     truancy_list = []
     
-    # Efficient Query: Group By Student, Count Status
-    # This approximates for now. In prod, use SQL Case.
-    all_students = StudentProfile.query.all()
-    for s in all_students:
-        total_days = Attendance.query.filter_by(student_id=s.id).count()
-        if total_days > 0:
-            present_days = Attendance.query.filter_by(student_id=s.id, status='Present').count()
-            perc = (present_days / total_days) * 100
-            
-            # Risk Factor: < 75% is standard detention threshold
-            if perc < 75:
-                # Probability = Inverse of Attendance roughly
-                prob = round(100 - perc, 1) 
-                truancy_list.append({'name': s.display_name, 'prob': prob, 'perc': round(perc, 1)})
+    for row in students_below_threshold(ATTENDANCE_THRESHOLD):
+        perc = (row.present / row.total) * 100
+        # Probability = Inverse of Attendance roughly
+        prob = round(100 - perc, 1) 
+        truancy_list.append({'name': row.name, 'prob': prob, 'perc': round(perc, 1)})
     
     # Sort by highest probability of dropout (lowest attendance)
     truancy_list.sort(key=lambda x: x['prob'], reverse=True)
+    student_count = StudentProfile.query.count()
 
     # 3. AI Insights
     insights = {
@@ -298,7 +246,7 @@ def attendance_data():
         insights['summary'] = f"{days[min_day_idx]}s are showing significant drops in attendance ({min_rate}%)."
         insights['tip'] = f"Consider light activities or gamified sessions on {days[min_day_idx]}s to boost engagement."
     
-    if len(truancy_list) > len(all_students) * 0.15:
+    if len(truancy_list) > student_count * 0.15:
         insights['status'] = 'High Truancy Risk'
         insights['summary'] = f"Warning: {len(truancy_list)} students are below the 75% mandatory attendance threshold."
         insights['tip'] = "Initiate automated SMS warnings to parents of at-risk students immediately."
@@ -309,6 +257,11 @@ def attendance_data():
         'insights': insights
     })
 
+@reports_bp.route('/api/reports/cache-stats', methods=['GET'])
+@login_required
+def cache_stats():
+    return jsonify(report_cache.stats())
+
 # --- 3. Faculty Insights ---
 @reports_bp.route('/reports/faculty-insights', methods=['GET'])
 @login_required
@@ -317,78 +270,59 @@ def faculty_insights_view():
 
 @reports_bp.route('/api/reports/faculty', methods=['GET'])
 @login_required
+@report_cache.cached('faculty')
 def faculty_data():
-    # 1. Fetch all Faculties via the Subject Link
-    # In seed_analytics.py, Subject has a 'faculty_id'. 
-    # We should iterate Subjects first, then find the teacher.
-    
-    subjects = Subject.query.all()
+    # 1. Subject -> Faculty -> marks statistics, aggregated in one grouped query
+    # (subjects without a faculty or without recorded marks are skipped)
     faculty_metrics = []
     
     hero_count = 0
     concern_count = 0
     
-    for sub in subjects:
-        # Check if subject has a faculty assigned
-        # Note: Subject model might not have backref 'faculty' defined in all versions, 
-        # so let's query safe.
-        if not sub.faculty_id:
-            continue
-            
-        fac = FacultyProfile.query.get(sub.faculty_id)
-        if not fac:
-            continue
+    for row in subject_mark_stats(pass_mark=35):
+        avg = row.mean
+        std_dev = row.stdev
+        pass_rate = (row.passed / row.count) * 100
         
-        # Get Results for this subject
-        sub_results = db.session.query(StudentResult.marks_obtained)\
-            .join(ExamPaper).filter(ExamPaper.subject_id == sub.id).all()
-            
-        if sub_results:
-            marks = [r.marks_obtained for r in sub_results if r.marks_obtained is not None]
-            if len(marks) > 0:
-                avg = statistics.mean(marks)
-                std_dev = statistics.stdev(marks) if len(marks) > 1 else 0
-                pass_rate = (len([m for m in marks if m >= 35]) / len(marks)) * 100
-                
-                # METRIC 1: Equity Index
-                # Lower StdDev = High Equity (Everyone understands equally)
-                # Adjusted formula to be less punitive: 100 - (StdDev * 2)
-                # Typical StdDev is 15-20, so 100 - 40 = 60 (Average Equity)
-                equity_score = max(0, 100 - (std_dev * 2.0)) 
-                
-                # METRIC 2: Performance Index
-                perf_score = avg
-                
-                # ARCHETYPE CLASSIFICATION
-                archetype = "The Generalist"
-                color = "gray"
-                
-                # Adjusted Thresholds for realistic distribution
-                if perf_score >= 60 and equity_score >= 60:
-                    archetype = "The Master Teacher" 
-                    color = "emerald"
-                    hero_count += 1
-                elif perf_score >= 65 and equity_score < 60:
-                    archetype = "The Elite Coach" 
-                    color = "indigo"
-                elif perf_score < 55 and equity_score >= 65:
-                    archetype = "The Empathetic Guide"
-                    color = "blue"
-                elif equity_score < 45: # Priority on Chaos
-                    archetype = "The Strict Evaluator"
-                    color = "red"
-                    concern_count += 1
-                
-                faculty_metrics.append({
-                    'name': fac.display_name,
-                    'subject': sub.name,
-                    'avg': round(avg, 1),
-                    'equity': round(equity_score, 1),
-                    'archetype': archetype,
-                    'color': color,
-                    'pass_rate': round(pass_rate, 1),
-                    'students': len(marks)
-                })
+        # METRIC 1: Equity Index
+        # Lower StdDev = High Equity (Everyone understands equally)
+        # Adjusted formula to be less punitive: 100 - (StdDev * 2)
+        # Typical StdDev is 15-20, so 100 - 40 = 60 (Average Equity)
+        equity_score = max(0, 100 - (std_dev * 2.0)) 
+        
+        # METRIC 2: Performance Index
+        perf_score = avg
+        
+        # ARCHETYPE CLASSIFICATION
+        archetype = "The Generalist"
+        color = "gray"
+        
+        # Adjusted Thresholds for realistic distribution
+        if perf_score >= 60 and equity_score >= 60:
+            archetype = "The Master Teacher" 
+            color = "emerald"
+            hero_count += 1
+        elif perf_score >= 65 and equity_score < 60:
+            archetype = "The Elite Coach" 
+            color = "indigo"
+        elif perf_score < 55 and equity_score >= 65:
+            archetype = "The Empathetic Guide"
+            color = "blue"
+        elif equity_score < 45: # Priority on Chaos
+            archetype = "The Strict Evaluator"
+            color = "red"
+            concern_count += 1
+        
+        faculty_metrics.append({
+            'name': row.faculty,
+            'subject': row.subject,
+            'avg': round(avg, 1),
+            'equity': round(equity_score, 1),
+            'archetype': archetype,
+            'color': color,
+            'pass_rate': round(pass_rate, 1),
+            'students': row.count
+        })
     
     # Sort
     faculty_metrics.sort(key=lambda x: x['avg'], reverse=True)
@@ -424,17 +358,14 @@ def future_predictions_view():
 
 @reports_bp.route('/api/reports/future', methods=['GET'])
 @login_required
+@report_cache.cached('future')
 def future_data():
-    # 1. Fetch Data
-    students = StudentProfile.query.all()
-    results = StudentResult.query.all()
-    
-    # Pre-calculate Global Metrics
-    all_marks = [r.marks_obtained for r in results if r.marks_obtained is not None]
-    if not all_marks:
+    # 1. Fetch Data (one grouped pass: count / sum / sum of squares per student)
+    if global_mark_average() is None:
         return jsonify({}) # Empty case
-        
-    global_avg = statistics.mean(all_marks)
+
+    # Zero marks have never counted towards a student's career profile
+    student_stats = student_mark_stats(exclude_zero=True)
     
     # 2. Career Match Simulation (The "Sorting Hat" Logic)
     # Define Profiles with imaginary subject weights (simplified for demo)
@@ -452,38 +383,8 @@ def future_data():
     
     placement_projections = []
     
-    for s in students:
-        # Get student average
-        s_res = [r.marks_obtained for r in results if r.student_id == s.id and r.marks_obtained]
-        if not s_res: continue
-        
-        s_avg = statistics.mean(s_res)
-        s_var = statistics.stdev(s_res) if len(s_res) > 1 else 0
-        
-        # Classification Logic
-        role = "Unclassified"
-        potential_package = 4.0 # Base 4 LPA
-        
-        if s_avg > 85: # High Performer
-            if s_var < 5: 
-                role = 'Research / PhD' # Consistent genius
-                potential_package = 12.0
-            else: 
-                role = 'Data Scientist' # Spiky genius
-                potential_package = 18.0
-        elif s_avg > 70:
-            role = 'Full Stack Dev'
-            potential_package = 8.5
-        elif s_avg > 60:
-            role = 'Product Manager'
-            potential_package = 6.5
-        else:
-            role = 'Analyst'
-            potential_package = 4.5
-            
-        # Deterministic variability instead of random to maintain consistency across dashboards
-        potential_package += (s_var * 0.1)
-        
+    for row in student_stats:
+        role, potential_package = project_career(row.mean, row.stdev)
         placement_projections.append(potential_package)
         
         if role in career_clusters:
@@ -2,14 +2,16 @@ from flask import Blueprint, render_template, request, flash, redirect, url_for,
 from flask_login import login_required, current_user
 from app.extensions import db
 from app.models import Subject, FacultyProfile, StudentProfile, Course
+from app.services.pagination import request_page, asc
 
 subjects_bp = Blueprint('subjects', __name__)
 
 @subjects_bp.route('/subjects', methods=['GET'])
 @login_required
 def subject_list():
-    # Fetch all subjects
-    subjects = Subject.query.all()
+    # One page of subjects
+    page = request_page(Subject.query, [asc(Subject.id)])
+    subjects = page.items
     
     # Data for assignment modal
     faculty_list = FacultyProfile.query.all()
@@ -17,6 +19,7 @@ def subject_list():
     
     return render_template('subjects/subject_list.html', 
                            subjects=subjects, 
+                           page=page,
                            faculty_list=faculty_list, 
                            courses=courses)
 
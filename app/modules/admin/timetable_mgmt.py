@@ -199,7 +199,7 @@ def generate_timetable():
                 )
                 db.session.add(slot)
     
-    db.session.commit()
+    db.session.commit() # Also drops the cached student / faculty timetables (timetable_cache)
     
     if unplaced:
         flash(f"Warning: Could not place {len(unplaced)} lectures.", 'warning')
@@ -243,14 +243,9 @@ def view_timetable():
     # Calculate Time Slots
     time_headers = []
     if settings:
-        for p in range(1, max_period + 1):
-            s_time, e_time = settings.get_period_times(p)
-            
-            # Format display
-            # Create dummy datetime to use strftime
-            dummy_dt_s = datetime.combine(date.today(), s_time)
-            dummy_dt_e = datetime.combine(date.today(), e_time)
-            time_headers.append(f"{dummy_dt_s.strftime('%I:%M %p')} - {dummy_dt_e.strftime('%I:%M %p')}")
+        # Every period's times in one call (precomputed per schedule)
+        for s_time, e_time in settings.get_period_times_batch(range(1, max_period + 1)):
+            time_headers.append(f"{s_time.strftime('%I:%M %p')} - {e_time.strftime('%I:%M %p')}")
     else:
         time_headers = [f"Period {p+1}" for p in range(max_period)]
 
@@ -306,5 +301,5 @@ def update_slot():
             )
             db.session.add(slot)
             
-    db.session.commit()
+    db.session.commit() # Also drops the cached student / faculty timetables (timetable_cache)
     return jsonify({'status': 'success'})
@@ -1,12 +1,16 @@
-from flask import render_template, request, flash, redirect, url_for, current_app, Response, make_response
+from flask import render_template, request, flash, redirect, url_for, current_app, Response, make_response, jsonify
 from datetime import datetime
 from flask_login import login_required, current_user
 from app.extensions import db
 from app.models import User, StudentProfile, FacultyProfile, Subject, Course
+from app.services.student_import import start_import, get_job
+from app.services.media import send_media
+from app.services.pagination import request_page, asc
 from . import admin_bp
 import csv
 import io
 import os
+import tempfile
 from werkzeug.utils import secure_filename
 
 # --- Student Management ---
@@ -34,7 +38,10 @@ def students_list():
     if semester_filter:
         query = query.filter(StudentProfile.semester == int(semester_filter))
 
-    students = query.all()
+    page = request_page(query, [asc(StudentProfile.id)])
+    students = page.items
+    # One grouped query for every row's attendance badge
+    StudentProfile.prime_attendance(students)
     
     # Get distinct options for filters
     courses = db.session.query(StudentProfile.course_name).distinct().all()
@@ -46,6 +53,7 @@ def students_list():
     return render_template(
         'student_list.html', 
         students=students, 
+        page=page,
         courses=courses, 
         semesters=semesters,
         search_query=search_query,
@@ -185,76 +193,42 @@ def import_students():
             return redirect(request.url)
             
         if file:
-            try:
-                stream = io.StringIO(file.stream.read().decode("UTF8"), newline=None)
-                csv_reader = csv.DictReader(stream)
-                
-                count = 0
-                errors = []
-                
-                for row in csv_reader:
-                    name = row.get('name')
-                    email = row.get('email')
-                    password = row.get('password')
-                    enrollment = row.get('enrollment_number')
-                    course = row.get('course_name')
-                    semester = row.get('semester')
-                    
-                    if not all([email, password, enrollment]):
-                        errors.append(f"Skipped row with missing base fields: {row}")
-                        continue
-                        
-                    if User.query.filter_by(email=email).first():
-                        errors.append(f"Skipped existing email: {email}")
-                        continue
-                        
-                    user = User(email=email, role='student')
-                    user.set_password(password)
-                    db.session.add(user)
-                    db.session.flush()
-                    
-                    student = StudentProfile(
-                        user_id=user.id,
-                        display_name=name,
-                        enrollment_number=enrollment, 
-                        course_name=course,
-                        semester=semester
-                    )
-                    db.session.add(student)
-                    count += 1
-                
-                db.session.commit()
-                flash(f'Imported {count} students successfully.', 'success')
-                if errors:
-                    for err in errors[:5]: # Show first 5 errors to avoid flooding
-                        flash(err, 'warning')
-                        
-                return redirect(url_for('admin.students_list'))
-                
-            except Exception as e:
-                db.session.rollback()
-                flash(f'Error processing CSV: {str(e)}', 'error')
+            # Spool the upload to disk in chunks; the import itself runs in the background
+            fd, path = tempfile.mkstemp(prefix='student_import_', suffix='.csv')
+            os.close(fd)
+            file.save(path)
+
+            job_id = start_import(current_app._get_current_object(), path, file.filename)
+            flash('Import started. Progress is shown below.', 'success')
+            return redirect(url_for('admin.import_students', job=job_id))
     
-    return render_template('student_import_csv.html')
+    job_id = request.args.get('job')
+    return render_template('student_import_csv.html', job_id=job_id if job_id and get_job(job_id) else None)
+
+@admin_bp.route('/students/import/status/<job_id>')
+@login_required
+def import_students_status(job_id):
+    job = get_job(job_id)
+    if not job:
+        return jsonify({'error': 'Unknown import job'}), 404
+    return jsonify(job)
 
 # --- Faculty Management ---
 
 @admin_bp.route('/faculty/photo/<int:id>')
 def serve_faculty_photo(id):
     faculty = FacultyProfile.query.get_or_404(id)
-    if not faculty.photo_data:
+    if not faculty.has_photo:
         # Return default image or 404
         return redirect(url_for('static', filename='img/default_user.png'))
     
-    response = make_response(faculty.photo_data)
-    response.headers.set('Content-Type', faculty.photo_mimetype or 'image/jpeg')
-    return response
+    return send_media('faculty_photo', faculty.id)
 
 @admin_bp.route('/faculty')
 @login_required
 def faculty_list():
-    faculty_members = FacultyProfile.query.all()
-    return render_template('faculty_list.html', faculty_members=faculty_members)
+    page = request_page(FacultyProfile.query, [asc(FacultyProfile.id)])
+    return render_template('faculty_list.html', faculty_members=page.items, page=page)
 
 @admin_bp.route('/faculty/view/<int:id>')
 @login_required
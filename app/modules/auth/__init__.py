@@ -2,4 +2,4 @@ from flask import Blueprint
 
 auth_bp = Blueprint('auth', __name__, template_folder='templates')
 
-from . import routes
+from . import routes, identity
@@ -0,0 +1,62 @@
+"""
+Request-scoped identity resolution.
+
+Flask-Login's user loader fetches the user together with their student /
+faculty profile in one joined query and memoizes it on `g`, so routes can
+take the profile from `current_user` without another round trip.
+
+Every identity query is counted on `g`. In debug mode, or with
+IDENTITY_QUERY_HEADER set, the count is reported in the X-Identity-Queries
+response header (expected: 1 for an authenticated request, 0 for anonymous
+ones).
+"""
+from flask import current_app, g, abort
+from flask_login import current_user
+from sqlalchemy.orm import joinedload
+
+from app.extensions import db, login_manager
+from app.models import User
+from . import auth_bp
+
+
+@login_manager.user_loader
+def load_user(user_id):
+    return load_identity(int(user_id))
+
+
+def load_identity(user_id):
+    """User (with both profile relationships eagerly loaded) for this request."""
+    cached = g.get('_identity')
+    if cached is not None and cached.id == user_id:
+        return cached
+
+    user = db.session.query(User)\
+        .options(joinedload(User.student_profile), joinedload(User.faculty_profile))\
+        .filter(User.id == user_id).first()
+    g.identity_queries = g.get('identity_queries', 0) + 1
+    g._identity = user
+    return user
+
+
+def current_student_profile():
+    """StudentProfile of the logged in user, or 404 (replaces filter_by(user_id=...).first_or_404())."""
+    profile = current_user.student_profile if current_user.is_authenticated else None
+    if profile is None:
+        abort(404)
+    return profile
+
+
+def current_faculty_profile():
+    """FacultyProfile of the logged in user, or 404."""
+    profile = current_user.faculty_profile if current_user.is_authenticated else None
+    if profile is None:
+        abort(404)
+    return profile
+
+
+@auth_bp.after_app_request
+def report_identity_queries(response):
+    if not (current_app.debug or current_app.config.get('IDENTITY_QUERY_HEADER')):
+        return response
+    response.headers['X-Identity-Queries'] = str(g.get('identity_queries', 0))
+    return response
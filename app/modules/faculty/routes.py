@@ -3,15 +3,25 @@ from flask_login import login_required
 from datetime import datetime, date, timedelta, timezone
 from app.models import FeeRecord, StudentQuery, QueryMessage, FacultyProfile, Attendance, Timetable
 from flask_login import current_user, login_required
-from flask import render_template, request, redirect, url_for, flash, send_file
+from flask import render_template, request, redirect, url_for, flash, send_file, jsonify, current_app
 import io
 from app.extensions import db
+from app.modules.auth.identity import current_faculty_profile
+from app.services.media import send_media
+from app.services.pagination import request_page, asc, desc
+from app.services.timetable import cohort_timetable, faculty_slots
+from app.services.attendance_writer import write_attendance
+from app.services.attendance_counters import low_attendance
+from app.services.lecture_ledger import lecture_ledger, marked_lectures
+from app.services.marks_entry import class_roster, rows_from_form, rows_from_file, ingest_marks
+from app.services.messages import thread_page, thread_updates, message_payload, event_stream_response
+from sqlalchemy import func, tuple_
 from . import faculty_bp
 
 @faculty_bp.route('/dashboard')
 @login_required
 def dashboard():
-    faculty = FacultyProfile.query.filter_by(user_id=current_user.id).first_or_404()
+    faculty = current_faculty_profile()
     
     # 1. Stats
     mentees_count = StudentProfile.query.filter_by(mentor_id=faculty.id).count()
@@ -19,36 +29,25 @@ def dashboard():
     
     # 2. Today's Schedule & Attendance Check
     today_name = datetime.now().strftime('%A') # e.g. "Monday"
-    todays_classes = Timetable.query.filter_by(faculty_id=faculty.id, day_of_week=today_name).order_by(Timetable.period_number).all()
+    todays_slots = faculty_slots(faculty.id, today_name)
     
     total_pending_attendance = 0
     today_date = date.today()
+    todays_classes = []
     
-    for entry in todays_classes:
-        # Time calc
-        from app.models import ScheduleSettings
-        settings = ScheduleSettings.query.filter_by(course_name=entry.course_name, semester=entry.semester).first()
-        if settings:
-            s_time, e_time = settings.get_period_times(entry.period_number)
-            entry.display_time = f"{s_time.strftime('%I:%M %p')} - {e_time.strftime('%I:%M %p')}"
-        else:
-            base_start_hour = 9
-            start_minutes = (base_start_hour * 60) + ((entry.period_number - 1) * 60)
-            start_time = datetime.combine(today_date, datetime.min.time()) + timedelta(minutes=start_minutes)
-            end_time = start_time + timedelta(minutes=60)
-            entry.display_time = f"{start_time.strftime('%I:%M %p')} - {end_time.strftime('%I:%M %p')}"
-        
-        # Check Attendance for this Subject + Date
-        # If count > 0, assumed marked
-        marked_count = Attendance.query.filter_by(
-            subject_id=entry.subject_id, 
-            date=today_date
-        ).count()
+    # Marked lectures of today, one grouped query for every slot
+    marked = marked_lectures({slot.subject.id for slot in todays_slots}, today_date, today_date)
+
+    for slot in todays_slots:
+        entry = slot._asdict()
+        entry['display_time'] = f"{slot.start_time.strftime('%I:%M %p')} - {slot.end_time.strftime('%I:%M %p')}"
+        todays_classes.append(entry)
         
-        if marked_count > 0:
-            entry.attendance_marked = True
+        # Marked once anyone has attendance for this Subject + Date
+        if (slot.subject.id, today_date) in marked:
+            entry['attendance_marked'] = True
         else:
-            entry.attendance_marked = False
+            entry['attendance_marked'] = False
             total_pending_attendance += 1
             
     # 3. Recent Notices (Inbox + Sent)
@@ -71,8 +70,8 @@ def dashboard():
 @login_required
 def fees():
     # Fetch all fee records (In a real app, filter by faculty's students)
-    records = FeeRecord.query.order_by(FeeRecord.due_date.desc()).all()
-    return render_template('faculty/fees.html', records=records)
+    page = request_page(FeeRecord.query, [desc(FeeRecord.due_date), desc(FeeRecord.id)])
+    return render_template('faculty/fees.html', records=page.items, page=page)
 
 @faculty_bp.route('/fees/mark_paid/<int:fee_id>', methods=['POST'])
 @login_required
@@ -88,7 +87,7 @@ def mark_paid(fee_id):
 @faculty_bp.route('/queries')
 @login_required
 def queries():
-    faculty = FacultyProfile.query.filter_by(user_id=current_user.id).first_or_404()
+    faculty = current_faculty_profile()
     
     # Check for filters
     status = request.args.get('status', 'all')
@@ -104,7 +103,7 @@ def queries():
 @faculty_bp.route('/queries/<int:query_id>', methods=['GET', 'POST'])
 @login_required
 def query_chat(query_id):
-    faculty = FacultyProfile.query.filter_by(user_id=current_user.id).first_or_404()
+    faculty = current_faculty_profile()
     query = StudentQuery.query.get_or_404(query_id)
     
     if query.faculty_id != faculty.id:
@@ -133,9 +132,39 @@ def query_chat(query_id):
             
             query.updated_at = datetime.now(timezone.utc)
             db.session.commit()
+            # Live chats post in the background and only need the new message back
+            if request.accept_mimetypes.best == 'application/json':
+                return jsonify(message_payload(msg, 'faculty')), 201
             return redirect(url_for('faculty.query_chat', query_id=query_id))
+        elif request.accept_mimetypes.best == 'application/json':
+            return jsonify({'error': 'Empty message'}), 400
+
+    # Newest messages first, older ones a page at a time (image bytes are never loaded here)
+    page = thread_page(query.id, current_app.config['MESSAGES_PER_PAGE'], request.args.get('before'))
+    return render_template('faculty/query_chat.html', query=query, page=page)
+
+@faculty_bp.route('/queries/<int:query_id>/messages')
+@login_required
+def query_messages(query_id):
+    """Messages after ?since=<message id>, for polling an open chat."""
+    faculty = current_faculty_profile()
+    query = StudentQuery.query.get_or_404(query_id)
+    if query.faculty_id != faculty.id:
+        return jsonify({'error': 'Unauthorized'}), 403
+
+    since_id = request.args.get('since', 0, type=int)
+    return jsonify(thread_updates(query.id, since_id, 'faculty', current_app.config['MESSAGES_PER_PAGE']))
+
+@faculty_bp.route('/queries/<int:query_id>/events')
+@login_required
+def query_events(query_id):
+    """Server-sent events of an open chat (new messages, status changes)."""
+    faculty = current_faculty_profile()
+    query = StudentQuery.query.get_or_404(query_id)
+    if query.faculty_id != faculty.id:
+        return "Unauthorized", 403
 
-    return render_template('faculty/query_chat.html', query=query)
+    return event_stream_response(query.id, 'faculty')
 
 # --- New Faculty Routes Placeholders ---
 
@@ -147,7 +176,7 @@ from werkzeug.utils import secure_filename
 @faculty_bp.route('/classes', methods=['GET', 'POST'])
 @login_required
 def classes():
-    faculty = FacultyProfile.query.filter_by(user_id=current_user.id).first_or_404()
+    faculty = current_faculty_profile()
     
     if request.method == 'POST':
         if 'syllabus_file' in request.files:
@@ -221,19 +250,12 @@ def student_detail(student_id):
 @login_required
 def download_syllabus(subject_id):
     syllabus = Syllabus.query.filter_by(subject_id=subject_id).first_or_404()
-    from flask import send_file
-    import io
-    return send_file(
-        io.BytesIO(syllabus.file_data),
-        mimetype='application/pdf',
-        as_attachment=True,
-        download_name=syllabus.filename
-    )
+    return send_media('syllabus', syllabus.id, as_attachment=True, download_name=syllabus.filename)
 
 @faculty_bp.route('/attendance', methods=['GET', 'POST'])
 @login_required
 def attendance():
-    faculty = FacultyProfile.query.filter_by(user_id=current_user.id).first_or_404()
+    faculty = current_faculty_profile()
     subjects = Subject.query.filter_by(faculty_id=faculty.id).all()
     
     # --- 1. HANDLE ATTENDANCE SUBMISSION (POST) ---
@@ -241,31 +263,14 @@ def attendance():
         subj_id = request.form.get('subject_id')
         date_val = request.form.get('date')
         target_subject = Subject.query.get_or_404(subj_id)
-        
-        for key in request.form:
-            if key.startswith('status_'):
-                student_id = int(key.split('_')[1])
-                status = request.form[key]
-                
-                # Update or Create record
-                att = Attendance.query.filter_by(
-                    student_id=student_id,
-                    subject_id=subj_id,
-                    date=datetime.strptime(date_val, '%Y-%m-%d').date()
-                ).first()
-                
-                if att:
-                    att.status = status
-                else:
-                    new_att = Attendance(
-                        student_id=student_id,
-                        course_name=target_subject.course_name,
-                        date=datetime.strptime(date_val, '%Y-%m-%d').date(),
-                        status=status,
-                        subject_id=subj_id,
-                        faculty_id=faculty.id
-                    )
-                    db.session.add(new_att)
+        on_date = datetime.strptime(date_val, '%Y-%m-%d').date()
+
+        statuses = {
+            int(key.split('_')[1]): request.form[key]
+            for key in request.form if key.startswith('status_')
+        }
+        # One read of the sheet, then batched upsert / update statements
+        write_attendance(target_subject, on_date, statuses, faculty.id)
         
         db.session.commit()
         flash('Attendance updated successfully!', 'success')
@@ -320,43 +325,25 @@ def attendance():
             if stats['total'] > 0:
                 stats['percentage'] = round((stats['present'] / stats['total']) * 100, 1)
 
-            # Low Attendance Calculation
-            all_subject_attendance = Attendance.query.filter_by(subject_id=selected_subject_id).all()
-            student_stats = {} # {id: {total: 0, present: 0}}
-            for rec in all_subject_attendance:
-                if rec.student_id not in student_stats: student_stats[rec.student_id] = {'total': 0, 'present': 0}
-                student_stats[rec.student_id]['total'] += 1
-                if rec.status == 'Present': student_stats[rec.student_id]['present'] += 1
-            
-            for student in students:
-                s_stat = student_stats.get(student.id, {'total': 0, 'present': 0})
-                pct = (s_stat['present'] / s_stat['total'] * 100) if s_stat['total'] > 0 else 100.0
-                if pct < 75:
-                    low_attendance_list.append({
-                        'student': student,
-                        'percentage': round(pct, 1),
-                        'attended': s_stat['present'],
-                        'total': s_stat['total']
-                    })
+            # Low Attendance, from the maintained per-subject counters
+            for row in low_attendance(selected_subject):
+                low_attendance_list.append({
+                    'student': row.student,
+                    'percentage': round(row.present / row.total * 100, 1),
+                    'attended': row.present,
+                    'total': row.total
+                })
         except ValueError:
             flash('Invalid date provided for marking.', 'error')
             marking_mode = False
 
     # B. DASHBOARD MODE (Default or if marking mode fails)
     if not marking_mode:
-        all_lectures = []
-        
-        # Build Timetable Cache
-        timetable_map = {} # {DayName: [Slots]}
-        slots_query = Timetable.query.filter_by(faculty_id=faculty.id)
+        # Faculty's slots from the cached cohort grids, in timetable (id) order within a day
+        slots = sorted(faculty_slots(faculty.id), key=lambda slot: slot.id)
         if selected_subject_id:
-            slots_query = slots_query.filter_by(subject_id=selected_subject_id)
+            slots = [slot for slot in slots if slot.subject.id == selected_subject_id]
             selected_subject = Subject.query.get(selected_subject_id)
-        
-        faculty_slots = slots_query.all()
-        for slot in faculty_slots:
-            if slot.day_of_week not in timetable_map: timetable_map[slot.day_of_week] = []
-            timetable_map[slot.day_of_week].append(slot)
 
         # Determine Date Range to display
         if selected_date_str:
@@ -368,34 +355,9 @@ def attendance():
         else:
             date_range = [date.today() - timedelta(days=i) for i in range(30)]
 
-        # Find lectures for the date range
-        for curr_date in date_range:
-            day_name = curr_date.strftime('%A')
-            if day_name in timetable_map:
-                for slot in timetable_map[day_name]:
-                    marked_count = Attendance.query.filter_by(subject_id=slot.subject_id, date=curr_date).count()
-                    all_lectures.append({
-                        'date': curr_date,
-                        'date_str': curr_date.strftime('%Y-%m-%d'),
-                        'subject': slot.subject,
-                        'time': f"{9 + (slot.period_number-1)}:00 - {10 + (slot.period_number-1)}:00",
-                        'status': 'Marked' if marked_count > 0 else 'Pending'
-                    })
-        
-        all_lectures.sort(key=lambda x: x['date'], reverse=True)
-
-        # Pagination
-        per_page = 5
-        total_items = len(all_lectures)
-        start = (page - 1) * per_page
-        end = start + per_page
-        lecture_history = all_lectures[start:end]
-        pagination = {
-            'page': page,
-            'total_pages': (total_items + per_page - 1) // per_page,
-            'has_next': end < total_items,
-            'has_prev': start > 0
-        }
+        # Only the visible page of lectures is built, marked status in one grouped query
+        pagination = lecture_ledger(slots, date_range, page, per_page=5)
+        lecture_history = pagination.items
 
     return render_template(
         'faculty/attendance.html',
@@ -510,7 +472,7 @@ def print_attendance_report():
 @faculty_bp.route('/material', methods=['GET', 'POST'])
 @login_required
 def material():
-    faculty = FacultyProfile.query.filter_by(user_id=current_user.id).first_or_404()
+    faculty = current_faculty_profile()
     subjects = Subject.query.filter_by(faculty_id=faculty.id).all()
     
     if request.method == 'POST':
@@ -548,7 +510,7 @@ def material():
 @faculty_bp.route('/marks', methods=['GET', 'POST'])
 @login_required
 def marks():
-    faculty = FacultyProfile.query.filter_by(user_id=current_user.id).first_or_404()
+    faculty = current_faculty_profile()
     
     # 1. Fetch Active Exams
     # For now, fetching all. In real app, filter by date or 'is_active'
@@ -575,7 +537,7 @@ def marks():
             ExamPaper.subject_id.in_(faculty_subject_ids)
         ).all()
         
-    # 3. If Paper Selected, Fetch Students and Results
+    # 3. If Paper Selected, make sure the faculty teaches it
     if selected_paper_id:
         selected_paper = ExamPaper.query.get_or_404(selected_paper_id)
         
@@ -583,8 +545,43 @@ def marks():
         if selected_paper.subject.faculty_id != faculty.id:
             flash('Unauthorized access to this paper.', 'error')
             return redirect(url_for('faculty.marks'))
-            
-        # Fetch Students (Course/Sem matches Paper's Subject)
+
+    # 4. Handle POST (Save Marks): form fields or an uploaded CSV / XLSX sheet
+    marks_report = None
+    if request.method == 'POST':
+        if not selected_paper:
+             flash('No paper selected.', 'error')
+             return redirect(url_for('faculty.marks'))
+
+        wants_json = request.accept_mimetypes.best == 'application/json'
+        roster = class_roster(selected_paper)
+        upload = request.files.get('marks_file')
+        try:
+            if upload and upload.filename:
+                rows = rows_from_file(upload)
+            else:
+                rows = rows_from_form(request.form, roster)
+        except ValueError as e:
+            if wants_json:
+                return jsonify({'error': str(e)}), 400
+            flash(str(e), 'error')
+            return redirect(url_for('faculty.marks', exam_id=selected_exam_id, paper_id=selected_paper_id))
+
+        # Whole batch validated, then written with batched upserts
+        marks_report = ingest_marks(selected_paper, rows, roster)
+        db.session.commit()
+        if wants_json:
+            return jsonify(marks_report._asdict())
+
+        saved = marks_report.inserted + marks_report.updated + marks_report.unchanged
+        flash(f'Updated marks for {saved} students.', 'success')
+        if not marks_report.errors:
+            return redirect(url_for('faculty.marks', exam_id=selected_exam_id, paper_id=selected_paper_id))
+        # Rows were skipped: show the error report with the saved marks
+        flash(f'{len(marks_report.errors)} rows were skipped, see the report below.', 'error')
+
+    # 5. Students (Course/Sem matches Paper's Subject) and their results
+    if selected_paper:
         students = StudentProfile.query.filter_by(
             course_name=selected_paper.subject.course_name,
             semester=selected_paper.subject.semester
@@ -600,68 +597,20 @@ def marks():
                 'result': result_map.get(stu.id)
             })
 
-    # 4. Handle POST (Save Marks)
-    if request.method == 'POST':
-        if not selected_paper:
-             flash('No paper selected.', 'error')
-             return redirect(url_for('faculty.marks'))
-             
-        count = 0
-        for data in students_data:
-            stu = data['student']
-            input_name = f'marks_{stu.id}'
-            
-            if input_name in request.form:
-                marks_val = request.form.get(input_name)
-                
-                # Logic: If empty, maybe treat as Absent or None?
-                # If present, update or create
-                
-                res = data['result']
-                if not res:
-                    res = StudentResult(
-                        exam_paper_id=selected_paper.id,
-                        student_id=stu.id
-                    )
-                    db.session.add(res)
-                
-                if marks_val and marks_val.strip() != '':
-                    try:
-                        val = float(marks_val)
-                        if val < 0 or val > selected_paper.total_marks:
-                            flash(f'Invalid marks for {stu.enrollment_number}. Max is {selected_paper.total_marks}', 'error')
-                            continue
-                        res.marks_obtained = val
-                        res.status = 'Present'
-                        # Fail logic? If < 33%?
-                        res.is_fail = (val < (selected_paper.total_marks * 0.33)) # Simple rule
-                    except ValueError:
-                         flash(f'Invalid number for {stu.enrollment_number}', 'error')
-                else:
-                    # If empty, mark as Null or Absent? 
-                    # Let's say if unchecked 'present', it's absent.
-                    # Simplified: If empty string, do nothing or set None
-                    pass # Keep previous or ignore
-                
-                count += 1
-        
-        db.session.commit()
-        flash(f'Updated marks for {count} students.', 'success')
-        return redirect(url_for('faculty.marks', exam_id=selected_exam_id, paper_id=selected_paper_id))
-
     return render_template(
         'faculty/marks.html', 
         exam_events=exam_events, 
         papers=papers, 
         selected_exam=selected_exam,
         selected_paper=selected_paper,
-        students_data=students_data
+        students_data=students_data,
+        marks_report=marks_report
     )
 
 @faculty_bp.route('/mentorship')
 @login_required
 def mentorship():
-    faculty = FacultyProfile.query.filter_by(user_id=current_user.id).first_or_404()
+    faculty = current_faculty_profile()
     # Mentees are available via backref 'mentees' from StudentProfile
     # Or query explicit
     mentees = StudentProfile.query.filter_by(mentor_id=faculty.id).all()
@@ -671,7 +620,7 @@ def mentorship():
 @faculty_bp.route('/mentorship/edit/<int:student_id>', methods=['GET', 'POST'])
 @login_required
 def edit_mentee(student_id):
-    faculty = FacultyProfile.query.filter_by(user_id=current_user.id).first_or_404()
+    faculty = current_faculty_profile()
     student = StudentProfile.query.get_or_404(student_id)
     
     # Security: Check if this faculty is the mentor
@@ -715,7 +664,7 @@ from app.models import FeeRecord, StudentQuery, QueryMessage, FacultyProfile, No
 @faculty_bp.route('/notices', methods=['GET', 'POST'])
 @login_required
 def notices():
-    faculty = FacultyProfile.query.filter_by(user_id=current_user.id).first_or_404()
+    faculty = current_faculty_profile()
     
     if request.method == 'POST':
         title = request.form.get('title')
@@ -778,7 +727,7 @@ def notices():
 @faculty_bp.route('/schedule')
 @login_required
 def schedule():
-    faculty = FacultyProfile.query.filter_by(user_id=current_user.id).first_or_404()
+    faculty = current_faculty_profile()
     
     # Get current day
     today_name = datetime.now(timezone.utc).strftime('%A') # e.g. "Monday"
@@ -787,41 +736,33 @@ def schedule():
         today_name = 'Monday' # Demo fallback
         flash('Showing Monday Schedule (Weekend Override)', 'info')
 
-    slots = Timetable.query.filter_by(
-        faculty_id=faculty.id, 
-        day_of_week=today_name
-    ).order_by(Timetable.period_number).all()
-    
-    schedule_data = []
-    current_time = datetime.now(timezone.utc).time() # UTC time, might need offset for display logic
+    slots = faculty_slots(faculty.id, today_name)
     
-    # Base Time: 9:00 AM
-    base_hour = 9 
+    # Class sizes for every cohort taught today, in one grouped query
+    cohorts = {(slot.course_name, slot.semester) for slot in slots}
+    class_sizes = dict(
+        ((course_name, semester), count) for course_name, semester, count in
+        db.session.query(StudentProfile.course_name, StudentProfile.semester, func.count(StudentProfile.id))
+        .filter(tuple_(StudentProfile.course_name, StudentProfile.semester).in_(cohorts))
+        .group_by(StudentProfile.course_name, StudentProfile.semester).all()
+    ) if cohorts else {}
     
+    schedule_data = []
     for slot in slots:
-        # Calculate Time
-        from app.models import ScheduleSettings
-        settings = ScheduleSettings.query.filter_by(course_name=slot.course_name, semester=slot.semester).first()
-        if settings:
-            s_time, e_time = settings.get_period_times(slot.period_number)
-            t_str = f"{s_time.strftime('%I:%M %p')} - {e_time.strftime('%I:%M %p')}"
+        if cohort_timetable(slot.course_name, slot.semester).has_settings:
+            t_str = f"{slot.start_time.strftime('%I:%M %p')} - {slot.end_time.strftime('%I:%M %p')}"
         else:
-            start_h = base_hour + (slot.period_number - 1)
+            # Base Time: 9:00 AM
+            start_h = slot.start_time.hour
             end_h = start_h + 1
             t_str = f"{start_h if start_h <= 12 else start_h-12}:00 - {end_h if end_h <= 12 else end_h-12}:00 {'AM' if start_h < 12 else 'PM'}"
         
-        # Student Count
-        count = StudentProfile.query.filter_by(
-            course_name=slot.course_name,
-            semester=slot.semester
-        ).count()
-        
         schedule_data.append({
             'time_str': t_str,
             'subject': slot.subject.name,
             'course_detail': f"{slot.course_name} • Sem {slot.semester}",
             'room': slot.room_number,
-            'student_count': count,
+            'student_count': class_sizes.get((slot.course_name, slot.semester), 0),
             'attendance_marked': False # Placeholder logic
         })
         
@@ -845,19 +786,18 @@ def event_detail(event_id):
 
 @faculty_bp.route('/event/image/<int:event_id>')
 def event_image(event_id):
-    from flask import Response
     event = UniversityEvent.query.get_or_404(event_id)
-    if not event.image_data:
+    if not event.has_image:
         return "", 404
-    return Response(event.image_data, mimetype=event.image_mimetype)
+    return send_media('event_image', event.id)
 
 @faculty_bp.route('/timetable')
 @login_required
 def timetable():
-    faculty = FacultyProfile.query.filter_by(user_id=current_user.id).first_or_404()
+    faculty = current_faculty_profile()
     
-    # Fetch Timetable entries
-    entries = Timetable.query.filter_by(faculty_id=faculty.id).order_by(Timetable.period_number).all()
+    # Slots across every class taught, times resolved (served from the timetable cache)
+    entries = faculty_slots(faculty.id)
     
     # Structure Data: Days -> Slots
     days_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
@@ -865,29 +805,6 @@ def timetable():
     
     for entry in entries:
         if entry.day_of_week in schedule:
-            # We can calculate times if we had a settings model, but for now 
-            # we rely on period number or just display it simply.
-            # Mirroring student logic for consistency if possible, or simple list.
-            
-            # Simple Time Logic (09:00 Start, 1 hr slots)
-            from app.models import ScheduleSettings
-            settings = ScheduleSettings.query.filter_by(course_name=entry.course_name, semester=entry.semester).first()
-            if settings:
-                s_time, e_time = settings.get_period_times(entry.period_number)
-                entry.start_time = s_time
-                entry.end_time = e_time
-            else:
-                base_start_hour = 9
-                start_minutes = (base_start_hour * 60) + ((entry.period_number - 1) * 60)
-                
-                start_time = datetime.combine(date.today(), datetime.min.time()) + timedelta(minutes=start_minutes)
-                end_time = start_time + timedelta(minutes=60)
-                entry.start_time = start_time.time()
-                entry.end_time = end_time.time()
-            
-            # Room logic
-            entry.room_number = getattr(entry, 'room_number', 'Room 101')
-            
             schedule[entry.day_of_week].append(entry)
             
     # Remove empty days if desired, or keep for grid structure. 
@@ -900,11 +817,11 @@ def timetable():
 @faculty_bp.route('/reports/lost-cards')
 @login_required
 def report_lost_cards():
-    faculty = FacultyProfile.query.filter_by(user_id=current_user.id).first_or_404()
+    faculty = current_faculty_profile()
     
     # Ideally filter by students relevant to faculty(optional), but for "Lost Cards", 
     # usually it's a general report or filtered by Dept. 
     # Showing all lost cards for now as faculty might need to know about any student.
-    lost_cards = StudentProfile.query.filter_by(id_card_status='Lost').all()
+    page = request_page(StudentProfile.query.filter_by(id_card_status='Lost'), [asc(StudentProfile.id)])
     
-    return render_template('faculty/report_lost_cards.html', lost_cards=lost_cards)
+    return render_template('faculty/report_lost_cards.html', lost_cards=page.items, page=page)
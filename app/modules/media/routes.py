@@ -0,0 +1,32 @@
+from flask import abort, redirect, url_for
+from flask_login import login_required
+from app.services.media import MEDIA_SOURCES, THUMBNAIL_SIZES, get_digest, get_thumbnail, send_media, send_thumbnail
+from . import media_bp
+
+# The sha256 in the URL pins the content, so responses never change
+IMMUTABLE = 'private, max-age=31536000, immutable'
+
+@media_bp.route('/<kind>/<int:owner_id>/<digest>')
+@media_bp.route('/<kind>/<int:owner_id>/<digest>/<int:size>')
+@login_required
+def serve(kind, owner_id, digest, size=None):
+    source = MEDIA_SOURCES.get(kind)
+    if not source or not source.linkable:
+        abort(404)
+    if size is not None and size not in THUMBNAIL_SIZES:
+        abort(404)
+
+    current = get_digest(kind, owner_id)
+    if current is None:
+        abort(404)
+    if current.sha256 != digest:
+        # The bytes changed since the page was rendered
+        return redirect(url_for('media.serve', kind=kind, owner_id=owner_id, digest=current.sha256, size=size))
+
+    thumb = get_thumbnail(kind, owner_id, current, size) if size else None
+    if thumb:
+        response = send_thumbnail(thumb, current)
+    else:
+        response = send_media(kind, owner_id)
+    response.headers['Cache-Control'] = IMMUTABLE
+    return response
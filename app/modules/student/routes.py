@@ -3,131 +3,67 @@ from flask_login import login_required, current_user
 import io
 from datetime import datetime, timezone
 from . import student_bp
-from app.models import StudentProfile, Attendance, Subject, Timetable, StudentResult, ExamPaper, ExamEvent, UniversityEvent, EventRegistration, Notice, FeeRecord, StudentQuery, QueryMessage, FacultyProfile, Syllabus
+from app.models import StudentProfile, Attendance, Subject, Timetable, StudentResult, ExamPaper, ExamEvent, UniversityEvent, EventRegistration, Notice, FeeRecord, StudentQuery, QueryMessage, FacultyProfile, Syllabus, StudentAcademicSummary
 from app.extensions import db
-from flask import render_template, request, redirect, url_for, flash, jsonify
+from app.modules.auth.identity import current_student_profile
+from app.services.media import send_media
+from app.services.attendance_counters import subject_attendance
+from app.services.grading import load_results, grade_results
+from app.services.notices import student_notices, notice_page
+from app.services.pagination import request_page, desc
+from app.services.timetable import student_timetable
+from app.services.dashboard import WIDGETS, load_widgets, widgets_json
+from app.services.messages import thread_page, thread_updates, message_payload, event_stream_response
+from flask import render_template, request, redirect, url_for, flash, jsonify, current_app
 
 @student_bp.route('/dashboard')
 @login_required
 def dashboard():
-    student = StudentProfile.query.filter_by(user_id=current_user.id).first_or_404()
-    
-    # 1. Attendance Stats
-    attendance_pct = student.get_overall_attendance()
-    
-    # 2. Recent Notices
-    notices = Notice.query.order_by(Notice.created_at.desc()).limit(4).all()
-    
-    # 3. Upcoming Event
-    from datetime import date
-    next_event = UniversityEvent.query.filter(
-        UniversityEvent.date >= date.today()
-    ).order_by(UniversityEvent.date).first()
-    
-    # 4. Pending Fee Count
-    pending_fees = FeeRecord.query.filter_by(student_id=student.id, status='Pending').count()
-
-    # 5. Calculate Latest SGPA (SPI)
-    # Fetch results for current semester (or latest available)
-    results = StudentResult.query.filter_by(student_id=student.id).all()
-    
-    total_credits = 0
-    total_points = 0
-    
-    # Filter for results belonging to the latest exam event
-    if results:
-        # Group by event to find latest
-        events = {}
-        for res in results:
-            eid = res.paper.exam_event_id
-            if eid not in events: events[eid] = []
-            events[eid].append(res)
-            
-        # Sort events by date (desc)
-        sorted_events = sorted(events.keys(), key=lambda eid: events[eid][0].paper.exam_event.start_date, reverse=True)
-        latest_eid = sorted_events[0]
-        latest_results = events[latest_eid]
-        
-        for res in latest_results:
-            marks = res.marks_obtained or 0
-            points = 0
-            if marks >= 90: points = 10
-            elif marks >= 80: points = 9
-            elif marks >= 70: points = 8
-            elif marks >= 60: points = 7
-            elif marks >= 50: points = 6
-            elif marks >= 40: points = 5
-            else: points = 0
-            
-            credits = res.paper.subject.weekly_lectures or 3
-            total_points += (points * credits)
-            total_credits += credits
-
-    latest_spi = round(total_points / total_credits, 2) if total_credits > 0 else 0.0
+    student = current_student_profile()
+    
+    # Attendance, recent notices, next event, pending fees and latest SGPA (SPI),
+    # each from its cached widget provider
+    widgets = load_widgets(student)
 
     return render_template('student_dashboard.html', 
                            student=student, 
-                           attendance_pct=attendance_pct, 
-                           notices=notices, 
-                           next_event=next_event, 
-                           pending_fees=pending_fees,
-                           latest_spi=latest_spi)
+                           attendance_pct=widgets['attendance'], 
+                           notices=widgets['notices'], 
+                           next_event=widgets['next_event'], 
+                           pending_fees=widgets['pending_fees'],
+                           latest_spi=widgets['latest_spi'])
+
+@student_bp.route('/dashboard/widgets')
+@login_required
+def dashboard_widgets():
+    """Every dashboard widget (or ?widgets=a,b) in one JSON response."""
+    student = current_student_profile()
+
+    names = [n for n in request.args.get('widgets', '').split(',') if n]
+    unknown = [n for n in names if n not in WIDGETS]
+    if unknown:
+        return jsonify({'error': f"Unknown widgets: {', '.join(unknown)}"}), 400
+
+    return jsonify(widgets_json(load_widgets(student, names)))
 
 # Placeholder Routes for Sidebar Navigation
 @student_bp.route('/attendance')
 @login_required
 def attendance():
-    from app.models import Attendance, Subject, Timetable, StudentProfile
-    from sqlalchemy import func
     import math
 
     # 1. Get Student Context
-    student = StudentProfile.query.filter_by(user_id=current_user.id).first_or_404()
+    student = current_student_profile()
     
     # 2. Get Overall Attendance (Daily)
     # Using standardized model method
     overall_percent = student.get_overall_attendance()
     overall_status = "Excellent" if overall_percent >= 85 else "Good" if overall_percent >= 75 else "Critical"
 
-    # 3. Derive Subject-Wise Data via Timetable Heuristic
-    # Logic: If present on Monday, present for all Monday subjects.
-    subjects = Subject.query.filter_by(course_name=student.course_name, semester=student.semester).all()
-    timetable = Timetable.query.filter_by(course_name=student.course_name, semester=student.semester).all()
-    
-    # Map: DayName (0=Mon) -> [Subject_IDs]
-    day_map = {0: [], 1: [], 2: [], 3: [], 4: [], 5: [], 6: []}
-    weekdays_str_map = {'Mon': 0, 'Tue': 1, 'Wed': 2, 'Thu': 3, 'Fri': 4, 'Sat': 5, 'Sun': 6}
-    
-    for slot in timetable:
-        d_idx = weekdays_str_map.get(slot.day_of_week)
-        if d_idx is not None:
-             day_map[d_idx].append(slot.subject_id)
-
-    # Initialize Stats Container
-    subject_stats = {} # {id: {name, total, present}}
-    for sub in subjects:
-        subject_stats[sub.id] = {'name': sub.name, 'total': 0, 'present': 0}
-
-    # Iterate Attendance History
-    records = Attendance.query.filter_by(student_id=student.id).all()
-    
-    for record in records:
-        # Direct Subject Match (Preferred)
-        if record.subject_id:
-            if record.subject_id in subject_stats:
-                subject_stats[record.subject_id]['total'] += 1
-                if record.status == 'Present':
-                    subject_stats[record.subject_id]['present'] += 1
-        else:
-            # Fallback for Legacy Data (Day-based Heuristic)
-            day_idx = record.date.weekday() # 0=Mon
-            relevant_subjects = day_map.get(day_idx, [])
-            
-            for sub_id in relevant_subjects:
-                if sub_id in subject_stats:
-                    subject_stats[sub_id]['total'] += 1
-                    if record.status == 'Present':
-                        subject_stats[sub_id]['present'] += 1
+    # 3. Subject-Wise Data from the maintained counters
+    # Legacy day-based records still follow the timetable heuristic:
+    # present on a Monday counts as present for all Monday subjects.
+    subject_stats = subject_attendance(student) # {id: {name, total, present}}
 
     # 4. Final Calculations (Percent + Recovery)
     processed_subjects = []
@@ -175,138 +111,41 @@ def attendance():
 @student_bp.route('/academics')
 @login_required
 def academics():
-    student = StudentProfile.query.filter_by(user_id=current_user.id).first_or_404()
+    student = current_student_profile()
     
-    # Fetch all results
-    results = StudentResult.query.filter_by(student_id=student.id).all()
-    
-    # Group by Exam Event
-    exams_data = {}
-    
-    for res in results:
-        exam_event = res.paper.exam_event
-        if exam_event.id not in exams_data:
-            exams_data[exam_event.id] = {
-                'event': exam_event,
-                'results': [],
-                'total_credits': 0,
-                'total_points': 0,
-                'spi': 0.0
-            }
-        
-        # Calculate Grade Points (Simple Logic for now)
-        # >90: 10, >80: 9, >70: 8, >60: 7, >50: 6, >40: 5, <40: 0
-        marks = res.marks_obtained or 0
-        points = 0
-        grade = 'F'
-        if marks >= 90: points, grade = 10, 'AA'
-        elif marks >= 80: points, grade = 9, 'AB'
-        elif marks >= 70: points, grade = 8, 'BB'
-        elif marks >= 60: points, grade = 7, 'BC'
-        elif marks >= 50: points, grade = 6, 'CC'
-        elif marks >= 40: points, grade = 5, 'CD'
-        else: points, grade = 0, 'FF'
-        
-        # Assuming 3 credits per subject for simplicity if not defined
-        credits = res.paper.subject.weekly_lectures or 3
-        
-        exams_data[exam_event.id]['results'].append({
-            'subject': res.paper.subject.name,
-            'marks': marks,
-            'total': res.paper.total_marks,
-            'grade': grade,
-            'points': points,
-            'credits': credits
-        })
-        
-        exams_data[exam_event.id]['total_credits'] += credits
-        exams_data[exam_event.id]['total_points'] += (points * credits)
-
-    # Calculate SPI for each exam
-    overall_points = 0
-    overall_credits = 0
-    
-    events_list = []
-    for eid, data in exams_data.items():
-        if data['total_credits'] > 0:
-            data['spi'] = round(data['total_points'] / data['total_credits'], 2)
-        
-        overall_points += data['total_points']
-        overall_credits += data['total_credits']
-        events_list.append(data)
-        
-    # Sort events by date descending (Latest First)
-    events_list.sort(key=lambda x: x['event'].start_date, reverse=True)
-
-    cgpi = round(overall_points / overall_credits, 2) if overall_credits > 0 else 0.0
+    # Results with papers, subjects and events in one query, graded per exam event
+    exams, cgpi = grade_results(load_results(student.id))
 
     return render_template('student/academics.html', 
                            student=student, 
-                           exams=events_list, 
+                           exams=exams, 
                            cgpi=cgpi)
 
 @student_bp.route('/academics/marksheet/<int:exam_id>')
 @login_required
 def download_marksheet(exam_id):
-    student = StudentProfile.query.filter_by(user_id=current_user.id).first_or_404()
+    student = current_student_profile()
     
-    results = StudentResult.query.filter_by(student_id=student.id).join(ExamPaper).filter(ExamPaper.exam_event_id == exam_id).all()
+    results = load_results(student.id, exam_event_id=exam_id)
     
     if not results:
         return "Marksheet not found", 404
         
-    exam_event = results[0].paper.exam_event
-    
-    processed_results = []
-    total_credits = 0
-    total_points = 0
-    total_marks_obtained = 0
-    total_max_marks = 0
-    
-    for res in results:
-        marks = res.marks_obtained or 0
-        points = 0
-        grade = 'F'
-        if marks >= 90: points, grade = 10, 'AA'
-        elif marks >= 80: points, grade = 9, 'AB'
-        elif marks >= 70: points, grade = 8, 'BB'
-        elif marks >= 60: points, grade = 7, 'BC'
-        elif marks >= 50: points, grade = 6, 'CC'
-        elif marks >= 40: points, grade = 5, 'CD'
-        else: points, grade = 0, 'FF'
-        
-        # Assuming credits based on weekly lectures
-        credits = res.paper.subject.weekly_lectures or 3
-        
-        processed_results.append({
-            'code': f"SUB{res.paper.subject.id}",
-            'subject': res.paper.subject.name,
-            'marks': marks,
-            'max_marks': res.paper.total_marks,
-            'grade': grade,
-            'points': points,
-            'credits': credits
-        })
-        
-        total_credits += credits
-        total_points += (points * credits)
-        total_marks_obtained += marks
-        total_max_marks += res.paper.total_marks
-
-    spi = round(total_points / total_credits, 2) if total_credits > 0 else 0.0
+    exams, _ = grade_results(results)
+    exam = exams[0]
     
     return render_template('student/marksheet_print.html',
                            student=student,
-                           exam=exam_event,
-                           results=processed_results,
-                           spi=spi,
-                           total_marks_obtained=total_marks_obtained,
-                           total_max_marks=total_max_marks)
+                           exam=exam['event'],
+                           results=exam['results'],
+                           spi=exam['spi'],
+                           total_marks_obtained=exam['marks_obtained'],
+                           total_max_marks=exam['max_marks'])
 
 @student_bp.route('/notes')
 @login_required
 def notes():
-    student = StudentProfile.query.filter_by(user_id=current_user.id).first_or_404()
+    student = current_student_profile()
     
     # Fetch subjects for the student's current semester with syllabus pre-loaded
     from sqlalchemy.orm import joinedload
@@ -321,7 +160,7 @@ def notes():
 @login_required
 def download_syllabus(subject_id):
     # Security: Ensure student is enrolled in this subject's course/sem
-    student = StudentProfile.query.filter_by(user_id=current_user.id).first_or_404()
+    student = current_student_profile()
     syllabus = Syllabus.query.filter_by(subject_id=subject_id).first_or_404()
     
     # Check if subject matches student's academic path
@@ -329,17 +168,12 @@ def download_syllabus(subject_id):
         flash('Unauthorized syllabus access.', 'error')
         return redirect(url_for('student.notes'))
 
-    return send_file(
-        io.BytesIO(syllabus.file_data),
-        mimetype='application/pdf',
-        as_attachment=True,
-        download_name=syllabus.filename
-    )
+    return send_media('syllabus', syllabus.id, as_attachment=True, download_name=syllabus.filename)
 
 @student_bp.route('/events')
 @login_required
 def events():
-    student = StudentProfile.query.filter_by(user_id=current_user.id).first_or_404()
+    student = current_student_profile()
     
     # Fetch upcoming events
     events_list = UniversityEvent.query.filter_by(is_upcoming=True).order_by(UniversityEvent.date).all()
@@ -353,19 +187,14 @@ def events():
 @student_bp.route('/events/image/<int:event_id>')
 def event_image(event_id):
     event = UniversityEvent.query.get_or_404(event_id)
-    if event.image_data:
-        return send_file(
-            io.BytesIO(event.image_data),
-            mimetype=event.image_mimetype or 'image/png',
-            as_attachment=False,
-            download_name=f"event_{event.id}.png"
-        )
+    if event.has_image:
+        return send_media('event_image', event.id, download_name=f"event_{event.id}.png")
     return '', 404
 
 @student_bp.route('/events/register/<int:event_id>', methods=['POST'])
 @login_required
 def register_event(event_id):
-    student = StudentProfile.query.filter_by(user_id=current_user.id).first_or_404()
+    student = current_student_profile()
     
     # Check if existing
     existing = EventRegistration.query.filter_by(student_id=student.id, event_id=event_id).first()
@@ -381,17 +210,18 @@ def register_event(event_id):
 @student_bp.route('/notices')
 @login_required
 def notices():
-    student = StudentProfile.query.filter_by(user_id=current_user.id).first_or_404()
+    student = current_student_profile()
     
-    # Fetch all notices, ordered by latest first
-    all_notices = Notice.query.order_by(Notice.created_at.desc()).all()
+    # Notices addressed to this student, latest first, one page at a time
+    page = notice_page(student_notices(student), current_app.config['NOTICES_PER_PAGE'],
+                       request.args.get('before'))
     
-    return render_template('student/notices.html', student=student, notices=all_notices)
+    return render_template('student/notices.html', student=student, notices=page.items, page=page)
 
 @student_bp.route('/fees')
 @login_required
 def fees():
-    student = StudentProfile.query.filter_by(user_id=current_user.id).first_or_404()
+    student = current_student_profile()
     
     records = FeeRecord.query.filter_by(student_id=student.id).order_by(FeeRecord.due_date.desc()).all()
     
@@ -420,7 +250,7 @@ def pay_fee(fee_id):
 @student_bp.route('/fees/receipt/<int:fee_id>')
 @login_required
 def fee_receipt(fee_id):
-    student = StudentProfile.query.filter_by(user_id=current_user.id).first_or_404()
+    student = current_student_profile()
     fee = FeeRecord.query.get_or_404(fee_id)
     
     if fee.status != 'Paid':
@@ -431,7 +261,7 @@ def fee_receipt(fee_id):
 @student_bp.route('/queries')
 @login_required
 def queries():
-    student = StudentProfile.query.filter_by(user_id=current_user.id).first_or_404()
+    student = current_student_profile()
     
     status_filter = request.args.get('status', 'all')
     
@@ -440,17 +270,17 @@ def queries():
     if status_filter != 'all':
         query = query.filter_by(status=status_filter.capitalize())
         
-    queries = query.order_by(StudentQuery.updated_at.desc()).all()
+    page = request_page(query, [desc(StudentQuery.updated_at), desc(StudentQuery.id)])
     
     # Pre-fetch subjects and faculty for the "Ask Query" modal
     subjects = Subject.query.filter_by(course_name=student.course_name, semester=student.semester).all()
     
-    return render_template('student/queries.html', student=student, queries=queries, filter=status_filter, subjects=subjects)
+    return render_template('student/queries.html', student=student, queries=page.items, page=page, filter=status_filter, subjects=subjects)
 
 @student_bp.route('/queries/create', methods=['POST'])
 @login_required
 def create_query():
-    student = StudentProfile.query.filter_by(user_id=current_user.id).first_or_404()
+    student = current_student_profile()
     
     subject_id = request.form.get('subject_id')
     title = request.form.get('title')
@@ -500,14 +330,39 @@ def create_query():
 @student_bp.route('/queries/<int:query_id>')
 @login_required
 def query_chat(query_id):
-    student = StudentProfile.query.filter_by(user_id=current_user.id).first_or_404()
+    student = current_student_profile()
     query = StudentQuery.query.get_or_404(query_id)
     
     # Security Check
     if query.student_id != student.id:
         return "Unauthorized", 403
         
-    return render_template('student/query_chat.html', student=student, query=query)
+    # Newest messages first, older ones a page at a time (image bytes are never loaded here)
+    page = thread_page(query.id, current_app.config['MESSAGES_PER_PAGE'], request.args.get('before'))
+    return render_template('student/query_chat.html', student=student, query=query, page=page)
+
+@student_bp.route('/queries/<int:query_id>/messages')
+@login_required
+def query_messages(query_id):
+    """Messages after ?since=<message id>, for polling an open chat."""
+    student = current_student_profile()
+    query = StudentQuery.query.get_or_404(query_id)
+    if query.student_id != student.id:
+        return jsonify({'error': 'Unauthorized'}), 403
+
+    since_id = request.args.get('since', 0, type=int)
+    return jsonify(thread_updates(query.id, since_id, 'student', current_app.config['MESSAGES_PER_PAGE']))
+
+@student_bp.route('/queries/<int:query_id>/events')
+@login_required
+def query_events(query_id):
+    """Server-sent events of an open chat (new messages, status changes)."""
+    student = current_student_profile()
+    query = StudentQuery.query.get_or_404(query_id)
+    if query.student_id != student.id:
+        return "Unauthorized", 403
+
+    return event_stream_response(query.id, 'student')
 
 @student_bp.route('/queries/<int:query_id>/message', methods=['POST'])
 @login_required
@@ -547,6 +402,9 @@ def send_message(query_id):
     query.updated_at = datetime.now(timezone.utc)
     db.session.commit()
     
+    # Live chats post in the background and only need the new message back
+    if request.accept_mimetypes.best == 'application/json':
+        return jsonify(message_payload(new_msg, 'student')), 201
     return redirect(url_for('student.query_chat', query_id=query_id))
 
 @student_bp.route('/queries/<int:query_id>/resolve', methods=['POST'])
@@ -561,20 +419,17 @@ def resolve_query(query_id):
 @login_required
 def message_image(message_id):
     msg = QueryMessage.query.get_or_404(message_id)
-    if not msg.image_data:
+    if not msg.has_image:
         print(f"DEBUG: No image data for message {message_id}")
         return "No image", 404
     
     # Simple serve without download_name to avoid forcing download/icon behavior
-    return send_file(
-        io.BytesIO(msg.image_data),
-        mimetype=msg.image_mimetype or 'image/jpeg'
-    )
+    return send_media('message_image', msg.id)
 
 @student_bp.route('/exams')
 @login_required
 def exams():
-    student = StudentProfile.query.filter_by(user_id=current_user.id).first_or_404()
+    student = current_student_profile()
     
     # 1. Upcoming Exams (Schedule)
     # Fetch active exam events for student's course/semester
@@ -586,8 +441,8 @@ def exams():
     
     # 2. Past Results
     # Fetch results grouped by Exam Event
-    # We join Result -> Paper -> Event
-    results = StudentResult.query.filter_by(student_id=student.id).all()
+    # We join Result -> Paper -> Event (and Subject) in one query
+    results = load_results(student.id)
     
     # Group results by Exam Event
     history = {}
@@ -605,14 +460,14 @@ def exams():
 @student_bp.route('/id-card')
 @login_required
 def id_card():
-    student = StudentProfile.query.filter_by(user_id=current_user.id).first_or_404()
+    student = current_student_profile()
     
     return render_template('student/id_card.html', student=student)
 
 @student_bp.route('/id-card/report-lost', methods=['POST'])
 @login_required
 def report_lost_card():
-    student = StudentProfile.query.filter_by(user_id=current_user.id).first_or_404()
+    student = current_student_profile()
     
     student.id_card_status = 'Lost'
     db.session.commit()
@@ -627,115 +482,40 @@ def report_lost_card():
 @student_bp.route('/timetable')
 @login_required
 def timetable():
-    student = StudentProfile.query.filter_by(user_id=current_user.id).first_or_404()
+    student = current_student_profile()
     
-    # Robust Course Name Lookup (Handle Name vs Code mismatch)
-    from app.models import Course
-    
-    # 1. Try exact match first
-    course_query_val = student.course_name
-    
-    # 2. Check if student has Name but Timetable uses Code, or vice versa
-    # Find the Course object definition
-    course_def = Course.query.filter((Course.name == student.course_name) | (Course.code == student.course_name)).first()
-    
-    if course_def:
-        # We need to know what Timetable uses. 
-        # Since Admin standardization, Timetable uses Code. 
-        # But old data might use Name. 
-        # So we try to fetch using Code first (preferred), then Name.
-        
-        # Try finding entries with Code
-        entries = Timetable.query.filter_by(
-            course_name=course_def.code,
-            semester=student.semester
-        ).order_by(Timetable.period_number).all()
-        
-        if not entries:
-            # Fallback: Try finding entries with Name
-            entries = Timetable.query.filter_by(
-                course_name=course_def.name,
-                semester=student.semester
-            ).order_by(Timetable.period_number).all()
-            
-            if entries:
-                # Update student profile to use the working specific identifier (Optional fix)
-                # student.course_name = course_def.name 
-                pass
-    else:
-        # Fallback if Course definition missing
-        entries = Timetable.query.filter_by(
-            course_name=student.course_name,
-            semester=student.semester
-        ).order_by(Timetable.period_number).all()
+    # Resolved grid of the student's class, looked up under the canonical course key
+    grid = student_timetable(student)
     
     # Structure Data: Days -> Slots
     days_order = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
     schedule = {day: [] for day in days_order}
 
-    # Fetch Schedule Settings (Fall back if missing)
-    # Assumes one setting per course/semester
-    from app.models import ScheduleSettings
-    settings = ScheduleSettings.query.filter_by(
-        course_name=student.course_name, 
-        semester=student.semester
-    ).first()
-    
-    # Default: Start 09:00 AM, 1 hour duration if no settings
-    base_start_hour = 9
-    base_start_min = 0
-    slot_duration_min = 60 
-
-    if settings:
-        base_start_hour = settings.start_time.hour
-        base_start_min = settings.start_time.minute
-        # Simplified: derive duration from total time / slots (heuristic)
-        # For now, let's stick to fixed 60 mins or implement better logic if needed
-    
-    from datetime import timedelta, datetime, date
-    
     # Map Full Names (DB) to Abbr (UI)
     day_map = {
         'Monday': 'Mon', 'Tuesday': 'Tue', 'Wednesday': 'Wed', 
         'Thursday': 'Thu', 'Friday': 'Fri', 'Saturday': 'Sat', 'Sunday': 'Sun'
     }
 
-    for entry in entries:
+    # Slots come ordered by period with their times already resolved
+    for slot in grid.slots:
         # Resolve UI Key
-        ui_day = day_map.get(entry.day_of_week, entry.day_of_week) # Fallback to original if not found
+        ui_day = day_map.get(slot.day_of_week, slot.day_of_week) # Fallback to original if not found
         
         if ui_day in schedule:
-            p_idx = entry.period_number - 1 # Period is usually 1-indexed
-            
-            if settings:
-                s_time, e_time = settings.get_period_times(entry.period_number)
-                entry.start_time = s_time
-                entry.end_time = e_time
-            else:
-                start_minutes = (base_start_hour * 60) + base_start_min + (p_idx * slot_duration_min)
-                start_dt = datetime.combine(date.today(), datetime.min.time()) + timedelta(minutes=start_minutes)
-                end_dt = start_dt + timedelta(minutes=slot_duration_min)
-                entry.start_time = start_dt.time()
-                entry.end_time = end_dt.time()
             # Fake room number if missing
-            entry.room_number = "Main Block" 
-            
-            schedule[ui_day].append(entry)
+            schedule[ui_day].append(slot._replace(room_number="Main Block"))
             
     # Remove Sunday if empty
     if not schedule['Sun']:
         del schedule['Sun']
-        
-    # Sort slots within days by period_number
-    for day in schedule:
-        schedule[day].sort(key=lambda x: x.period_number)
             
     return render_template('student/timetable.html', student=student, schedule=schedule)
 
 @student_bp.route('/scholarship', methods=['GET', 'POST'])
 @login_required
 def scholarship():
-    student = StudentProfile.query.filter_by(user_id=current_user.id).first_or_404()
+    student = current_student_profile()
     
     results = []
     searched = False
@@ -827,7 +607,7 @@ from werkzeug.security import generate_password_hash, check_password_hash
 @student_bp.route('/settings', methods=['GET', 'POST'])
 @login_required
 def settings():
-    student = StudentProfile.query.filter_by(user_id=current_user.id).first_or_404()
+    student = current_student_profile()
     
     if request.method == 'POST':
         action = request.form.get('action')
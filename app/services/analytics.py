@@ -0,0 +1,209 @@
+"""
+Aggregation layer for the reporting engine.
+
+The helpers in this module push grouping and counting into SQL so that a
+report costs a fixed number of round trips no matter how large the cohort
+or the result history grows. Routes should only post-process the (small)
+aggregated rows returned here.
+"""
+import math
+from collections import namedtuple
+
+from sqlalchemy import func, case, extract, cast, Integer
+
+from app.extensions import db
+from app.models import (StudentProfile, StudentResult, StudentAcademicSummary, Attendance,
+                        Subject, FacultyProfile, ExamPaper)
+
+# One row per student: how many marks they have and their mean / sample stdev.
+MarkStats = namedtuple('MarkStats', ['student_id', 'name', 'count', 'mean', 'stdev'])
+
+# One row per taught subject: its faculty and the subject's mark statistics.
+SubjectMarkStats = namedtuple('SubjectMarkStats', ['subject_id', 'subject', 'faculty', 'count', 'mean', 'stdev', 'passed'])
+
+# One row per student: attended vs recorded lectures.
+AttendanceTotals = namedtuple('AttendanceTotals', ['student_id', 'name', 'present', 'total'])
+
+
+def stats_from_sums(count, total, total_sq):
+    """Returns (mean, sample stdev) from COUNT / SUM / SUM of squares."""
+    mean = total / count
+    if count < 2:
+        return mean, 0
+    variance = (total_sq - (total * total) / count) / (count - 1)
+    return mean, math.sqrt(max(variance, 0))
+
+
+def student_mark_stats(exclude_zero=False):
+    """
+    Per-student mark statistics in a single grouped query.
+
+    Only students with at least one recorded (non-null) mark are returned,
+    ordered by student id. Pass exclude_zero=True to ignore 0 marks, which is
+    how the career engine has always treated them.
+    """
+    marks = StudentResult.marks_obtained
+    query = db.session.query(
+        StudentProfile.id,
+        StudentProfile.display_name,
+        func.count(marks),
+        func.sum(marks),
+        func.sum(marks * marks)
+    ).join(StudentResult, StudentResult.student_id == StudentProfile.id)\
+     .filter(marks.isnot(None))
+
+    if exclude_zero:
+        query = query.filter(marks != 0)
+
+    rows = query.group_by(StudentProfile.id, StudentProfile.display_name)\
+        .order_by(StudentProfile.id).all()
+
+    stats = []
+    for sid, name, count, total, total_sq in rows:
+        mean, stdev = stats_from_sums(count, total, total_sq)
+        stats.append(MarkStats(sid, name, count, mean, stdev))
+    return stats
+
+
+def summary_mark_stats(min_count=1):
+    """
+    Same shape as student_mark_stats() but read from the materialized
+    overall rows of StudentAcademicSummary (one row per student).
+    """
+    rows = db.session.query(
+        StudentProfile.id,
+        StudentProfile.display_name,
+        StudentAcademicSummary.marks_count,
+        StudentAcademicSummary.marks_sum,
+        StudentAcademicSummary.marks_sq_sum
+    ).join(StudentAcademicSummary, StudentAcademicSummary.student_id == StudentProfile.id)\
+     .filter(StudentAcademicSummary.exam_event_id.is_(None),
+             StudentAcademicSummary.marks_count >= min_count)\
+     .order_by(StudentProfile.id).all()
+
+    stats = []
+    for sid, name, count, total, total_sq in rows:
+        mean, stdev = stats_from_sums(count, total, total_sq)
+        stats.append(MarkStats(sid, name, count, mean, stdev))
+    return stats
+
+
+def summary_global_average():
+    """Institution-wide mark average rolled up from the overall summaries (or None)."""
+    count, total = db.session.query(
+        func.sum(StudentAcademicSummary.marks_count),
+        func.sum(StudentAcademicSummary.marks_sum)
+    ).filter(StudentAcademicSummary.exam_event_id.is_(None)).one()
+    return (total / count) if count else None
+
+
+def global_mark_average():
+    """Average of every recorded mark across the institution (or None)."""
+    return db.session.query(func.avg(StudentResult.marks_obtained))\
+        .filter(StudentResult.marks_obtained.isnot(None)).scalar()
+
+
+def subject_mark_stats(pass_mark=35):
+    """
+    Subject -> faculty -> marks statistics in a single grouped query.
+
+    Only subjects with an assigned faculty and at least one recorded mark are
+    returned, ordered by subject id. `passed` counts marks >= pass_mark.
+    """
+    marks = StudentResult.marks_obtained
+    rows = db.session.query(
+        Subject.id,
+        Subject.name,
+        FacultyProfile.display_name,
+        func.count(marks),
+        func.sum(marks),
+        func.sum(marks * marks),
+        func.sum(case((marks >= pass_mark, 1), else_=0))
+    ).join(FacultyProfile, Subject.faculty_id == FacultyProfile.id)\
+     .join(ExamPaper, ExamPaper.subject_id == Subject.id)\
+     .join(StudentResult, StudentResult.exam_paper_id == ExamPaper.id)\
+     .filter(marks.isnot(None))\
+     .group_by(Subject.id, Subject.name, FacultyProfile.display_name)\
+     .order_by(Subject.id).all()
+
+    stats = []
+    for sub_id, sub_name, fac_name, count, total, total_sq, passed in rows:
+        mean, stdev = stats_from_sums(count, total, total_sq)
+        stats.append(SubjectMarkStats(sub_id, sub_name, fac_name, count, mean, stdev, passed or 0))
+    return stats
+
+
+def project_career(mean, stdev):
+    """
+    Deterministic career / package projection shared by the dashboard and
+    the Future Sight engine. Returns (role, package in LPA).
+    """
+    if mean > 85:
+        if stdev < 5:
+            role, base_pkg = 'Research / PhD', 12.0  # Consistent genius
+        else:
+            role, base_pkg = 'Data Scientist', 18.0  # Spiky genius
+    elif mean > 70:
+        role, base_pkg = 'Full Stack Dev', 8.5
+    elif mean > 60:
+        role, base_pkg = 'Product Manager', 6.5
+    else:
+        role, base_pkg = 'Analyst', 4.5
+
+    # Deterministic variability instead of random to keep dashboards consistent
+    return role, base_pkg + (stdev * 0.1)
+
+
+def present_count_expr():
+    """SUM of 'Present' rows, usable in any grouped attendance query."""
+    return func.sum(case((Attendance.status == 'Present', 1), else_=0))
+
+
+def day_of_week_expr(date_col):
+    """
+    SQL expression for the day of week of a DATE column, numbered like
+    SQLite / Postgres do it: 0 = Sunday ... 6 = Saturday.
+    Use sql_dow_to_weekday() to map it onto Python's date.weekday().
+    """
+    if db.session.get_bind().dialect.name == 'sqlite':
+        return cast(func.strftime('%w', date_col), Integer)
+    return cast(extract('dow', date_col), Integer)
+
+
+def sql_dow_to_weekday(dow):
+    """0 = Sunday (SQL) -> 6, 1 = Monday (SQL) -> 0, like date.weekday()."""
+    return (int(dow) + 6) % 7
+
+
+def attendance_by_weekday():
+    """
+    Institution-wide attendance per weekday in one grouped query.
+    Returns {weekday (0 = Monday): (present, total)}.
+    """
+    dow = day_of_week_expr(Attendance.date)
+    rows = db.session.query(
+        dow,
+        present_count_expr(),
+        func.count(Attendance.id)
+    ).group_by(dow).all()
+    return {sql_dow_to_weekday(d): (present or 0, total) for d, present, total in rows if d is not None}
+
+
+def attendance_totals(student_ids=None):
+    """
+    Present / total attendance per student in one grouped query, ordered by
+    student id. Students without any attendance rows are not returned.
+    """
+    query = db.session.query(
+        StudentProfile.id,
+        StudentProfile.display_name,
+        present_count_expr(),
+        func.count(Attendance.id)
+    ).join(Attendance, Attendance.student_id == StudentProfile.id)
+
+    if student_ids is not None:
+        query = query.filter(StudentProfile.id.in_(student_ids))
+
+    rows = query.group_by(StudentProfile.id, StudentProfile.display_name)\
+        .order_by(StudentProfile.id).all()
+    return [AttendanceTotals(sid, name, present or 0, total) for sid, name, present, total in rows]
@@ -0,0 +1,250 @@
+"""
+Maintenance of the materialized AttendanceCounter table behind the student
+attendance page.
+
+Only the counter rows a write touched are refreshed, each from its own raw
+rows (one student's attendance in one subject, read through the
+uq_attendance_student_subject_date index) rather than the student's whole
+history; everything can be rebuilt from manage.py. The faculty
+low-attendance panel and the admin truancy report read their
+below-threshold students from the counters. Legacy rows without a subject
+are stored per weekday and expanded over the class timetable when read, so
+timetable edits never leave the counters stale.
+
+ORM writes to Attendance are picked up automatically by the session hooks
+installed in register_attendance_counter_hooks(); bulk (Core) writes must call
+refresh_attendance_counters() themselves.
+
+Counter keys are (student_id, subject_id, weekday): weekday is None on
+subject rows, subject_id is None on legacy rows.
+"""
+from collections import namedtuple
+
+from sqlalchemy import event, func, inspect, tuple_
+from sqlalchemy.orm import Session
+
+from app.extensions import db
+from app.models import Attendance, AttendanceCounter, StudentProfile, Subject, Timetable
+from app.services.analytics import AttendanceTotals, present_count_expr, day_of_week_expr, sql_dow_to_weekday
+
+WEEKDAYS = {'Mon': 0, 'Tue': 1, 'Wed': 2, 'Thu': 3, 'Fri': 4, 'Sat': 5, 'Sun': 6}
+
+# Minimum attendance percentage
+ATTENDANCE_THRESHOLD = 75
+
+LowAttendance = namedtuple('LowAttendance', ['student', 'present', 'total'])
+
+
+def _aggregate_attendance(student_ids=None):
+    """
+    Counts raw attendance in one grouped query.
+    Returns {(student_id, subject_id, weekday): [present, total]}, where
+    subject rows have weekday None and legacy rows have subject_id None.
+    """
+    dow = day_of_week_expr(Attendance.date)
+    query = db.session.query(
+        Attendance.student_id,
+        Attendance.subject_id,
+        dow,
+        present_count_expr(),
+        func.count(Attendance.id)
+    )
+    if student_ids is not None:
+        query = query.filter(Attendance.student_id.in_(student_ids))
+
+    counts = {}
+    for sid, sub_id, day, present, total in query.group_by(Attendance.student_id, Attendance.subject_id, dow).all():
+        # Only legacy rows need their weekday
+        key = (sid, sub_id, None) if sub_id is not None else (sid, None, sql_dow_to_weekday(day))
+        totals = counts.setdefault(key, [0, 0])
+        totals[0] += present or 0
+        totals[1] += total
+    return counts
+
+
+def _aggregate_keys(keys, session):
+    """_aggregate_attendance() restricted to the raw rows behind the given counter keys."""
+    counts = {}
+    subject_pairs = {(sid, sub_id) for sid, sub_id, _ in keys if sub_id is not None}
+    if subject_pairs:
+        rows = session.query(
+            Attendance.student_id, Attendance.subject_id, present_count_expr(), func.count(Attendance.id)
+        ).filter(
+            tuple_(Attendance.student_id, Attendance.subject_id).in_(subject_pairs)
+        ).group_by(Attendance.student_id, Attendance.subject_id)
+        for sid, sub_id, present, total in rows:
+            counts[(sid, sub_id, None)] = [present or 0, total]
+
+    # Legacy rows are few: count the students' day-based rows and keep the weekdays asked for
+    legacy_students = {sid for sid, sub_id, _ in keys if sub_id is None}
+    if legacy_students:
+        dow = day_of_week_expr(Attendance.date)
+        rows = session.query(
+            Attendance.student_id, dow, present_count_expr(), func.count(Attendance.id)
+        ).filter(
+            Attendance.student_id.in_(legacy_students), Attendance.subject_id.is_(None)
+        ).group_by(Attendance.student_id, dow)
+        for sid, day, present, total in rows:
+            key = (sid, None, sql_dow_to_weekday(day))
+            if key in keys:
+                counts[key] = [present or 0, total]
+    return counts
+
+
+def refresh_attendance_counters(keys, session=None):
+    """
+    Recomputes the counter rows of the given (student_id, subject_id, weekday)
+    keys from their own raw rows, in `session` (default db.session).
+    Caller is responsible for committing.
+    """
+    session = session or db.session
+    keys = {key for key in keys if key[0] is not None}
+    if not keys:
+        return
+
+    fresh = _aggregate_keys(keys, session)
+    existing = session.query(AttendanceCounter).filter(
+        AttendanceCounter.student_id.in_({sid for sid, _, _ in keys})
+    ).all()
+    existing_map = {
+        (row.student_id, row.subject_id, row.weekday): row for row in existing
+        if (row.student_id, row.subject_id, row.weekday) in keys
+    }
+
+    for key, (present, total) in fresh.items():
+        row = existing_map.pop(key, None)
+        if not row:
+            row = AttendanceCounter(student_id=key[0], subject_id=key[1], weekday=key[2])
+            session.add(row)
+        row.present, row.total = present, total
+
+    # Anything left no longer has attendance behind it
+    for row in existing_map.values():
+        session.delete(row)
+
+
+def rebuild_attendance_counters():
+    """Drops and recomputes every counter row. Returns the number of rows written."""
+    AttendanceCounter.query.delete()
+    counts = _aggregate_attendance()
+    db.session.add_all([
+        AttendanceCounter(student_id=sid, subject_id=sub_id, weekday=day, present=present, total=total)
+        for (sid, sub_id, day), (present, total) in counts.items()
+    ])
+    db.session.commit()
+    return len(counts)
+
+
+def subject_attendance(student):
+    """
+    Subject-wise attendance of a student's current class from the counters.
+    Legacy day-based records count once for every timetable slot of a
+    subject on that weekday. Returns {subject_id: {name, total, present}}.
+    """
+    subjects = Subject.query.filter_by(course_name=student.course_name, semester=student.semester).all()
+    stats = {sub.id: {'name': sub.name, 'total': 0, 'present': 0} for sub in subjects}
+
+    counters = AttendanceCounter.query.filter_by(student_id=student.id).all()
+    legacy = {row.weekday: row for row in counters if row.subject_id is None}
+
+    for row in counters:
+        if row.subject_id in stats:
+            stats[row.subject_id]['total'] += row.total
+            stats[row.subject_id]['present'] += row.present
+
+    if legacy:
+        slots = db.session.query(Timetable.day_of_week, Timetable.subject_id).filter_by(
+            course_name=student.course_name, semester=student.semester
+        ).all()
+        for day_name, sub_id in slots:
+            row = legacy.get(WEEKDAYS.get(day_name))
+            if row and sub_id in stats:
+                stats[sub_id]['total'] += row.total
+                stats[sub_id]['present'] += row.present
+    return stats
+
+
+def _below(present, total, threshold):
+    # present / total < threshold %, in integers
+    return present * 100 < total * threshold
+
+
+def low_attendance(subject, threshold=ATTENDANCE_THRESHOLD):
+    """
+    Students of the subject's class below `threshold` % in that subject,
+    ordered by enrollment number. Students with no lectures marked yet are
+    not listed.
+    """
+    rows = db.session.query(StudentProfile, AttendanceCounter.present, AttendanceCounter.total).join(
+        AttendanceCounter, AttendanceCounter.student_id == StudentProfile.id
+    ).filter(
+        AttendanceCounter.subject_id == subject.id,
+        AttendanceCounter.weekday.is_(None),
+        StudentProfile.course_name == subject.course_name,
+        StudentProfile.semester == subject.semester,
+        AttendanceCounter.total > 0,
+        _below(AttendanceCounter.present, AttendanceCounter.total, threshold)
+    ).order_by(StudentProfile.enrollment_number).all()
+    return [LowAttendance(student, present, total) for student, present, total in rows]
+
+
+def students_below_threshold(threshold=ATTENDANCE_THRESHOLD):
+    """
+    AttendanceTotals of every student whose overall attendance (all subjects
+    and legacy records) is below `threshold` %, ordered by student id.
+    """
+    present, total = func.sum(AttendanceCounter.present), func.sum(AttendanceCounter.total)
+    rows = db.session.query(StudentProfile.id, StudentProfile.display_name, present, total).join(
+        AttendanceCounter, AttendanceCounter.student_id == StudentProfile.id
+    ).group_by(StudentProfile.id, StudentProfile.display_name).having(
+        total > 0, _below(present, total, threshold)
+    ).order_by(StudentProfile.id).all()
+    return [AttendanceTotals(sid, name, p, t) for sid, name, p, t in rows]
+
+
+# --- Automatic refresh on commit ---
+
+def counter_key(student_id, subject_id, on_date):
+    """The counter row an attendance record is counted in."""
+    if subject_id is not None:
+        return (student_id, subject_id, None)
+    return (student_id, None, on_date.weekday() if on_date else None)
+
+
+def _track_attendance_changes(session, flush_context):
+    """after_flush: remember which counter rows the written attendance belongs to."""
+    dirty = session.info.setdefault('attendance_dirty', set())
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if not isinstance(obj, Attendance):
+            continue
+        # Edited records also leave the counter of their previous student / subject / date
+        attrs = inspect(obj).attrs
+        for sid in {obj.student_id, *(attrs.student_id.history.deleted or ())}:
+            for sub_id in {obj.subject_id, *(attrs.subject_id.history.deleted or ())}:
+                for on_date in {obj.date, *(attrs.date.history.deleted or ())}:
+                    dirty.add(counter_key(sid, sub_id, on_date))
+
+
+def _refresh_before_commit(session):
+    """before_commit: fold the tracked attendance changes into the counters."""
+    session.flush()
+    dirty = session.info.pop('attendance_dirty', None)
+    if not dirty:
+        return
+
+    refresh_attendance_counters(dirty, session=session)
+    session.flush()
+    session.info.pop('attendance_dirty', None)
+
+
+def _discard_tracked_changes(session, previous_transaction):
+    session.info.pop('attendance_dirty', None)
+
+
+def register_attendance_counter_hooks():
+    """Installs the session hooks (idempotent, safe to call per app)."""
+    if event.contains(Session, 'after_flush', _track_attendance_changes):
+        return
+    event.listen(Session, 'after_flush', _track_attendance_changes)
+    event.listen(Session, 'before_commit', _refresh_before_commit)
+    event.listen(Session, 'after_soft_rollback', _discard_tracked_changes)
@@ -0,0 +1,65 @@
+"""
+Bulk writer for a class's attendance sheet.
+
+Saving a sheet reads the (subject, date) rows already stored with one query,
+works out in memory which students are new and whose status changed, then
+writes them as two executemany statements: an upsert
+(INSERT ... ON CONFLICT on uq_attendance_student_subject_date, so a
+concurrent save of the same sheet can't create duplicates) and a bulk
+UPDATE by primary key. Unchanged rows are not written at all.
+
+The statements bypass the ORM flush, so the attendance counters of the
+students written are refreshed here. Response caches watching Attendance
+are invalidated by their do_orm_execute hook on commit.
+"""
+from collections import namedtuple
+
+from sqlalchemy import update
+
+from app.extensions import db
+from app.models import Attendance
+from app.services.attendance_counters import refresh_attendance_counters
+from app.services.bulk import upsert
+
+# Rows written by write_attendance()
+AttendanceWrite = namedtuple('AttendanceWrite', ['inserted', 'updated', 'unchanged'])
+
+
+def write_attendance(subject, on_date, statuses, faculty_id=None):
+    """
+    Stores one sheet: `statuses` maps student id -> status for `subject` on
+    `on_date`. Caller is responsible for committing. Returns an AttendanceWrite.
+    """
+    if not statuses:
+        return AttendanceWrite(0, 0, 0)
+
+    # 1. Everything already marked for this lecture, in one query
+    existing = {
+        student_id: (att_id, status)
+        for att_id, student_id, status in db.session.query(
+            Attendance.id, Attendance.student_id, Attendance.status
+        ).filter(Attendance.subject_id == subject.id, Attendance.date == on_date)
+    }
+
+    # 2. Inserts and changed statuses, decided in memory
+    inserts, updates, unchanged = [], [], 0
+    for student_id, status in statuses.items():
+        if student_id not in existing:
+            inserts.append({
+                'student_id': student_id, 'course_name': subject.course_name, 'date': on_date,
+                'status': status, 'subject_id': subject.id, 'faculty_id': faculty_id,
+            })
+        elif existing[student_id][1] != status:
+            updates.append({'id': existing[student_id][0], 'status': status})
+        else:
+            unchanged += 1
+
+    # 3. Two batched statements at most
+    upsert(Attendance, inserts, ['student_id', 'subject_id', 'date'], ['status'])
+    if updates:
+        db.session.execute(update(Attendance), updates)
+
+    written = [row['student_id'] for row in inserts] + \
+        [sid for sid, status in statuses.items() if sid in existing and existing[sid][1] != status]
+    refresh_attendance_counters({(sid, subject.id, None) for sid in written})
+    return AttendanceWrite(len(inserts), len(updates), unchanged)
@@ -0,0 +1,36 @@
+"""
+Batched INSERT ... ON CONFLICT for the bulk writers (attendance sheets,
+marks entry).
+
+Rows go through session.execute as one executemany statement, so the
+response caches still see the write (do_orm_execute) but the flush hooks do
+not: callers refresh their own materialized counters / summaries.
+"""
+from sqlalchemy import insert
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.extensions import db
+
+UPSERT_DIALECTS = {'sqlite': sqlite.insert, 'postgresql': postgresql.insert}
+
+
+def upsert(model, rows, keys, fields=None):
+    """
+    Inserts `rows` (dicts) into `model`. On a conflict on the unique `keys`
+    the existing row gets the incoming `fields`, or is left alone if no
+    fields are given. Dialects without ON CONFLICT get a plain INSERT.
+    """
+    if not rows:
+        return
+    dialect_insert = UPSERT_DIALECTS.get(db.session.get_bind().dialect.name)
+    if dialect_insert is None:
+        db.session.execute(insert(model), rows)
+        return
+    stmt = dialect_insert(model)
+    if fields:
+        stmt = stmt.on_conflict_do_update(
+            index_elements=keys, set_={field: stmt.excluded[field] for field in fields}
+        )
+    else:
+        stmt = stmt.on_conflict_do_nothing(index_elements=keys)
+    db.session.execute(stmt, rows)
@@ -0,0 +1,344 @@
+"""
+Small pluggable cache used to serve expensive, read-mostly JSON endpoints.
+
+Entries are keyed by endpoint name, query string and the current *data
+version*. The version is bumped (and the backend cleared) whenever a
+watched model is written, so a response computed from stale data can never
+be served again, even if it was stored after the invalidation.
+
+The version lives in a VERSION file, so a write committed on one worker
+invalidates the entries of every worker on the host, whichever backend
+holds them.
+
+Backends:
+    memory      in-process LRU (default); drops its entries when the shared version moves
+    filesystem  pickled entries in a directory, shared by all workers
+    null        caching disabled
+
+Configuration (prefix is REPORT_CACHE for the report cache):
+    <PREFIX>_BACKEND        'memory' | 'filesystem' | 'null'
+    <PREFIX>_TTL            seconds an entry stays valid (default 300)
+    <PREFIX>_MAX_ENTRIES    LRU size for the memory backend (default 128)
+    <PREFIX>_DIR            directory of the VERSION file and filesystem entries
+                            (default: <instance>/<prefix>)
+"""
+import os
+import time
+import uuid
+import pickle
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import wraps
+
+from flask import request, make_response
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+
+class VersionFile:
+    """Data version kept in a file, so every worker process sees a bump."""
+
+    def __init__(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, 'VERSION')
+
+    def get(self):
+        try:
+            with open(self.path) as f:
+                return f.read().strip() or 'initial'
+        except OSError:
+            return 'initial'
+
+    def bump(self):
+        # Write then rename, so readers never see a half written version
+        tmp_path = f"{self.path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(uuid.uuid4().hex)
+        os.replace(tmp_path, self.path)
+
+
+class MemoryBackend:
+    """
+    Thread-safe in-process LRU. With a `version_dir` the version is shared
+    (VersionFile) and entries stored under an older one are dropped on the
+    next lookup, whichever worker bumped it.
+    """
+    name = 'memory'
+
+    def __init__(self, max_entries=128, version_dir=None):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._version_file = VersionFile(version_dir) if version_dir else None
+        self._version = self._version_file.get() if self._version_file else uuid.uuid4().hex
+
+    def get(self, key):
+        self.get_version()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (time.time() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get_version(self):
+        if self._version_file is not None:
+            version = self._version_file.get()
+            if version != self._version:
+                # Another worker invalidated: nothing stored here is current any more
+                with self._lock:
+                    self._entries.clear()
+                    self._version = version
+        return self._version
+
+    def bump_version(self):
+        if self._version_file is not None:
+            self._version_file.bump()
+            self.get_version()
+        else:
+            self._version = uuid.uuid4().hex
+
+
+class FileSystemBackend:
+    """One pickle file per entry; the version lives in a file so every worker sees it."""
+    name = 'filesystem'
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._version_file = VersionFile(directory)
+
+    def _path(self, key):
+        return os.path.join(self.directory, hashlib.sha1(key.encode('utf-8')).hexdigest() + '.cache')
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                expires_at, value = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+        if expires_at < time.time():
+            self._remove(path)
+            return None
+        return value
+
+    def set(self, key, value, ttl):
+        # Write then rename, so readers never see a half written entry
+        path = self._path(key)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump((time.time() + ttl, value), f)
+        os.replace(tmp_path, path)
+
+    def clear(self):
+        for filename in os.listdir(self.directory):
+            if filename.endswith('.cache'):
+                self._remove(os.path.join(self.directory, filename))
+
+    def __len__(self):
+        return len([f for f in os.listdir(self.directory) if f.endswith('.cache')])
+
+    def get_version(self):
+        return self._version_file.get()
+
+    def bump_version(self):
+        self._version_file.bump()
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+class NullBackend:
+    """Never stores anything (REPORT_CACHE_BACKEND = 'null')."""
+    name = 'null'
+
+    def get(self, key):
+        return None
+
+    def set(self, key, value, ttl):
+        pass
+
+    def clear(self):
+        pass
+
+    def __len__(self):
+        return 0
+
+    def get_version(self):
+        return 'null'
+
+    def bump_version(self):
+        pass
+
+
+class ResponseCache:
+    """
+    Flask extension: `cache.init_app(app)`, then decorate views with
+    `@cache.cached('name')` and call `cache.watch(Model, ...)` once so that
+    ORM writes to those models invalidate every entry.
+    """
+
+    def __init__(self, config_prefix='REPORT_CACHE'):
+        self.config_prefix = config_prefix
+        self.backend = MemoryBackend()
+        self.ttl = 300
+        self._stats_lock = threading.Lock()
+        self.reset_stats()
+
+    def init_app(self, app):
+        prefix = self.config_prefix
+        backend = app.config.get(f'{prefix}_BACKEND', 'memory')
+        self.ttl = app.config.get(f'{prefix}_TTL', 300)
+
+        directory = app.config.get(f'{prefix}_DIR') or \
+            os.path.join(app.instance_path, prefix.lower())
+        if backend == 'memory':
+            self.backend = MemoryBackend(app.config.get(f'{prefix}_MAX_ENTRIES', 128), directory)
+        elif backend == 'filesystem':
+            self.backend = FileSystemBackend(directory)
+        elif backend == 'null':
+            self.backend = NullBackend()
+        else:
+            raise ValueError(f"Unknown {prefix}_BACKEND: {backend!r}")
+
+        app.extensions[prefix.lower()] = self
+
+    # --- Stats ---
+
+    def reset_stats(self):
+        with self._stats_lock:
+            self._stats = {'hits': 0, 'misses': 0, 'invalidations': 0}
+
+    def _count(self, name):
+        with self._stats_lock:
+            self._stats[name] += 1
+
+    def stats(self):
+        with self._stats_lock:
+            stats = dict(self._stats)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups * 100, 1) if lookups else 0
+        stats['entries'] = len(self.backend)
+        stats['backend'] = self.backend.name
+        stats['ttl'] = self.ttl
+        return stats
+
+    # --- Core API ---
+
+    @property
+    def version(self):
+        return self.backend.get_version()
+
+    def get(self, key):
+        value = self.backend.get(key)
+        self._count('hits' if value is not None else 'misses')
+        return value
+
+    def set(self, key, value, ttl=None):
+        self.backend.set(key, value, self.ttl if ttl is None else ttl)
+
+    def invalidate(self):
+        """Drops every entry. Call after bulk (Core) writes the ORM hooks cannot see."""
+        self.backend.bump_version()
+        self.backend.clear()
+        self._count('invalidations')
+
+    def cached(self, name):
+        """
+        Caches a view's 200 response body per query string and data version.
+        Responses carry an X-Cache: HIT / MISS header.
+        """
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                # Read the version *before* computing, so a write that lands
+                # mid-request leaves this entry under an already dead key
+                key = f"{name}:{self.version}:{request.query_string.decode('utf-8')}"
+                entry = self.get(key)
+                if entry is not None:
+                    body, mimetype = entry
+                    response = make_response(body)
+                    response.mimetype = mimetype
+                    response.headers['X-Cache'] = 'HIT'
+                    return response
+
+                response = make_response(view(*args, **kwargs))
+                if response.status_code == 200 and not response.direct_passthrough:
+                    self.set(key, (response.get_data(), response.mimetype))
+                response.headers['X-Cache'] = 'MISS'
+                return response
+            return wrapper
+        return decorator
+
+    def watch(self, *models):
+        """Invalidates this cache whenever a commit wrote one of `models` through the ORM."""
+        _WATCHED.setdefault(self, set()).update(models)
+        _register_hooks()
+
+
+# --- Invalidation hooks (one set of session listeners for every cache) ---
+
+_WATCHED = {}
+
+
+def _mark_dirty(session, caches):
+    if caches:
+        session.info.setdefault('dirty_caches', set()).update(caches)
+
+
+def _track_writes(session, flush_context):
+    """after_flush: note which caches the flushed objects belong to."""
+    touched = {type(obj) for obj in list(session.new) + list(session.dirty) + list(session.deleted)}
+    _mark_dirty(session, [cache for cache, models in _WATCHED.items() if touched & models])
+
+
+def _track_bulk_writes(orm_execute_state):
+    """do_orm_execute: Model.query.filter(...).delete() / update() bypass the flush."""
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete or orm_execute_state.is_insert):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is None:
+        return
+    _mark_dirty(orm_execute_state.session,
+                [cache for cache, models in _WATCHED.items() if mapper.class_ in models])
+
+
+def _invalidate_after_commit(session):
+    for cache in session.info.pop('dirty_caches', ()):
+        cache.invalidate()
+
+
+def _discard_after_rollback(session, previous_transaction):
+    session.info.pop('dirty_caches', None)
+
+
+def _register_hooks():
+    if event.contains(Session, 'after_flush', _track_writes):
+        return
+    event.listen(Session, 'after_flush', _track_writes)
+    event.listen(Session, 'do_orm_execute', _track_bulk_writes)
+    event.listen(Session, 'after_commit', _invalidate_after_commit)
+    event.listen(Session, 'after_soft_rollback', _discard_after_rollback)
@@ -0,0 +1,108 @@
+"""
+Canonical course identifiers.
+
+`course_name` columns (students, subjects, timetables, exam events, schedule
+settings, class notices) may hold either a Course's code or its name. The
+course index maps every alias, case and surrounding spaces ignored, to the
+course's canonical key, its code, in one dict lookup. The index is loaded
+with a single query and kept in `course_cache`, which drops it on every
+worker whenever a Course is added, edited or deleted. A value the index
+does not know reloads it first (at most once per RELOAD_ON_MISS_INTERVAL),
+so a course committed a moment ago is not stored under a non-canonical
+alias.
+
+A before_flush hook stores the canonical key on every new or changed row,
+and `flask normalize-courses` (manage.py) rewrites existing rows, so
+lookups by course are a plain indexed equality.
+"""
+import time
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.extensions import db, course_cache
+from app.models import Course, StudentProfile, Subject, Timetable, ExamEvent, ScheduleSettings, Notice
+
+# Model -> attribute holding a course identifier
+COURSE_FIELDS = {
+    StudentProfile: 'course_name',
+    Subject: 'course_name',
+    Timetable: 'course_name',
+    ExamEvent: 'course_name',
+    ScheduleSettings: 'course_name',
+    Notice: 'target_course',
+}
+
+# Seconds between index reloads for unknown aliases (legacy free text misses every time)
+RELOAD_ON_MISS_INTERVAL = 1.0
+_last_miss_reload = 0.0
+
+
+def _alias(value):
+    return value.strip().casefold()
+
+
+def course_index(reload=False):
+    """{alias: course code} of every Course, loaded once per Course change (or when `reload`)."""
+    index = None if reload else course_cache.get('index')
+    if index is None:
+        with db.session.no_autoflush:
+            courses = db.session.query(Course.code, Course.name).all()
+        index = {}
+        # Names first: a code always wins over another course's identical name
+        for code, name in courses:
+            index[_alias(name)] = code
+        for code, name in courses:
+            index[_alias(code)] = code
+        course_cache.set('index', index)
+    return index
+
+
+def canonical_course(course_name):
+    """The canonical key (Course.code) of a course code or name; unknown values are returned as given."""
+    if not course_name:
+        return course_name
+    global _last_miss_reload
+    alias = _alias(course_name)
+    index = course_index()
+    if alias not in index and time.monotonic() - _last_miss_reload >= RELOAD_ON_MISS_INTERVAL:
+        # Possibly a course this worker's index has not seen yet
+        _last_miss_reload = time.monotonic()
+        index = course_index(reload=True)
+    return index.get(alias, course_name)
+
+
+def normalize_course_names():
+    """Rewrites every stored course identifier to its canonical key. Returns {table: rows updated}."""
+    updated = {}
+    for model, attr in COURSE_FIELDS.items():
+        column = getattr(model, attr)
+        count = 0
+        for (value,) in db.session.query(column).distinct().all():
+            canonical = canonical_course(value)
+            if canonical != value:
+                count += model.query.filter(column == value).update({column: canonical}, synchronize_session=False)
+        updated[model.__tablename__] = count
+    db.session.commit()
+    return updated
+
+
+# --- Canonical keys on ORM writes ---
+
+def _canonicalize_course_fields(session, flush_context, instances):
+    """before_flush: new or edited rows store the canonical course key."""
+    for obj in list(session.new) + list(session.dirty):
+        attr = COURSE_FIELDS.get(type(obj))
+        if attr is None:
+            continue
+        value = getattr(obj, attr)
+        canonical = canonical_course(value)
+        if canonical != value:
+            setattr(obj, attr, canonical)
+
+
+def register_course_hooks():
+    """Installs the session hook (idempotent)."""
+    if event.contains(Session, 'before_flush', _canonicalize_course_fields):
+        return
+    event.listen(Session, 'before_flush', _canonicalize_course_fields)
@@ -0,0 +1,89 @@
+"""
+Student dashboard widgets.
+
+Each widget is an independent provider: a function of the student returning
+small, picklable data, with its own time-to-live. Results are kept per
+student (or once for everyone, for shared widgets) in `dashboard_cache`.
+The cache also drops every entry, on every worker, on ORM writes to the
+models the widgets read, so a TTL only bounds drift nobody wrote, such as
+"next event" across midnight.
+
+The dashboard page and /student/dashboard/widgets, which returns every
+widget in one JSON round trip, both go through `load_widgets`.
+"""
+from collections import namedtuple
+from datetime import date
+
+from app.extensions import dashboard_cache
+from app.models import UniversityEvent, FeeRecord
+from app.services.grading import latest_exam_spi
+from app.services.notices import student_notices
+
+NoticeCard = namedtuple('NoticeCard', ['id', 'title', 'content', 'category', 'created_at'])
+EventCard = namedtuple('EventCard', ['id', 'title', 'date', 'location'])
+
+# shared: one entry for every student
+Widget = namedtuple('Widget', ['name', 'ttl', 'shared', 'load'])
+
+
+def _attendance(student):
+    return student.get_overall_attendance()
+
+
+def _notices(student):
+    return [NoticeCard(n.id, n.title, n.content, n.category, n.created_at)
+            for n in student_notices(student).limit(4).all()]
+
+
+def _next_event(student):
+    event = UniversityEvent.query.filter(
+        UniversityEvent.date >= date.today()
+    ).order_by(UniversityEvent.date).first()
+    return EventCard(event.id, event.title, event.date, event.location) if event else None
+
+
+def _pending_fees(student):
+    return FeeRecord.query.filter_by(student_id=student.id, status='Pending').count()
+
+
+def _latest_spi(student):
+    return latest_exam_spi(student.id)
+
+
+WIDGETS = {widget.name: widget for widget in (
+    Widget('attendance', 300, False, _attendance),
+    Widget('notices', 120, False, _notices),
+    Widget('next_event', 600, True, _next_event),
+    Widget('pending_fees', 300, False, _pending_fees),
+    Widget('latest_spi', 3600, False, _latest_spi),
+)}
+
+
+def load_widgets(student, names=None):
+    """{name: data} of the requested widgets (all by default), served from cache while fresh."""
+    # Versioned keys: entries built before a watched write are never read again
+    suffix = f"{date.today().isoformat()}:{dashboard_cache.version}"
+    data = {}
+    for name in names or WIDGETS:
+        widget = WIDGETS[name]
+        key = f"{name}:{'shared' if widget.shared else student.id}:{suffix}"
+        entry = dashboard_cache.get(key)
+        if entry is None:
+            # Boxed, so that a None / 0 result is still a cache hit
+            entry = (widget.load(student),)
+            dashboard_cache.set(key, entry, widget.ttl)
+        data[name] = entry[0]
+    return data
+
+
+def widgets_json(data):
+    """load_widgets() output as JSON-ready values (cards as objects, dates as ISO strings)."""
+    def convert(value):
+        if isinstance(value, tuple) and hasattr(value, '_asdict'):
+            return {k: convert(v) for k, v in value._asdict().items()}
+        if isinstance(value, list):
+            return [convert(v) for v in value]
+        if isinstance(value, date):
+            return value.isoformat()
+        return value
+    return {name: convert(value) for name, value in data.items()}
@@ -0,0 +1,129 @@
+"""
+Grade-point ladder shared by the student views and the academic summaries,
+and the grading engine behind the student academics, marksheet and dashboard
+pages.
+"""
+from sqlalchemy import case, func
+from sqlalchemy.orm import contains_eager
+
+from app.models import StudentResult, ExamPaper, ExamEvent, StudentAcademicSummary
+
+# (minimum marks, grade points, grade) from the highest band down.
+# Anything below the last band is a fail: 0 points, 'FF'.
+GRADE_LADDER = [
+    (90, 10, 'AA'),
+    (80, 9, 'AB'),
+    (70, 8, 'BB'),
+    (60, 7, 'BC'),
+    (50, 6, 'CC'),
+    (40, 5, 'CD'),
+]
+FAIL_POINTS, FAIL_GRADE = 0, 'FF'
+
+DEFAULT_CREDITS = 3
+
+
+def grade_for(marks):
+    """Returns (points, grade) for the given marks (None counts as 0)."""
+    marks = marks or 0
+    for minimum, points, grade in GRADE_LADDER:
+        if marks >= minimum:
+            return points, grade
+    return FAIL_POINTS, FAIL_GRADE
+
+
+def subject_credits(subject):
+    # Credits are derived from weekly lectures, falling back to 3
+    return subject.weekly_lectures or DEFAULT_CREDITS
+
+
+def grade_points_expr(marks_col):
+    """SQL CASE expression mirroring grade_for() for use in aggregates."""
+    marks = func.coalesce(marks_col, 0)
+    return case(
+        *[(marks >= minimum, points) for minimum, points, _ in GRADE_LADDER],
+        else_=FAIL_POINTS
+    )
+
+
+def subject_credits_expr(weekly_lectures_col):
+    """SQL expression mirroring subject_credits() (NULL or 0 -> default)."""
+    return func.coalesce(func.nullif(weekly_lectures_col, 0), DEFAULT_CREDITS)
+
+
+def load_results(student_id, exam_event_id=None):
+    """A student's results with their papers, subjects and exam events, in one joined query."""
+    query = StudentResult.query\
+        .join(StudentResult.paper)\
+        .join(ExamPaper.exam_event)\
+        .join(ExamPaper.subject)\
+        .options(
+            contains_eager(StudentResult.paper).contains_eager(ExamPaper.exam_event),
+            contains_eager(StudentResult.paper).contains_eager(ExamPaper.subject)
+        ).filter(StudentResult.student_id == student_id)
+    if exam_event_id is not None:
+        query = query.filter(ExamPaper.exam_event_id == exam_event_id)
+    return query.order_by(StudentResult.id).all()
+
+
+def spi(total_points, total_credits):
+    return round(total_points / total_credits, 2) if total_credits else 0.0
+
+
+def grade_results(results):
+    """
+    Grades loaded results in one pass.
+    Returns (exams, cgpi) where exams has one dict per exam event, latest first,
+    holding its graded rows, credit / point / mark totals and SPI.
+    """
+    exams = {}
+    total_credits = total_points = 0
+
+    for res in results:
+        paper, subject = res.paper, res.paper.subject
+        exam = exams.get(paper.exam_event_id)
+        if exam is None:
+            exam = exams[paper.exam_event_id] = {
+                'event': paper.exam_event,
+                'results': [],
+                'total_credits': 0,
+                'total_points': 0,
+                'marks_obtained': 0,
+                'max_marks': 0,
+                'spi': 0.0
+            }
+
+        marks = res.marks_obtained or 0
+        points, grade = grade_for(marks)
+        credits = subject_credits(subject)
+
+        exam['results'].append({
+            'code': f"SUB{subject.id}",
+            'subject': subject.name,
+            'marks': marks,
+            'max_marks': paper.total_marks,
+            'grade': grade,
+            'points': points,
+            'credits': credits
+        })
+        exam['total_credits'] += credits
+        exam['total_points'] += points * credits
+        exam['marks_obtained'] += marks
+        exam['max_marks'] += paper.total_marks
+        total_credits += credits
+        total_points += points * credits
+
+    for exam in exams.values():
+        exam['spi'] = spi(exam['total_points'], exam['total_credits'])
+
+    # Latest first
+    exams_list = sorted(exams.values(), key=lambda e: e['event'].start_date, reverse=True)
+    return exams_list, spi(total_points, total_credits)
+
+
+def latest_exam_spi(student_id):
+    """SPI of the student's latest exam event, read from the materialized summaries."""
+    latest = StudentAcademicSummary.query.join(ExamEvent).filter(
+        StudentAcademicSummary.student_id == student_id
+    ).order_by(ExamEvent.start_date.desc()).first()
+    return latest.spi if latest else 0.0
@@ -0,0 +1,66 @@
+"""
+Faculty lecture ledger: every scheduled lecture (timetable slot x date) over
+a date range, newest first, with whether its attendance has been marked.
+
+Lectures come from the timetable and the calendar, not from stored rows, so
+the ledger is counted per weekday without being built, and only the
+requested page is materialized. Marked / pending status for that page comes
+from one grouped query over Attendance (subject_id, date).
+"""
+from collections import namedtuple
+
+from app.extensions import db
+from app.models import Attendance
+
+Lecture = namedtuple('Lecture', ['date', 'date_str', 'subject', 'time', 'status'])
+# Same fields the attendance template reads from its `pagination` dict
+LedgerPage = namedtuple('LedgerPage', ['items', 'page', 'total_pages', 'has_next', 'has_prev'])
+
+
+def marked_lectures(subject_ids, first, last):
+    """(subject_id, date) of every lecture with at least one mark between `first` and `last`."""
+    if not subject_ids:
+        return set()
+    rows = db.session.query(Attendance.subject_id, Attendance.date).filter(
+        Attendance.subject_id.in_(subject_ids),
+        Attendance.date.between(first, last)
+    ).group_by(Attendance.subject_id, Attendance.date)
+    return {(subject_id, on_date) for subject_id, on_date in rows}
+
+
+def lecture_ledger(slots, dates, page=1, per_page=5):
+    """
+    One page of the lectures `slots` (timetable slots with .day_of_week,
+    .period_number and .subject) give on `dates`, newest first.
+    """
+    page = max(page, 1)
+    by_day = {}
+    for slot in slots:
+        by_day.setdefault(slot.day_of_week, []).append(slot)
+    day_slots = [(d, by_day.get(d.strftime('%A'), [])) for d in sorted(set(dates), reverse=True)]
+
+    # 1. Size of the ledger, without building it
+    total = sum(len(day) for _, day in day_slots)
+    start, end = (page - 1) * per_page, page * per_page
+
+    # 2. Only the lectures on this page
+    window, position = [], 0
+    for on_date, day in day_slots:
+        if position >= end:
+            break
+        if position + len(day) > start:
+            window.extend((on_date, slot) for slot in day[max(start - position, 0):end - position])
+        position += len(day)
+
+    # 3. Their status, in one query
+    marked = set()
+    if window:
+        marked = marked_lectures({slot.subject.id for _, slot in window}, window[-1][0], window[0][0])
+
+    items = [
+        Lecture(on_date, on_date.strftime('%Y-%m-%d'), slot.subject,
+                f"{9 + (slot.period_number-1)}:00 - {10 + (slot.period_number-1)}:00",
+                'Marked' if (slot.subject.id, on_date) in marked else 'Pending')
+        for on_date, slot in window
+    ]
+    return LedgerPage(items, page, (total + per_page - 1) // per_page, end < total, start > 0)
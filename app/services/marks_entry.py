@@ -0,0 +1,201 @@
+"""
+Bulk marks entry for one exam paper.
+
+Marks come from the faculty marks form or from an uploaded CSV / XLSX sheet
+(columns enrollment_number, marks and optionally status) and go through the
+same engine:
+  1. the whole batch is validated in one pass against the paper's class
+     roster and maximum marks, collecting every problem into an error report
+     of {'line', 'enrollment_number', 'error'} entries,
+  2. the paper's stored results are read with one query and compared in memory,
+  3. new results are written with one upsert on (exam_paper_id, student_id),
+     changed ones with one bulk UPDATE by primary key,
+  4. the academic summaries of the students written are refreshed.
+
+Invalid rows are reported and skipped; the rest of the batch is saved.
+A row with no marks and no status only makes sure the student has a result
+for the paper, as the form always did. XLSX uploads need openpyxl.
+"""
+import io
+import csv
+import math
+from collections import namedtuple
+
+from sqlalchemy import update
+
+from app.extensions import db
+from app.models import StudentProfile, StudentResult
+from app.services.bulk import upsert
+from app.services.summaries import refresh_student_summaries
+
+try:
+    import openpyxl
+except ImportError:  # openpyxl is optional: only CSV sheets can be uploaded without it
+    openpyxl = None
+
+# Marks below this fraction of the paper's total fail
+FAIL_FRACTION = 0.33
+STATUSES = {'present': 'Present', 'absent': 'Absent'}
+REQUIRED_COLUMNS = ['enrollment_number', 'marks']
+
+# line is the sheet's line number (None for form input)
+MarksRow = namedtuple('MarksRow', ['line', 'enrollment_number', 'marks', 'status'])
+MarksReport = namedtuple('MarksReport', ['inserted', 'updated', 'unchanged', 'errors'])
+
+
+# --- Sources ---
+
+def _cell_text(cell):
+    # Spreadsheets store numeric enrollment numbers and whole marks as floats
+    if cell is None:
+        return ''
+    if isinstance(cell, float) and cell.is_integer():
+        return str(int(cell))
+    return str(cell)
+
+
+def rows_from_form(form, roster):
+    """MarksRow per `marks_<student id>` field of the marks form, for the (id, enrollment_number) `roster`."""
+    return [
+        MarksRow(None, enrollment, form[f'marks_{sid}'], None)
+        for sid, enrollment in roster if f'marks_{sid}' in form
+    ]
+
+
+def rows_from_file(file):
+    """
+    MarksRow per data line of an uploaded .csv or .xlsx sheet (werkzeug FileStorage).
+    Raises ValueError if the sheet can't be read at all.
+    """
+    name = (file.filename or '').lower()
+    if name.endswith('.xlsx'):
+        if openpyxl is None:
+            raise ValueError('XLSX uploads are not available on this server, upload a CSV instead.')
+        sheet = openpyxl.load_workbook(io.BytesIO(file.read()), read_only=True, data_only=True).active
+        lines = ([_cell_text(cell) for cell in row] for row in sheet.iter_rows(values_only=True))
+    elif name.endswith('.csv'):
+        lines = csv.reader(io.TextIOWrapper(file.stream, encoding='utf-8-sig', newline=''))
+    else:
+        raise ValueError('Upload a .csv or .xlsx file.')
+
+    header = [column.strip().lower() for column in next(lines, [])]
+    missing = [column for column in REQUIRED_COLUMNS if column not in header]
+    if missing:
+        raise ValueError(f"Missing column {', '.join(missing)}")
+    columns = {column: header.index(column) for column in REQUIRED_COLUMNS + ['status'] if column in header}
+
+    rows = []
+    for line, values in enumerate(lines, start=2):
+        value = {column: (values[i] if i < len(values) else '') for column, i in columns.items()}
+        if not any(v.strip() for v in value.values()):
+            continue  # blank line
+        rows.append(MarksRow(line, value['enrollment_number'], value['marks'], value.get('status')))
+    return rows
+
+
+# --- Engine ---
+
+def class_roster(paper):
+    """(id, enrollment_number) of the students sitting the paper."""
+    return db.session.query(StudentProfile.id, StudentProfile.enrollment_number).filter_by(
+        course_name=paper.subject.course_name, semester=paper.subject.semester
+    ).all()
+
+
+def validate_marks(paper, rows, roster):
+    """
+    Checks the whole batch. Returns ({student_id: (marks, status, is_fail) or
+    None for an empty row}, errors).
+    """
+    student_ids = {enrollment: sid for sid, enrollment in roster}
+    values, errors = {}, []
+
+    def error(row, message):
+        errors.append({'line': row.line, 'enrollment_number': row.enrollment_number, 'error': message})
+
+    for row in rows:
+        enrollment = (row.enrollment_number or '').strip()
+        marks = (row.marks or '').strip()
+        status = (row.status or '').strip()
+        row = row._replace(enrollment_number=enrollment)
+
+        if not enrollment:
+            error(row, 'Missing enrollment number')
+            continue
+        sid = student_ids.get(enrollment)
+        if sid is None:
+            error(row, "Not in this paper's class")
+            continue
+        if sid in values:
+            error(row, 'Duplicate enrollment number')
+            continue
+        if status and status.lower() not in STATUSES:
+            error(row, f"Invalid status: {status} (Present or Absent)")
+            continue
+        status = STATUSES.get(status.lower())
+
+        if status == 'Absent':
+            if marks:
+                error(row, 'Marks given for an absent student')
+                continue
+            values[sid] = (None, 'Absent', False)
+        elif marks:
+            try:
+                val = float(marks)
+            except ValueError:
+                error(row, f'Invalid number: {marks}')
+                continue
+            if not math.isfinite(val) or val < 0 or val > paper.total_marks:
+                error(row, f'Invalid marks {marks}. Max is {paper.total_marks}')
+                continue
+            values[sid] = (val, 'Present', val < paper.total_marks * FAIL_FRACTION)
+        elif status == 'Present':
+            error(row, 'Missing marks')
+        else:
+            values[sid] = None
+    return values, errors
+
+
+def ingest_marks(paper, rows, roster=None):
+    """
+    Validates `rows` (MarksRow) for `paper` and saves the valid ones.
+    Caller is responsible for committing. Returns a MarksReport.
+    """
+    values, errors = validate_marks(paper, rows, roster if roster is not None else class_roster(paper))
+
+    # 1. Stored results of the paper, in one query
+    existing = {
+        sid: (result_id, (marks, status, is_fail))
+        for result_id, sid, marks, status, is_fail in db.session.query(
+            StudentResult.id, StudentResult.student_id, StudentResult.marks_obtained,
+            StudentResult.status, StudentResult.is_fail
+        ).filter(StudentResult.exam_paper_id == paper.id)
+    }
+
+    # 2. What changed, in memory
+    inserts, placeholders, updates, updated, unchanged = [], [], [], [], 0
+    for sid, value in values.items():
+        if sid not in existing:
+            marks, status, is_fail = value or (None, 'Present', False)
+            row = {'exam_paper_id': paper.id, 'student_id': sid,
+                   'marks_obtained': marks, 'status': status, 'is_fail': is_fail}
+            (inserts if value else placeholders).append(row)
+        elif value is not None and existing[sid][1] != value:
+            marks, status, is_fail = value
+            updates.append({'id': existing[sid][0], 'marks_obtained': marks, 'status': status, 'is_fail': is_fail})
+            updated.append(sid)
+        else:
+            unchanged += 1
+
+    # 3. Batched writes: placeholders never overwrite a result saved meanwhile
+    keys = ['exam_paper_id', 'student_id']
+    upsert(StudentResult, inserts, keys, ['marks_obtained', 'status', 'is_fail'])
+    upsert(StudentResult, placeholders, keys)
+    if updates:
+        db.session.execute(update(StudentResult), updates)
+
+    # 4. Summaries aren't maintained for writes that bypass the flush
+    written = [row['student_id'] for row in inserts + placeholders] + updated
+    refresh_student_summaries(written, exam_event_id=paper.exam_event_id)
+
+    return MarksReport(len(inserts) + len(placeholders), len(updates), unchanged, errors)
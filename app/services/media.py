@@ -0,0 +1,358 @@
+"""
+Unified serving of BLOB-backed media (syllabus PDFs, event images, faculty
+photos, chat images).
+
+The bytes are never loaded as a whole: the length and fixed size slices are
+read with SQL (length / substr) and streamed to the client. Responses carry a
+strong ETag (sha256 of the content) and Last-Modified, answer conditional
+requests with 304 and honour single-range Range requests with 206.
+
+Digests live in MediaDigest. They are computed on first download and dropped
+by a session hook whenever the ORM writes new bytes (or deletes the owner).
+Bulk (Core) writes to a media column must call forget_digest() themselves.
+Digests and thumbnails are stored on their own connection; while the
+request's session holds uncommitted writes they wait for its commit instead.
+
+Pages link images through media_url(), which builds content-addressed URLs
+(/media/<kind>/<id>/<sha256>[/<size>]) that browsers may cache forever, and
+can point at a stored thumbnail instead of the original. Thumbnails are
+rendered with Pillow (requirements.txt); if it is missing, media_url()
+falls back to the original image and create_app logs a warning.
+"""
+import io
+import hashlib
+from collections import namedtuple
+from datetime import datetime, timezone
+
+from flask import Response, request, stream_with_context, abort, g, url_for
+from sqlalchemy import event, func, delete, insert, inspect
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.extensions import db
+from app.models import Syllabus, UniversityEvent, FacultyProfile, QueryMessage, MediaDigest, MediaThumbnail
+
+try:
+    from PIL import Image
+except ImportError:  # Installed from requirements.txt; without it originals are served instead of thumbnails
+    Image = None
+
+CHUNK_SIZE = 256 * 1024
+
+# Bounding boxes (px) thumbnails may be requested in
+THUMBNAIL_SIZES = (128, 256, 640)
+
+# model, BLOB attribute, mimetype attribute (or None), fallback mimetype,
+# "has media" column property (or None), reachable through /media URLs
+MediaSource = namedtuple('MediaSource', ['model', 'data_attr', 'mimetype_attr', 'default_mimetype', 'flag_attr', 'linkable'])
+
+MEDIA_SOURCES = {
+    'syllabus': MediaSource(Syllabus, 'file_data', None, 'application/pdf', None, False),
+    'event_image': MediaSource(UniversityEvent, 'image_data', 'image_mimetype', 'image/png', 'has_image', True),
+    'faculty_photo': MediaSource(FacultyProfile, 'photo_data', 'photo_mimetype', 'image/jpeg', 'has_photo', True),
+    'message_image': MediaSource(QueryMessage, 'image_data', 'image_mimetype', 'image/jpeg', 'has_image', True),
+}
+
+
+def _column(source):
+    return getattr(source.model, source.data_attr)
+
+
+def read_chunk(kind, owner_id, offset, length):
+    """`length` bytes of the BLOB starting at `offset` (0-based), without loading the rest."""
+    source = MEDIA_SOURCES[kind]
+    chunk = db.session.query(func.substr(_column(source), offset + 1, length))\
+        .filter(source.model.id == owner_id).scalar()
+    return bytes(chunk) if chunk is not None else b''
+
+
+def iter_chunks(kind, owner_id, start, end, chunk_size=CHUNK_SIZE):
+    """Yields the bytes in [start, end) one SQL slice at a time."""
+    offset = start
+    while offset < end:
+        length = min(chunk_size, end - offset)
+        chunk = read_chunk(kind, owner_id, offset, length)
+        if not chunk:
+            break
+        yield chunk
+        offset += len(chunk)
+
+
+def get_digest(kind, owner_id):
+    """MediaDigest for the owner's bytes (computed and stored on first use), or None if there are none."""
+    digest = MediaDigest.query.filter_by(owner_type=kind, owner_id=owner_id).first()
+    if digest:
+        return digest
+
+    source = MEDIA_SOURCES[kind]
+    size = db.session.query(func.length(_column(source)))\
+        .filter(source.model.id == owner_id).scalar()
+    if size is None:
+        return None
+
+    sha = hashlib.sha256()
+    for chunk in iter_chunks(kind, owner_id, 0, size):
+        sha.update(chunk)
+
+    values = {'owner_type': kind, 'owner_id': owner_id, 'sha256': sha.hexdigest(),
+              'size': size, 'updated_at': datetime.now(timezone.utc)}
+    if not _store(MediaDigest, values):
+        # A concurrent request stored it first
+        return MediaDigest.query.filter_by(owner_type=kind, owner_id=owner_id).first()
+    return MediaDigest(**values)
+
+
+def _store(model, values):
+    """
+    Inserts a derived row on its own connection, so that filling a cache
+    while a page renders never commits (and expires) the request's session.
+    While that session holds uncommitted writes (which would lock the other
+    connection out on SQLite, or block it on the same keys elsewhere), the
+    row is inserted after the session commits instead, and dropped if it
+    rolls back. Returns False if the row already exists.
+    """
+    session = db.session()
+    if session.info.get('media_session_writes'):
+        session.info.setdefault('media_deferred_rows', []).append((model, values))
+        return True
+    return _insert(model, values)
+
+
+def _insert(model, values):
+    try:
+        with db.engine.begin() as conn:
+            conn.execute(insert(model.__table__), values)
+        return True
+    except IntegrityError:
+        return False
+
+
+def forget_digest(kind, owner_ids):
+    """Drops stored digests (call after bulk writes that bypass the ORM)."""
+    db.session.execute(delete(MediaDigest).where(
+        MediaDigest.owner_type == kind, MediaDigest.owner_id.in_(list(owner_ids))
+    ))
+
+
+def send_media(kind, owner_id, mimetype=None, as_attachment=False, download_name=None):
+    """
+    Streams the owner's bytes as a conditional, range-aware response.
+    404s if the owner or its media does not exist.
+    """
+    source = MEDIA_SOURCES[kind]
+    digest = get_digest(kind, owner_id)
+    if digest is None:
+        abort(404)
+
+    if mimetype is None:
+        if source.mimetype_attr:
+            mimetype = db.session.query(getattr(source.model, source.mimetype_attr))\
+                .filter(source.model.id == owner_id).scalar()
+        mimetype = mimetype or source.default_mimetype
+
+    last_modified = _as_utc(digest.updated_at).replace(microsecond=0) if digest.updated_at else None
+
+    response = Response(mimetype=mimetype)
+    response.set_etag(digest.sha256)
+    response.last_modified = last_modified
+    response.headers['Cache-Control'] = 'private, no-cache'
+    response.headers['Accept-Ranges'] = 'bytes'
+    if as_attachment or download_name:
+        disposition = 'attachment' if as_attachment else 'inline'
+        response.headers.set('Content-Disposition', disposition, filename=download_name or f"{kind}_{owner_id}")
+
+    # 1. Conditional GET: If-None-Match wins over If-Modified-Since
+    if request.if_none_match:
+        not_modified = request.if_none_match.contains(digest.sha256)
+    else:
+        not_modified = bool(request.if_modified_since and last_modified and
+                            request.if_modified_since >= last_modified)
+    if not_modified:
+        response.status_code = 304
+        return response
+
+    # 2. Range (ignored when If-Range names another version)
+    start, end = 0, digest.size
+    byte_range = request.range
+    if byte_range and _if_range_matches(digest.sha256, last_modified):
+        bounds = byte_range.range_for_length(digest.size)
+        if bounds is None:
+            response.status_code = 416
+            response.headers['Content-Range'] = f"bytes */{digest.size}"
+            return response
+        start, end = bounds
+        response.status_code = 206
+        response.headers['Content-Range'] = f"bytes {start}-{end - 1}/{digest.size}"
+
+    response.content_length = end - start
+    if request.method != 'HEAD':
+        response.response = stream_with_context(iter_chunks(kind, owner_id, start, end))
+    return response
+
+
+def get_thumbnail(kind, owner_id, digest, size):
+    """Stored thumbnail of the owner's image (generated on first use), or None if it can't be made."""
+    thumb = MediaThumbnail.query.filter_by(source_sha256=digest.sha256, size=size).first()
+    if thumb or Image is None:
+        return thumb
+
+    rendered = _render_thumbnail(b''.join(iter_chunks(kind, owner_id, 0, digest.size)), size)
+    if rendered is None:
+        return None
+
+    data, mimetype = rendered
+    values = {'source_sha256': digest.sha256, 'size': size, 'mimetype': mimetype,
+              'data': data, 'byte_size': len(data), 'created_at': datetime.now(timezone.utc)}
+    if not _store(MediaThumbnail, values):
+        # A concurrent request stored it first
+        return MediaThumbnail.query.filter_by(source_sha256=digest.sha256, size=size).first()
+    return MediaThumbnail(**values)
+
+
+def _render_thumbnail(raw, size):
+    try:
+        img = Image.open(io.BytesIO(raw))
+        img.thumbnail((size, size))
+    except Exception:
+        return None  # Not an image Pillow understands
+
+    out = io.BytesIO()
+    if img.mode in ('RGBA', 'LA') or (img.mode == 'P' and 'transparency' in img.info):
+        img.save(out, format='PNG', optimize=True)
+        return out.getvalue(), 'image/png'
+    img.convert('RGB').save(out, format='JPEG', quality=85, optimize=True)
+    return out.getvalue(), 'image/jpeg'
+
+
+def send_thumbnail(thumb, digest):
+    response = Response(thumb.data, mimetype=thumb.mimetype)
+    response.set_etag(f"{digest.sha256}-{thumb.size}")
+    response.last_modified = _as_utc(thumb.created_at).replace(microsecond=0)
+    return response.make_conditional(request)
+
+
+def media_url(kind, owner, thumb=None):
+    """
+    Content-addressed URL for an owner's media (None if it has none).
+    `thumb` asks for a stored thumbnail bounded by that many px.
+
+    Digests of every `kind` owner already loaded in the session are fetched
+    with one query on first use, so list pages don't pay a query per image.
+    """
+    source = MEDIA_SOURCES[kind]
+    if owner is None or owner.id is None or not getattr(owner, source.flag_attr):
+        return None
+
+    known = _request_digests(kind)
+    digest = known.get(owner.id)
+    if digest is None:
+        digest = known[owner.id] = get_digest(kind, owner.id)
+        if digest is None:
+            return None
+
+    size = thumb if thumb and Image is not None else None
+    return url_for('media.serve', kind=kind, owner_id=owner.id, digest=digest.sha256, size=size)
+
+
+def _request_digests(kind):
+    cache = g.setdefault('_media_digests', {})
+    if kind not in cache:
+        model = MEDIA_SOURCES[kind].model
+        loaded_ids = [key[1][0] for key in db.session.identity_map.keys() if key[0] is model]
+        rows = MediaDigest.query.filter(
+            MediaDigest.owner_type == kind, MediaDigest.owner_id.in_(loaded_ids)
+        ).all() if loaded_ids else []
+        cache[kind] = {row.owner_id: row for row in rows}
+    return cache[kind]
+
+
+def prune_thumbnails():
+    """Deletes thumbnails whose source content no longer backs any media. Returns the count."""
+    live = db.session.query(MediaDigest.sha256)
+    count = MediaThumbnail.query.filter(MediaThumbnail.source_sha256.notin_(live))\
+        .delete(synchronize_session=False)
+    db.session.commit()
+    return count
+
+
+def _as_utc(value):
+    # SQLite hands back naive (UTC) datetimes; werkzeug parses headers as aware UTC
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _if_range_matches(etag, last_modified):
+    if 'If-Range' not in request.headers:
+        return True
+    if_range = request.if_range
+    if if_range.etag:
+        return if_range.etag == etag
+    return bool(if_range.date and last_modified and if_range.date == last_modified)
+
+
+# --- Digest invalidation on ORM writes ---
+
+def _drop_changed_digests(session, flush_context):
+    """after_flush: new bytes (or a deleted owner) invalidate the stored digest."""
+    stale = {}
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        for kind, source in MEDIA_SOURCES.items():
+            if not isinstance(obj, source.model) or obj.id is None:
+                continue
+            if obj in session.new or obj in session.deleted or \
+                    inspect(obj).attrs[source.data_attr].history.has_changes():
+                stale.setdefault(kind, set()).add(obj.id)
+
+    for kind, owner_ids in stale.items():
+        session.connection().execute(delete(MediaDigest.__table__).where(
+            MediaDigest.owner_type == kind, MediaDigest.owner_id.in_(owner_ids)
+        ))
+
+    deferred = session.info.get('media_deferred_rows')
+    if stale and deferred:
+        # Digests held back for this commit describe the bytes just replaced
+        deferred[:] = [(model, values) for model, values in deferred
+                       if model is not MediaDigest or values['owner_id'] not in stale.get(values['owner_type'], ())]
+
+
+def _track_session_writes(session, flush_context):
+    """after_flush: the session now holds uncommitted writes (see _store)."""
+    session.info['media_session_writes'] = True
+
+
+def _track_bulk_session_writes(orm_execute_state):
+    """do_orm_execute: bulk update / delete / insert statements write without a flush."""
+    if orm_execute_state.is_update or orm_execute_state.is_delete or orm_execute_state.is_insert:
+        orm_execute_state.session.info['media_session_writes'] = True
+
+
+def _store_deferred_rows(session):
+    """after_commit: the rows _store() held back can be inserted now."""
+    session.info.pop('media_session_writes', None)
+    for model, values in session.info.pop('media_deferred_rows', None) or ():
+        _insert(model, values)
+
+
+def _discard_deferred_rows(session, previous_transaction):
+    # Computed from writes that were just rolled back
+    session.info.pop('media_deferred_rows', None)
+
+
+def _reset_session_writes(session, transaction):
+    """after_transaction_end: committed, rolled back or closed, the writes are gone."""
+    if transaction.parent is None:
+        session.info.pop('media_session_writes', None)
+        session.info.pop('media_deferred_rows', None)
+
+
+def register_media_hooks():
+    """Installs the session hooks (idempotent)."""
+    if event.contains(Session, 'after_flush', _drop_changed_digests):
+        return
+    event.listen(Session, 'after_flush', _drop_changed_digests)
+    event.listen(Session, 'after_flush', _track_session_writes)
+    event.listen(Session, 'do_orm_execute', _track_bulk_session_writes)
+    event.listen(Session, 'after_commit', _store_deferred_rows)
+    event.listen(Session, 'after_soft_rollback', _discard_deferred_rows)
+    event.listen(Session, 'after_transaction_end', _reset_session_writes)
@@ -0,0 +1,186 @@
+"""
+Query chat threads, loaded a page at a time.
+
+A thread page is the newest `per_page` messages before a keyset cursor
+(services.pagination), shown oldest first; `image_data` stays deferred, so
+a page only reads message text and the `has_image` flag.
+
+Open chats poll `messages_since` by default. Committed messages and status
+changes are also published on the query's pubsub channel (session hooks
+below), and with CHAT_EVENT_STREAM set and a shared (redis) pubsub backend
+`thread_event_stream` turns them into server-sent events instead. Each
+stream holds its worker for up to SSE_MAX_DURATION, so this is only for
+async worker classes.
+"""
+import json
+import time
+import logging
+
+from flask import Response, abort, current_app, get_template_attribute, request, stream_with_context
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.extensions import db, pubsub
+from app.models import QueryMessage, StudentQuery
+from app.services.media import media_url
+from app.services.pagination import keyset_page, desc
+
+# Newest first (ids grow with every message). QueryMessage.query is the
+# message's StudentQuery backref, hence db.session.query(QueryMessage).
+MESSAGE_ORDER = [desc(QueryMessage.id)]
+
+
+def thread_page(query_id, per_page=None, cursor=None):
+    """Page of a query's messages before `cursor`, items in chronological order."""
+    page = keyset_page(db.session.query(QueryMessage).filter(QueryMessage.query_id == query_id),
+                       MESSAGE_ORDER, per_page, cursor)
+    return page._replace(items=page.items[::-1])
+
+
+def messages_since(query_id, since_id, limit):
+    """Up to `limit` messages of the query after message `since_id`, oldest first."""
+    return db.session.query(QueryMessage).filter(
+        QueryMessage.query_id == query_id, QueryMessage.id > since_id
+    ).order_by(QueryMessage.id).limit(limit).all()
+
+
+def message_json(msg):
+    return {
+        'id': msg.id,
+        'sender_type': msg.sender_type,
+        'content': msg.content,
+        'has_image': msg.has_image,
+        'image_url': media_url('message_image', msg, thumb=640),
+        'full_image_url': media_url('message_image', msg),
+        'timestamp': msg.timestamp.isoformat() if msg.timestamp else None,
+    }
+
+
+def message_payload(msg, own):
+    """message_json() plus the chat bubble rendered for the viewer (`own` sender type)."""
+    bubble = get_template_attribute('query_messages.html', 'message_bubble')
+    return {**message_json(msg), 'html': str(bubble(msg, own))}
+
+
+def thread_updates(query_id, since_id, own, limit):
+    """
+    JSON body for a chat poll: messages after `since_id` (message_payload),
+    their bubbles joined, the id to poll from next and whether more messages
+    are waiting.
+    """
+    rows = messages_since(query_id, since_id, limit + 1)
+    messages = rows[:limit]
+    payloads = [message_payload(m, own) for m in messages]
+    return {
+        'messages': payloads,
+        'html': ''.join(p['html'] for p in payloads),
+        'last_id': messages[-1].id if messages else since_id,
+        'has_more': len(rows) > limit,
+    }
+
+
+# --- Live events ---
+
+def query_channel(query_id):
+    return f"query:{query_id}"
+
+
+def _sse(event_name, data, event_id=None):
+    lines = [f"id: {event_id}"] if event_id is not None else []
+    lines += [f"event: {event_name}", f"data: {json.dumps(data)}"]
+    return '\n'.join(lines) + '\n\n'
+
+
+def thread_event_stream(query_id, own, since_id, limit, keepalive, max_duration):
+    """
+    Server-sent events for an open chat: `message` (a message_payload, with
+    the message id as event id so reconnects resume after it) and `status`.
+    Starts with anything after `since_id`, then follows the query's channel
+    for at most `max_duration` seconds; the browser reconnects afterwards.
+    """
+    subscription = pubsub.subscribe(query_channel(query_id))
+    try:
+        yield "retry: 3000\n\n"
+        last_id = since_id
+        deadline = time.monotonic() + max_duration
+        event_data = {'type': 'message'}  # Catch up before waiting
+        while True:
+            if event_data is None:
+                if time.monotonic() < deadline:
+                    yield ": keepalive\n\n"
+            elif event_data['type'] == 'status':
+                yield _sse('status', {'status': event_data['status']})
+            else:
+                # Notifications only carry ids: send everything after the last message sent
+                while True:
+                    messages = messages_since(query_id, last_id, limit)
+                    for msg in messages:
+                        yield _sse('message', message_payload(msg, own), msg.id)
+                        last_id = msg.id
+                    if len(messages) < limit:
+                        break
+                # Don't hold a database connection while idle
+                db.session.close()
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            event_data = subscription.get(timeout=min(keepalive, remaining))
+    finally:
+        subscription.close()
+
+
+def event_stream_enabled():
+    """Whether open chats follow server-sent events (else they poll)."""
+    return bool(current_app.config.get('CHAT_EVENT_STREAM')) and pubsub.shared
+
+
+def event_stream_response(query_id, own):
+    """
+    text/event-stream Response of thread_event_stream() for the current
+    request, resuming after the Last-Event-ID header (or ?since=); 404 while
+    event streams are disabled.
+    """
+    if not event_stream_enabled():
+        abort(404)
+    since_id = request.headers.get('Last-Event-ID', type=int) or request.args.get('since', 0, type=int)
+    config = current_app.config
+    stream = thread_event_stream(query_id, own, since_id, config['MESSAGES_PER_PAGE'],
+                                 config['SSE_KEEPALIVE'], config['SSE_MAX_DURATION'])
+    # Release the request's connection before streaming starts
+    db.session.close()
+    return Response(stream_with_context(stream), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+def _track_chat_events(session, flush_context):
+    """after_flush: new messages and status changes, published once committed."""
+    events = session.info.setdefault('chat_events', [])
+    for obj in session.new:
+        if isinstance(obj, QueryMessage):
+            events.append((obj.query_id, {'type': 'message', 'id': obj.id}))
+    for obj in session.dirty:
+        if isinstance(obj, StudentQuery) and inspect(obj).attrs.status.history.has_changes():
+            events.append((obj.id, {'type': 'status', 'status': obj.status}))
+
+
+def _publish_after_commit(session):
+    for query_id, data in session.info.pop('chat_events', None) or ():
+        try:
+            pubsub.publish(query_channel(query_id), data)
+        except Exception:
+            # The write is committed; open chats catch up on their next event or poll
+            logging.getLogger(__name__).exception("Could not publish chat event")
+
+
+def _discard_chat_events(session, previous_transaction):
+    session.info.pop('chat_events', None)
+
+
+def register_message_hooks():
+    """Installs the session hooks (idempotent)."""
+    if event.contains(Session, 'after_flush', _track_chat_events):
+        return
+    event.listen(Session, 'after_flush', _track_chat_events)
+    event.listen(Session, 'after_commit', _publish_after_commit)
+    event.listen(Session, 'after_soft_rollback', _discard_chat_events)
@@ -0,0 +1,48 @@
+"""
+Audience resolution and keyset pagination for notice feeds.
+
+A student sees notices sent to everyone, to their class (course, and the
+semester if one was given), to a faculty member's mentees when that faculty
+member is their mentor, and to them individually. The filter runs in SQL and
+is served by the composite indexes declared on Notice.
+
+Feeds are ordered newest first by (created_at, id) and keyset paginated,
+so a page costs the same however deep it is and never repeats or skips rows
+when new notices arrive.
+"""
+from sqlalchemy import or_, and_
+
+from app.models import Notice
+from app.services.pagination import keyset_page, order_clauses, desc
+
+
+def student_audience_filter(student):
+    """SQL condition selecting the notices addressed to `student`."""
+    conditions = [
+        Notice.target_type == 'all',
+        Notice.target_type.is_(None),
+        and_(
+            Notice.target_type == 'class',
+            Notice.target_course == student.course_name,
+            or_(Notice.target_semester.is_(None), Notice.target_semester == student.semester)
+        ),
+        and_(Notice.target_type == 'individual', Notice.target_student_id == student.id),
+    ]
+    if student.mentor_id:
+        conditions.append(and_(Notice.target_type == 'mentees', Notice.sender_faculty_id == student.mentor_id))
+    return or_(*conditions)
+
+
+# Newest first
+NOTICE_ORDER = [desc(Notice.created_at), desc(Notice.id)]
+
+
+def student_notices(student):
+    """Query of the student's notices, newest first."""
+    return Notice.query.filter(student_audience_filter(student))\
+        .order_by(*order_clauses(NOTICE_ORDER))
+
+
+def notice_page(query, per_page, cursor=None):
+    """One newest-first page of a notice query, starting after `cursor` (see services.pagination)."""
+    return keyset_page(query, NOTICE_ORDER, per_page, cursor)
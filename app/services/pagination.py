@@ -0,0 +1,113 @@
+"""
+Keyset (seek) pagination over SQLAlchemy queries.
+
+A page is the next `per_page` rows after the last row already shown, found
+with a WHERE clause on the sort columns instead of an OFFSET, so deep pages
+cost the same as the first one and rows inserted meanwhile never shift a
+page. The sort must end in a unique column (usually the primary key) and
+its columns must not be NULL.
+
+Cursors are opaque url-safe strings holding the sort values of the last row
+of a page; templates render navigation with the keyset_nav macro in
+templates/pagination.html.
+"""
+import json
+import base64
+from collections import namedtuple
+from datetime import date, datetime
+
+from flask import current_app, request
+from sqlalchemy import and_, or_, Date, DateTime
+
+# items: rows of this page; cursor: the cursor it was fetched with (None on the
+# first page); next_cursor: cursor of the following page (None on the last page)
+Page = namedtuple('Page', ['items', 'cursor', 'next_cursor'])
+
+
+def asc(column):
+    return column, False
+
+
+def desc(column):
+    return column, True
+
+
+def order_clauses(order):
+    """ORDER BY clauses for an asc() / desc() list."""
+    return [column.desc() if descending else column.asc() for column, descending in order]
+
+
+def encode_cursor(values):
+    raw = json.dumps([v.isoformat() if isinstance(v, (date, datetime)) else v for v in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, order):
+    """Sort values from a cursor, or None if it is malformed or doesn't fit `order`."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(order):
+            return None
+        return [_from_json(column, value) for (column, _), value in zip(order, values)]
+    except (ValueError, TypeError):
+        return None
+
+
+def _from_json(column, value):
+    if value is None:
+        raise ValueError("NULL sort values can't be paged past")
+    column_type = column.expression.type
+    if isinstance(column_type, DateTime):
+        return datetime.fromisoformat(value)
+    if isinstance(column_type, Date):
+        return date.fromisoformat(value)
+    return value
+
+
+def seek_condition(order, values):
+    """
+    Rows strictly after `values` in `order`: (a > x) OR (a = x AND b > y) OR ...
+    plus the redundant a >= x, which lets the database seek an index on `a`
+    instead of filtering every row.
+    """
+    clauses = []
+    for i, (column, descending) in enumerate(order):
+        ties = [order[j][0] == values[j] for j in range(i)]
+        step = column < values[i] if descending else column > values[i]
+        clauses.append(and_(*ties, step))
+
+    lead, descending = order[0]
+    bound = lead <= values[0] if descending else lead >= values[0]
+    return and_(bound, or_(*clauses))
+
+
+def keyset_page(query, order, per_page=None, cursor=None):
+    """
+    One page of `query` sorted by `order`, a list of asc(column) / desc(column)
+    ending in a unique column. Returns a Page. Malformed cursors give the first
+    page. `per_page` defaults to the LIST_PAGE_SIZE setting.
+    """
+    per_page = per_page or current_app.config['LIST_PAGE_SIZE']
+    values = decode_cursor(cursor, order) if cursor else None
+    if values is not None:
+        query = query.filter(seek_condition(order, values))
+    else:
+        cursor = None
+
+    # The page's order replaces any ordering already on the query
+    query = query.order_by(None).order_by(*order_clauses(order))
+    # One extra row tells whether another page follows
+    rows = query.limit(per_page + 1).all()
+    items = rows[:per_page]
+
+    next_cursor = None
+    if len(rows) > per_page:
+        last = items[-1]
+        next_cursor = encode_cursor([getattr(last, column.key) for column, _ in order])
+    return Page(items, cursor, next_cursor)
+
+
+def request_page(query, order, per_page=None, arg='after'):
+    """keyset_page() for the cursor in the current request's `arg` query parameter."""
+    return keyset_page(query, order, per_page, request.args.get(arg))
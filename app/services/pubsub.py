@@ -0,0 +1,146 @@
+"""
+Small pluggable publish / subscribe used to push live updates to open pages.
+
+`pubsub.publish(channel, data)` hands a JSON-serializable dict to every
+current subscriber of the channel. `pubsub.subscribe(channel)` returns a
+subscription to read them from with `get(timeout)`; close it when done.
+Delivery is best effort: subscribers that fall behind or reconnect catch up
+from the database, so events only need to say *what* changed.
+
+Backends:
+    memory  in-process queues (default); publishers and subscribers share a process
+    redis   Redis PUBLISH / SUBSCRIBE, shared by all workers (needs the redis package)
+
+Configuration:
+    PUBSUB_BACKEND      'memory' | 'redis'
+    PUBSUB_REDIS_URL    connection URL for the redis backend
+"""
+import json
+import queue
+import threading
+
+try:
+    import redis
+except ImportError:  # redis is optional: only the memory backend is available without it
+    redis = None
+
+
+class MemorySubscription:
+    def __init__(self, broker, channel, events):
+        self._broker = broker
+        self._channel = channel
+        self._events = events
+
+    def get(self, timeout=None):
+        """Next event, or None if none arrived within `timeout` seconds."""
+        try:
+            return self._events.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self._broker._unsubscribe(self._channel, self._events)
+
+
+class MemoryBroker:
+    """Thread-safe in-process fan-out, one bounded queue per subscriber."""
+    name = 'memory'
+    shared = False  # Only subscribers in the publishing process see an event
+
+    def __init__(self, max_pending=100):
+        self.max_pending = max_pending
+        self._channels = {}
+        self._lock = threading.Lock()
+
+    def publish(self, channel, data):
+        with self._lock:
+            subscribers = list(self._channels.get(channel, ()))
+        for events in subscribers:
+            try:
+                events.put_nowait(data)
+            except queue.Full:
+                pass  # A stalled subscriber misses the event and catches up from the database
+
+    def subscribe(self, channel):
+        events = queue.Queue(self.max_pending)
+        with self._lock:
+            self._channels.setdefault(channel, set()).add(events)
+        return MemorySubscription(self, channel, events)
+
+    def _unsubscribe(self, channel, events):
+        with self._lock:
+            subscribers = self._channels.get(channel)
+            if subscribers is not None:
+                subscribers.discard(events)
+                if not subscribers:
+                    del self._channels[channel]
+
+    def subscriber_count(self, channel):
+        with self._lock:
+            return len(self._channels.get(channel, ()))
+
+
+class RedisSubscription:
+    def __init__(self, pubsub):
+        self._pubsub = pubsub
+
+    def get(self, timeout=None):
+        message = self._pubsub.get_message(timeout=timeout)
+        return json.loads(message['data']) if message else None
+
+    def close(self):
+        self._pubsub.close()
+
+
+class RedisBroker:
+    """Redis channels: events reach subscribers in every worker process."""
+    name = 'redis'
+    shared = True
+
+    def __init__(self, url):
+        self._client = redis.Redis.from_url(url)
+
+    def publish(self, channel, data):
+        self._client.publish(channel, json.dumps(data))
+
+    def subscribe(self, channel):
+        pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(channel)
+        return RedisSubscription(pubsub)
+
+    def subscriber_count(self, channel):
+        return dict(self._client.pubsub_numsub(channel)).get(channel.encode(), 0)
+
+
+class PubSub:
+    """Flask extension: `pubsub.init_app(app)`, then `publish()` / `subscribe()`."""
+
+    def __init__(self):
+        self.broker = MemoryBroker()
+
+    def init_app(self, app):
+        backend = app.config.get('PUBSUB_BACKEND', 'memory')
+        if backend == 'memory':
+            self.broker = MemoryBroker()
+        elif backend == 'redis':
+            if redis is None:
+                raise RuntimeError("PUBSUB_BACKEND = 'redis' needs the redis package")
+            self.broker = RedisBroker(app.config['PUBSUB_REDIS_URL'])
+        else:
+            raise ValueError(f"Unknown PUBSUB_BACKEND: {backend!r}")
+
+        app.extensions['pubsub'] = self
+
+    def publish(self, channel, data):
+        self.broker.publish(channel, data)
+
+    def subscribe(self, channel):
+        return self.broker.subscribe(channel)
+
+    def subscriber_count(self, channel):
+        return self.broker.subscriber_count(channel)
+
+    @property
+    def shared(self):
+        """Whether events reach subscribers in every worker process."""
+        return self.broker.shared
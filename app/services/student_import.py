@@ -0,0 +1,221 @@
+"""
+Background CSV import of students.
+
+The upload is spooled to a temporary file by the request, then a worker
+thread streams it through csv.DictReader in fixed size chunks. Per chunk it
+  1. validates rows and drops duplicates inside the file,
+  2. fetches already registered emails / enrollment numbers with one IN query each,
+  3. hashes passwords on a small thread pool (hashlib releases the GIL, and
+     hashing is CPU bound and slow on purpose),
+  4. bulk inserts the User and StudentProfile rows and commits.
+
+Progress and per-row errors are stored in the ImportJob table, so the
+job-status endpoint answers from any app process and after a restart. A job
+whose worker died (the process was restarted mid-import) stops updating and
+is reported as failed.
+"""
+import os
+import csv
+import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from itertools import islice
+
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from werkzeug.security import generate_password_hash
+
+from app.extensions import db
+from app.models import User, StudentProfile, ImportJob
+from app.services.courses import canonical_course
+
+CHUNK_SIZE = 500
+MAX_REPORTED_ERRORS = 500
+REQUIRED_FIELDS = ['name', 'email', 'password', 'enrollment_number', 'course_name']
+# A queued / running job not updated for this long has lost its worker
+STALE_AFTER = timedelta(minutes=10)
+
+JOB_FIELDS = ['id', 'filename', 'status', 'rows', 'imported', 'skipped', 'error_count', 'errors', 'message']
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+def start_import(app, path, filename=None):
+    """Registers a job for the spooled CSV at `path` and starts its worker thread."""
+    job_id = uuid.uuid4().hex
+    db.session.add(ImportJob(id=job_id, filename=filename, status='queued', errors=[]))
+    db.session.commit()
+
+    worker = threading.Thread(target=_run_import, args=(app, job_id, path), daemon=True)
+    worker.start()
+    return job_id
+
+
+def get_job(job_id):
+    """Snapshot of a job's progress, or None if unknown."""
+    job = db.session.get(ImportJob, job_id, populate_existing=True)
+    if job is None:
+        return None
+    snapshot = {field: getattr(job, field) for field in JOB_FIELDS}
+    snapshot['errors'] = list(job.errors or [])
+    for field in ('started_at', 'finished_at'):
+        value = getattr(job, field)
+        snapshot[field] = value.isoformat() if value else None
+
+    updated_at = job.updated_at.replace(tzinfo=job.updated_at.tzinfo or timezone.utc)
+    if job.status in ('queued', 'running') and _now() - updated_at > STALE_AFTER:
+        snapshot['status'] = 'failed'
+        snapshot['message'] = 'The import stopped unexpectedly (the server was restarted). Upload the file again.'
+    return snapshot
+
+
+def _update(job_id, **values):
+    """Applies `values` to the job and commits (the worker's heartbeat)."""
+    job = db.session.get(ImportJob, job_id)
+    for field, value in values.items():
+        setattr(job, field, value)
+    job.updated_at = _now()
+    db.session.commit()
+
+
+def _record_errors(job_id, errors):
+    if not errors:
+        return
+    job = db.session.get(ImportJob, job_id)
+    room = MAX_REPORTED_ERRORS - len(job.errors or [])
+    _update(job_id,
+            skipped=job.skipped + len(errors),
+            error_count=job.error_count + len(errors),
+            errors=list(job.errors or []) + errors[:max(room, 0)])
+
+
+def _run_import(app, job_id, path):
+    with app.app_context():
+        workers = app.config.get('STUDENT_IMPORT_HASH_WORKERS')
+        pool = ThreadPoolExecutor(max_workers=workers) if workers != 0 else None
+        try:
+            _update(job_id, status='running')
+            with open(path, newline='', encoding='utf-8-sig') as f:
+                reader = csv.DictReader(f)
+                seen_emails, seen_enrollments = set(), set()
+                line_no = 1  # header
+
+                while True:
+                    chunk = list(islice(reader, CHUNK_SIZE))
+                    if not chunk:
+                        break
+                    numbered = list(enumerate(chunk, start=line_no + 1))
+                    line_no += len(chunk)
+
+                    imported = _import_chunk(job_id, numbered, seen_emails, seen_enrollments, pool)
+                    job = db.session.get(ImportJob, job_id)
+                    _update(job_id, rows=job.rows + len(chunk), imported=job.imported + imported)
+
+            _update(job_id, status='done', finished_at=_now())
+        except Exception as e:
+            db.session.rollback()
+            _update(job_id, status='failed', message=str(e), finished_at=_now())
+        finally:
+            if pool:
+                pool.shutdown()
+            db.session.remove()
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def _import_chunk(job_id, numbered_rows, seen_emails, seen_enrollments, pool):
+    """Validates, hashes and bulk inserts one chunk. Returns the number of students created."""
+    errors = []
+    candidates = []
+
+    # 1. Row level validation (and duplicates within the file itself)
+    for line, row in numbered_rows:
+        values = {key: (row.get(key) or '').strip() for key in REQUIRED_FIELDS + ['semester']}
+        missing = [key for key in REQUIRED_FIELDS if not values[key]]
+        if missing:
+            errors.append({'line': line, 'email': values['email'], 'error': f"Missing {', '.join(missing)}"})
+            continue
+
+        semester = values['semester'] or '1'
+        if not semester.isdigit():
+            errors.append({'line': line, 'email': values['email'], 'error': f"Invalid semester: {semester}"})
+            continue
+        values['semester'] = int(semester)
+
+        if values['email'] in seen_emails:
+            errors.append({'line': line, 'email': values['email'], 'error': 'Duplicate email in file'})
+            continue
+        if values['enrollment_number'] in seen_enrollments:
+            errors.append({'line': line, 'email': values['email'], 'error': 'Duplicate enrollment number in file'})
+            continue
+        seen_emails.add(values['email'])
+        seen_enrollments.add(values['enrollment_number'])
+        candidates.append((line, values))
+
+    # 2. One IN query per chunk for what is already registered
+    if candidates:
+        emails = [values['email'] for _, values in candidates]
+        enrollments = [values['enrollment_number'] for _, values in candidates]
+        existing_emails = {e for (e,) in db.session.query(User.email).filter(User.email.in_(emails))}
+        existing_enrollments = {
+            e for (e,) in db.session.query(StudentProfile.enrollment_number)
+            .filter(StudentProfile.enrollment_number.in_(enrollments))
+        }
+
+        fresh = []
+        for line, values in candidates:
+            if values['email'] in existing_emails:
+                errors.append({'line': line, 'email': values['email'], 'error': 'Email already registered'})
+            elif values['enrollment_number'] in existing_enrollments:
+                errors.append({'line': line, 'email': values['email'], 'error': 'Enrollment number already registered'})
+            else:
+                fresh.append((line, values))
+        candidates = fresh
+
+    _record_errors(job_id, errors)
+    if not candidates:
+        return 0
+
+    # 3. Hash off the request thread, on the pool's threads when there is one
+    passwords = [values['password'] for _, values in candidates]
+    if pool:
+        hashes = list(pool.map(generate_password_hash, passwords))
+    else:
+        hashes = [generate_password_hash(p) for p in passwords]
+
+    # 4. Bulk insert users, then their profiles
+    try:
+        _insert_students([values for _, values in candidates], hashes)
+    except IntegrityError:
+        # Someone registered one of these rows while the chunk was being hashed
+        db.session.rollback()
+        _record_errors(job_id, [
+            {'line': line, 'email': values['email'], 'error': 'Conflicts with a concurrent registration, chunk skipped'}
+            for line, values in candidates
+        ])
+        return 0
+    return len(candidates)
+
+
+def _insert_students(candidates, hashes):
+    user_rows = db.session.execute(
+        insert(User).returning(User.id, User.email),
+        [{'email': values['email'], 'password_hash': pw_hash, 'role': 'student'}
+         for values, pw_hash in zip(candidates, hashes)]
+    ).all()
+    user_ids = {email: uid for uid, email in user_rows}
+
+    db.session.execute(insert(StudentProfile), [{
+        'user_id': user_ids[values['email']],
+        'display_name': values['name'],
+        'enrollment_number': values['enrollment_number'],
+        # Core inserts skip the before_flush hook: store the canonical course key here
+        'course_name': canonical_course(values['course_name']),
+        'semester': values['semester'],
+    } for values in candidates])
+    db.session.commit()
@@ -0,0 +1,200 @@
+"""
+Maintenance of the materialized StudentAcademicSummary table.
+
+Summaries are refreshed incrementally for the (student, exam event) pairs a
+write touched, and can be rebuilt from scratch or checked against the raw
+StudentResult rows from manage.py.
+
+ORM writes to StudentResult are picked up automatically by the session hooks
+installed in register_summary_hooks(); bulk (Core) writes must call
+refresh_student_summaries() themselves.
+"""
+from sqlalchemy import event, func, inspect
+from sqlalchemy.orm import Session
+
+from app.extensions import db
+from app.models import StudentResult, ExamPaper, Subject, StudentAcademicSummary
+from app.services.grading import grade_points_expr, subject_credits_expr
+
+SUMMARY_FIELDS = ['result_count', 'marks_count', 'marks_sum', 'marks_sq_sum', 'total_credits', 'total_points']
+
+
+def _aggregate_results(student_ids=None, exam_event_id=None, session=None):
+    """
+    Aggregates raw results per (student, exam event) in one grouped query.
+    Returns {(student_id, exam_event_id): {field: value}}.
+    """
+    marks = StudentResult.marks_obtained
+    credits = subject_credits_expr(Subject.weekly_lectures)
+
+    query = (session or db.session).query(
+        StudentResult.student_id,
+        ExamPaper.exam_event_id,
+        func.count(StudentResult.id),
+        func.count(marks),
+        func.sum(marks),
+        func.sum(marks * marks),
+        func.sum(credits),
+        func.sum(grade_points_expr(marks) * credits)
+    ).join(ExamPaper, StudentResult.exam_paper_id == ExamPaper.id)\
+     .join(Subject, ExamPaper.subject_id == Subject.id)
+
+    if student_ids is not None:
+        query = query.filter(StudentResult.student_id.in_(student_ids))
+    if exam_event_id is not None:
+        query = query.filter(ExamPaper.exam_event_id == exam_event_id)
+
+    aggregates = {}
+    for sid, eid, *values in query.group_by(StudentResult.student_id, ExamPaper.exam_event_id).all():
+        aggregates[(sid, eid)] = {
+            field: (value or 0) for field, value in zip(SUMMARY_FIELDS, values)
+        }
+    return aggregates
+
+
+def _add_overall_rows(aggregates):
+    """Adds an overall (exam_event_id=None) entry per student by summing its events."""
+    overall = {}
+    for (sid, _), values in aggregates.items():
+        totals = overall.setdefault((sid, None), {field: 0 for field in SUMMARY_FIELDS})
+        for field in SUMMARY_FIELDS:
+            totals[field] += values[field]
+    aggregates.update(overall)
+    return aggregates
+
+
+def refresh_student_summaries(student_ids, exam_event_id=None, session=None):
+    """
+    Recomputes the summaries of the given students. If exam_event_id is given,
+    only that event is re-aggregated from raw results; the overall rows are
+    then rolled up from the (already materialized) per-event rows.
+    Works in `session` (default db.session); caller is responsible for committing.
+    """
+    session = session or db.session
+    student_ids = list(set(student_ids))
+    if not student_ids:
+        return
+
+    fresh = _aggregate_results(student_ids, exam_event_id, session)
+
+    existing = session.query(StudentAcademicSummary).filter(
+        StudentAcademicSummary.student_id.in_(student_ids)
+    ).all()
+    existing_map = {(row.student_id, row.exam_event_id): row for row in existing}
+
+    # Per-event rows that were not re-aggregated keep their stored values
+    if exam_event_id is not None:
+        for (sid, eid), row in existing_map.items():
+            if eid is not None and eid != exam_event_id:
+                fresh[(sid, eid)] = {field: getattr(row, field) for field in SUMMARY_FIELDS}
+
+    _add_overall_rows(fresh)
+
+    for key, values in fresh.items():
+        row = existing_map.pop(key, None)
+        if not row:
+            row = StudentAcademicSummary(student_id=key[0], exam_event_id=key[1])
+            session.add(row)
+        for field, value in values.items():
+            setattr(row, field, value)
+
+    # Anything left no longer has results behind it
+    for row in existing_map.values():
+        session.delete(row)
+
+
+def rebuild_all_summaries():
+    """Drops and recomputes every summary row. Returns the number of rows written."""
+    StudentAcademicSummary.query.delete()
+    aggregates = _add_overall_rows(_aggregate_results())
+    db.session.add_all([
+        StudentAcademicSummary(student_id=sid, exam_event_id=eid, **values)
+        for (sid, eid), values in aggregates.items()
+    ])
+    db.session.commit()
+    return len(aggregates)
+
+
+def check_summaries(tolerance=1e-6):
+    """
+    Compares the stored summaries against the raw results.
+    Returns a list of human readable mismatch descriptions (empty if consistent).
+    """
+    expected = _add_overall_rows(_aggregate_results())
+    stored = {
+        (row.student_id, row.exam_event_id): row
+        for row in StudentAcademicSummary.query.all()
+    }
+
+    problems = []
+    for key, values in expected.items():
+        row = stored.pop(key, None)
+        label = f"student {key[0]} / event {key[1] or 'overall'}"
+        if not row:
+            problems.append(f"Missing summary for {label}")
+            continue
+        for field, value in values.items():
+            if abs((getattr(row, field) or 0) - value) > tolerance:
+                problems.append(f"{label}: {field} is {getattr(row, field)}, expected {value}")
+
+    for key in stored:
+        problems.append(f"Stale summary for student {key[0]} / event {key[1] or 'overall'}")
+    return problems
+
+
+# --- Automatic refresh on commit ---
+
+def _track_result_changes(session, flush_context):
+    """after_flush: remember which (student, paper) pairs were written."""
+    dirty = session.info.setdefault('summary_dirty', set())
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if not isinstance(obj, StudentResult):
+            continue
+        dirty.add((obj.student_id, obj.exam_paper_id))
+
+        # Re-assigned results also invalidate their previous owner / paper
+        state = inspect(obj)
+        old_students = state.attrs.student_id.history.deleted or [obj.student_id]
+        old_papers = state.attrs.exam_paper_id.history.deleted or [obj.exam_paper_id]
+        for sid in old_students:
+            for pid in old_papers:
+                dirty.add((sid, pid))
+
+
+def _refresh_before_commit(session):
+    """before_commit: fold the tracked result changes into the summaries."""
+    session.flush()
+    dirty = session.info.pop('summary_dirty', None)
+    if not dirty:
+        return
+
+    paper_ids = {pid for _, pid in dirty if pid is not None}
+    event_map = dict(
+        session.query(ExamPaper.id, ExamPaper.exam_event_id)
+        .filter(ExamPaper.id.in_(paper_ids)).all()
+    ) if paper_ids else {}
+
+    # Group students per exam event; unknown (deleted) papers force a full refresh
+    by_event = {}
+    for sid, pid in dirty:
+        if sid is None:
+            continue
+        by_event.setdefault(event_map.get(pid), set()).add(sid)
+
+    for eid, student_ids in by_event.items():
+        refresh_student_summaries(student_ids, exam_event_id=eid, session=session)
+    session.flush()
+    session.info.pop('summary_dirty', None)
+
+
+def _discard_tracked_changes(session, previous_transaction):
+    session.info.pop('summary_dirty', None)
+
+
+def register_summary_hooks():
+    """Installs the session hooks (idempotent, safe to call per app)."""
+    if event.contains(Session, 'after_flush', _track_result_changes):
+        return
+    event.listen(Session, 'after_flush', _track_result_changes)
+    event.listen(Session, 'before_commit', _refresh_before_commit)
+    event.listen(Session, 'after_soft_rollback', _discard_tracked_changes)
@@ -0,0 +1,109 @@
+"""
+Resolved weekly timetables per cohort (course, semester), served from cache.
+
+A cohort's grid is built once with one joined query (slots, subjects and
+their faculty) plus its ScheduleSettings, with every period's start and end
+time already worked out, and kept in `timetable_cache`. Student and faculty
+pages read it from there instead of querying per slot.
+
+The cache is watched: any ORM commit touching Timetable, ScheduleSettings,
+Subject, Course or FacultyProfile (generate_timetable, update_slot, subject
+edits...) drops every entry. Bulk (Core) writes must call
+timetable_cache.invalidate() themselves.
+"""
+from collections import namedtuple
+from datetime import datetime, date, timedelta
+
+from sqlalchemy.orm import joinedload
+
+from app.extensions import db, timetable_cache
+from app.models import Timetable, ScheduleSettings, Subject
+from app.services.courses import canonical_course
+
+# Fallback when a cohort has no ScheduleSettings: 09:00 start, one hour periods
+DEFAULT_START_HOUR = 9
+DEFAULT_PERIOD_MINUTES = 60
+
+SlotFaculty = namedtuple('SlotFaculty', ['id', 'display_name'])
+SlotSubject = namedtuple('SlotSubject', ['id', 'name', 'faculty'])
+TimetableSlot = namedtuple('TimetableSlot', [
+    'id', 'course_name', 'semester', 'day_of_week', 'period_number',
+    'subject', 'faculty_id', 'room_number', 'start_time', 'end_time'
+])
+# slots are ordered by (period_number, id)
+CohortTimetable = namedtuple('CohortTimetable', ['course_name', 'semester', 'has_settings', 'slots'])
+
+
+def default_period_times(period_number):
+    start = datetime.combine(date.today(), datetime.min.time()) + \
+        timedelta(minutes=DEFAULT_START_HOUR * 60 + (period_number - 1) * DEFAULT_PERIOD_MINUTES)
+    return start.time(), (start + timedelta(minutes=DEFAULT_PERIOD_MINUTES)).time()
+
+
+def build_cohort_timetable(course_name, semester):
+    """Builds a cohort's resolved grid from the database (uncached)."""
+    settings = ScheduleSettings.query.filter_by(course_name=course_name, semester=semester).first()
+    entries = Timetable.query.options(
+        joinedload(Timetable.subject).joinedload(Subject.faculty)
+    ).filter_by(course_name=course_name, semester=semester)\
+     .order_by(Timetable.period_number, Timetable.id).all()
+
+    periods = sorted({entry.period_number for entry in entries})
+    if settings:
+        period_times = dict(zip(periods, settings.get_period_times_batch(periods)))
+    else:
+        period_times = {p: default_period_times(p) for p in periods}
+
+    slots = []
+    for entry in entries:
+        start, end = period_times[entry.period_number]
+
+        faculty = entry.subject.faculty
+        subject = SlotSubject(entry.subject.id, entry.subject.name,
+                              SlotFaculty(faculty.id, faculty.display_name) if faculty else None)
+        slots.append(TimetableSlot(entry.id, entry.course_name, entry.semester, entry.day_of_week,
+                                   entry.period_number, subject, entry.faculty_id, entry.room_number,
+                                   start, end))
+    return CohortTimetable(course_name, semester, settings is not None, tuple(slots))
+
+
+def _cached(key, build):
+    # Versioned keys: an entry built from data a commit has since changed is never read again
+    key = f"{key}:{timetable_cache.version}"
+    value = timetable_cache.get(key)
+    if value is None:
+        value = build()
+        timetable_cache.set(key, value)
+    return value
+
+
+def cohort_timetable(course_name, semester):
+    """The cohort's CohortTimetable, built on first use."""
+    return _cached(f"cohort:{course_name}:{semester}",
+                   lambda: build_cohort_timetable(course_name, semester))
+
+
+def student_timetable(student):
+    """CohortTimetable of the student's class."""
+    return cohort_timetable(canonical_course(student.course_name), student.semester)
+
+
+def faculty_cohorts(faculty_id):
+    """(course_name, semester) of every cohort the faculty member teaches in."""
+    return _cached(f"faculty:{faculty_id}", lambda: tuple(
+        (course_name, semester) for course_name, semester in
+        db.session.query(Timetable.course_name, Timetable.semester)
+        .filter(Timetable.faculty_id == faculty_id).distinct()
+        .order_by(Timetable.course_name, Timetable.semester).all()
+    ))
+
+
+def faculty_slots(faculty_id, day_of_week=None):
+    """The faculty member's slots across cohorts (optionally one day), ordered by period."""
+    slots = [
+        slot
+        for course_name, semester in faculty_cohorts(faculty_id)
+        for slot in cohort_timetable(course_name, semester).slots
+        if slot.faculty_id == faculty_id and (day_of_week is None or slot.day_of_week == day_of_week)
+    ]
+    return sorted(slots, key=lambda s: (s.period_number, s.id))
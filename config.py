@@ -26,6 +26,57 @@ class Config:
             'sqlite:///' + os.path.join(basedir, 'app.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+    # Report API cache: 'memory' (entries per process), 'filesystem' (entries shared) or 'null'.
+    # Either way writes invalidate every worker through a VERSION file in REPORT_CACHE_DIR
+    # (default instance/report_cache), so keep that directory on storage all workers share
+    REPORT_CACHE_BACKEND = os.environ.get('REPORT_CACHE_BACKEND', 'memory')
+    REPORT_CACHE_TTL = int(os.environ.get('REPORT_CACHE_TTL', 300))
+    REPORT_CACHE_MAX_ENTRIES = 128
+    REPORT_CACHE_DIR = os.environ.get('REPORT_CACHE_DIR')
+
+    # Resolved timetable grids (same backends and shared VERSION file as the report cache;
+    # generate / slot edits on any worker drop every worker's grids)
+    TIMETABLE_CACHE_BACKEND = os.environ.get('TIMETABLE_CACHE_BACKEND', 'memory')
+    TIMETABLE_CACHE_TTL = int(os.environ.get('TIMETABLE_CACHE_TTL', 3600))
+    TIMETABLE_CACHE_MAX_ENTRIES = 512
+    TIMETABLE_CACHE_DIR = os.environ.get('TIMETABLE_CACHE_DIR')
+
+    # Course alias index (one small entry, reloaded on every worker after course add / edit /
+    # delete, and on any unknown alias)
+    COURSE_CACHE_BACKEND = os.environ.get('COURSE_CACHE_BACKEND', 'memory')
+    COURSE_CACHE_TTL = int(os.environ.get('COURSE_CACHE_TTL', 3600))
+    COURSE_CACHE_DIR = os.environ.get('COURSE_CACHE_DIR')
+
+    # Student dashboard widgets (each widget sets its own TTL; writes on any worker invalidate)
+    DASHBOARD_CACHE_BACKEND = os.environ.get('DASHBOARD_CACHE_BACKEND', 'memory')
+    DASHBOARD_CACHE_MAX_ENTRIES = 4096
+    DASHBOARD_CACHE_DIR = os.environ.get('DASHBOARD_CACHE_DIR')
+
+    # Rows per page on keyset paginated list pages, and in the student notice feed
+    LIST_PAGE_SIZE = 50
+    NOTICES_PER_PAGE = 20
+
+    # Query chat: messages per thread page (and per poll response)
+    MESSAGES_PER_PAGE = 30
+
+    # Live chat events: 'memory' (per process) or 'redis' (shared, needs the redis package)
+    PUBSUB_BACKEND = os.environ.get('PUBSUB_BACKEND', 'memory')
+    PUBSUB_REDIS_URL = os.environ.get('PUBSUB_REDIS_URL', 'redis://localhost:6379/0')
+    # Open chats poll by default. Server-sent events hold a worker per open chat, so
+    # CHAT_EVENT_STREAM is only honoured with PUBSUB_BACKEND = 'redis' and should only
+    # be set when running async workers (gunicorn -k gevent), see docs/DEPLOYMENT.md
+    CHAT_EVENT_STREAM = bool(os.environ.get('CHAT_EVENT_STREAM'))
+    # Event streams send a comment every SSE_KEEPALIVE seconds and end after
+    # SSE_MAX_DURATION (browsers reconnect and resume), so no worker is held forever
+    SSE_KEEPALIVE = 15
+    SSE_MAX_DURATION = 300
+
+    # Password hashing threads for CSV student imports (None = CPU count + 4, 0 = inline)
+    STUDENT_IMPORT_HASH_WORKERS = None
+
+    # Report identity queries per request in an X-Identity-Queries header (always on when DEBUG)
+    IDENTITY_QUERY_HEADER = False
+
 class DevelopmentConfig(Config):
     DEBUG = True
 
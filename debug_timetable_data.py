@@ -26,21 +26,16 @@ with app.app_context():
             for t in direct_entries:
                 print(f" - Day: {t.day_of_week}, Period: {t.period_number}, SubjectID: {t.subject_id}")
             
-            # 2. Code/Name Mismatch Check
-            c_def = Course.query.filter((Course.name == s.course_name) | (Course.code == s.course_name)).first()
-            if c_def:
-                print(f"Resolved Course Def -> Name: '{c_def.name}', Code: '{c_def.code}'")
-                
-                if c_def.code != s.course_name:
-                    code_entries = Timetable.query.filter_by(course_name=c_def.code, semester=s.semester).all()
-                    print(f"Entries matching CODE '{c_def.code}': {len(code_entries)}")
-                    for t in code_entries:
-                         print(f" - Day: {t.day_of_week}, Period: {t.period_number}, SubjectID: {t.subject_id}")
-
-                if c_def.name != s.course_name:
-                    name_entries = Timetable.query.filter_by(course_name=c_def.name, semester=s.semester).all()
-                    print(f"Entries matching NAME '{c_def.name}': {len(name_entries)}")
-            else:
+            # 2. Canonical key (what the timetable pages look up)
+            from app.services.courses import canonical_course
+            key = canonical_course(s.course_name)
+            if key != s.course_name:
+                print(f"Course '{s.course_name}' resolves to canonical key '{key}' (run: python manage.py normalize-courses)")
+                key_entries = Timetable.query.filter_by(course_name=key, semester=s.semester).all()
+                print(f"Entries matching Course='{key}': {len(key_entries)}")
+                for t in key_entries:
+                     print(f" - Day: {t.day_of_week}, Period: {t.period_number}, SubjectID: {t.subject_id}")
+            elif not Course.query.filter_by(code=key).first():
                  print("CRITICAL: Course Definition NOT FOUND for this student's course_name!")
         else:
             print("StudentProfile not found for this user.")
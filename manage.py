@@ -377,5 +377,122 @@ def seed():
 
         print("--- Standard Seeding Complete ---")
 
+@cli.command("rebuild-summaries")
+def rebuild_summaries():
+    """Rebuild the materialized academic summaries from raw results."""
+    from app.services.summaries import rebuild_all_summaries
+    with create_app().app_context():
+        count = rebuild_all_summaries()
+        print(f"--- Rebuilt {count} academic summary rows ---")
+
+@cli.command("check-summaries")
+def check_summaries_cmd():
+    """Verify the academic summaries against raw results."""
+    from app.services.summaries import check_summaries
+    with create_app().app_context():
+        problems = check_summaries()
+        if not problems:
+            print("--- Academic summaries are consistent ---")
+            return
+        for problem in problems[:50]:
+            print(problem)
+        print(f"--- {len(problems)} inconsistencies found. Run 'rebuild-summaries' to fix. ---")
+        sys.exit(1)
+
+@cli.command("prune-thumbnails")
+def prune_thumbnails_cmd():
+    """Delete stored thumbnails whose source image no longer exists."""
+    from app.services.media import prune_thumbnails
+    with create_app().app_context():
+        count = prune_thumbnails()
+        print(f"--- Pruned {count} orphaned thumbnails ---")
+
+@cli.command("rebuild-attendance-counters")
+def rebuild_attendance_counters_cmd():
+    """Backfill the subject-wise attendance counters from raw attendance."""
+    from app.services.attendance_counters import rebuild_attendance_counters
+    with create_app().app_context():
+        db.create_all() # Adds the counter table to existing databases
+        count = rebuild_attendance_counters()
+        print(f"--- Rebuilt {count} attendance counter rows ---")
+
+@cli.command("create-indexes")
+def create_indexes_cmd():
+    """Create tables and indexes declared on the models that an existing database lacks."""
+    from sqlalchemy import inspect
+    with create_app().app_context():
+        db.create_all() # New tables come with their indexes
+        inspector = inspect(db.engine)
+        created = 0
+        for table in db.metadata.sorted_tables:
+            existing = {ix['name'] for ix in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in existing:
+                    index.create(db.engine)
+                    print(f"Created {index.name} on {table.name}")
+                    created += 1
+        print(f"--- {created} indexes created ---")
+
+@cli.command("normalize-courses")
+def normalize_courses_cmd():
+    """Rewrite course names stored as a Course's name to its code, then add the course indexes."""
+    from sqlalchemy import inspect
+    from app.services.courses import normalize_course_names
+    with create_app().app_context():
+        db.create_all()
+        for table, count in normalize_course_names().items():
+            print(f"{table}: {count} rows normalized")
+        inspector = inspect(db.engine)
+        for table in db.metadata.sorted_tables:
+            existing = {ix['name'] for ix in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name.endswith('_course_semester') and index.name not in existing:
+                    index.create(db.engine)
+                    print(f"Created {index.name} on {table.name}")
+
+@cli.command("dedupe-attendance")
+def dedupe_attendance_cmd():
+    """Keep the latest mark per (student, subject, date), then add the unique attendance index."""
+    from sqlalchemy import func, inspect
+    from app.models import Attendance
+    from app.services.attendance_counters import rebuild_attendance_counters
+    with create_app().app_context():
+        keep = db.session.query(func.max(Attendance.id)).group_by(
+            Attendance.student_id, Attendance.subject_id, Attendance.date
+        ).filter(Attendance.subject_id.isnot(None))
+        removed = Attendance.query.filter(
+            Attendance.subject_id.isnot(None), Attendance.id.notin_(keep)
+        ).delete(synchronize_session=False)
+        db.session.commit()
+        print(f"{removed} duplicate attendance rows removed")
+        if removed:
+            print(f"{rebuild_attendance_counters()} attendance counters rebuilt")
+
+        index = next(ix for ix in Attendance.__table__.indexes if ix.name == 'uq_attendance_student_subject_date')
+        if index.name not in {ix['name'] for ix in inspect(db.engine).get_indexes('attendance')}:
+            index.create(db.engine)
+            print(f"Created {index.name} on attendance")
+
+@cli.command("dedupe-results")
+def dedupe_results_cmd():
+    """Keep the latest result per (paper, student), then add the unique result index."""
+    from sqlalchemy import func, inspect
+    from app.models import StudentResult
+    from app.services.summaries import rebuild_all_summaries
+    with create_app().app_context():
+        keep = db.session.query(func.max(StudentResult.id)).group_by(
+            StudentResult.exam_paper_id, StudentResult.student_id
+        )
+        removed = StudentResult.query.filter(StudentResult.id.notin_(keep)).delete(synchronize_session=False)
+        db.session.commit()
+        print(f"{removed} duplicate results removed")
+        if removed:
+            print(f"{rebuild_all_summaries()} summaries rebuilt")
+
+        index = next(ix for ix in StudentResult.__table__.indexes if ix.name == 'uq_student_result_paper_student')
+        if index.name not in {ix['name'] for ix in inspect(db.engine).get_indexes('student_result')}:
+            index.create(db.engine)
+            print(f"Created {index.name} on student_result")
+
 if __name__ == "__main__":
     cli()
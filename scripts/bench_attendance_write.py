@@ -0,0 +1,132 @@
+"""
+Benchmark for saving a class attendance sheet (app.services.attendance_writer).
+
+For each class size, times the first save of a lecture (every mark new) and
+a re-save with a tenth of the marks changed, with the former per-student
+loop (one SELECT per student, ORM add / dirty flush) against
+write_attendance(), on a throwaway SQLite database. Statement counts are
+reported next to the timings (attendance counter maintenance included):
+the loop issues one SELECT per student, the bulk writer one read and at
+most two batched writes for the sheet itself.
+
+Usage:
+    python scripts/bench_attendance_write.py [--sizes 60 120 300 600] [--repeat 5]
+"""
+import sys
+import os
+import time
+import argparse
+import tempfile
+from datetime import date, timedelta
+
+# The benchmark must never touch the real database: point the config at a
+# scratch file before the app (and its config) is imported. The DB_* variables
+# are blanked rather than removed, since load_dotenv() would restore them from .env.
+DB_FILE = os.path.join(tempfile.mkdtemp(), 'bench_attendance.db')
+os.environ['DATABASE_URL'] = 'sqlite:///' + DB_FILE
+for key in ('DB_USER', 'DB_PASSWORD', 'DB_HOST', 'DB_NAME'):
+    os.environ[key] = ''
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event, insert
+from app import create_app, db
+from app.models import User, StudentProfile, Subject, Attendance
+from app.services.attendance_writer import write_attendance
+
+START = date(2030, 1, 6)
+
+
+def assert_scratch_database():
+    """Refuses to go on unless the app is bound to the scratch SQLite file."""
+    url = db.engine.url
+    assert url.get_backend_name() == 'sqlite' and os.path.abspath(url.database or '') == DB_FILE, \
+        f"Benchmark refused to drop tables on {url.render_as_string(hide_password=True)}"
+
+
+def per_student_save(subject, on_date, statuses):
+    """The faculty attendance() POST before the bulk writer."""
+    for student_id, status in statuses.items():
+        att = Attendance.query.filter_by(student_id=student_id, subject_id=subject.id, date=on_date).first()
+        if att:
+            att.status = status
+        else:
+            db.session.add(Attendance(student_id=student_id, course_name=subject.course_name, date=on_date,
+                                      status=status, subject_id=subject.id))
+    db.session.commit()
+
+
+def bulk_save(subject, on_date, statuses):
+    write_attendance(subject, on_date, statuses)
+    db.session.commit()
+
+
+def create_class(size):
+    """A subject and `size` enrolled students; returns (subject, student ids)."""
+    first = db.session.query(db.func.count(User.id)).scalar()
+    db.session.execute(insert(User), [
+        {'email': f'bench{i}@edu.com', 'password_hash': '-', 'role': 'student'} for i in range(first, first + size)
+    ])
+    user_ids = [uid for (uid,) in db.session.query(User.id).filter(User.id > first).order_by(User.id)]
+    db.session.execute(insert(StudentProfile), [
+        {'user_id': uid, 'display_name': f'Bench {uid}', 'enrollment_number': f'BEN{uid:06d}',
+         'course_name': 'BENCH', 'semester': 1} for uid in user_ids
+    ])
+    subject = Subject(name=f'Bench {size}', course_name='BENCH', semester=1)
+    db.session.add(subject)
+    db.session.commit()
+    student_ids = [sid for (sid,) in db.session.query(StudentProfile.id).filter(StudentProfile.user_id.in_(user_ids))]
+    return subject, student_ids
+
+
+def timed(save, subject, statuses, resave, lectures):
+    """Best time (and statement count) of saving a sheet, over `lectures` fresh dates."""
+    best, statements = None, []
+    count = lambda *args: statements.append(1)
+    for n, on_date in enumerate(lectures):
+        if resave:
+            bulk_save(subject, on_date, {sid: 'Present' for sid in statuses})
+        db.session.expire_all()
+        statements.clear()
+        event.listen(db.engine, 'before_cursor_execute', count)
+        start = time.perf_counter()
+        save(subject, on_date, statuses)
+        elapsed = time.perf_counter() - start
+        event.remove(db.engine, 'before_cursor_execute', count)
+        best = elapsed if best is None else min(best, elapsed)
+    return best, len(statements)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[60, 120, 300, 600])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        assert_scratch_database()
+        db.drop_all()
+        db.create_all()
+
+        print(f"{'class':>6} {'save':>7} {'loop (ms)':>10} {'stmts':>6} {'bulk (ms)':>10} {'stmts':>6}")
+        day = 0
+        for size in args.sizes:
+            subject, student_ids = create_class(size)
+            # A tenth of the class marked absent on a re-save
+            statuses = {sid: 'Absent' if i % 10 == 0 else 'Present' for i, sid in enumerate(student_ids)}
+            for label, resave in (('first', False), ('resave', True)):
+                results = []
+                for save in (per_student_save, bulk_save):
+                    lectures = [START + timedelta(days=day + i) for i in range(args.repeat)]
+                    day += args.repeat
+                    results.append(timed(save, subject, statuses, resave, lectures))
+                (loop_time, loop_stmts), (bulk_time, bulk_stmts) = results
+                print(f"{size:>6} {label:>7} {loop_time * 1000:>10.2f} {loop_stmts:>6} "
+                      f"{bulk_time * 1000:>10.2f} {bulk_stmts:>6}")
+
+    os.remove(DB_FILE)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+"""
+Benchmark for the Future Sight career engine (admin reports).
+
+Seeds a throwaway SQLite database with N students x R results and times the
+grouped per-student pass used by future_data() against the legacy
+"scan every result for every student" loop.
+
+Usage:
+    python scripts/bench_future_engine.py [--sizes 1000 2500 5000 10000] [--results 20] [--legacy-max 1000]
+"""
+import sys
+import os
+import time
+import random
+import argparse
+import statistics
+import tempfile
+from datetime import date, time as dtime
+
+# The benchmark must never touch the real database: point the config at a
+# scratch file before the app (and its config) is imported. The DB_* variables
+# are blanked rather than removed, since load_dotenv() would restore them from .env.
+DB_FILE = os.path.join(tempfile.mkdtemp(), 'bench_future.db')
+os.environ['DATABASE_URL'] = 'sqlite:///' + DB_FILE
+for key in ('DB_USER', 'DB_PASSWORD', 'DB_HOST', 'DB_NAME'):
+    os.environ[key] = ''
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert
+from app import create_app, db
+from app.models import User, StudentProfile, Subject, ExamEvent, ExamPaper, StudentResult
+from app.services.analytics import student_mark_stats, project_career
+
+
+def assert_scratch_database():
+    """Refuses to go on unless the app is bound to the scratch SQLite file."""
+    url = db.engine.url
+    assert url.get_backend_name() == 'sqlite' and os.path.abspath(url.database or '') == DB_FILE, \
+        f"Benchmark refused to drop tables on {url.render_as_string(hide_password=True)}"
+
+
+def seed(num_students, results_per_student):
+    assert_scratch_database()
+    db.drop_all()
+    db.create_all()
+
+    db.session.execute(insert(Subject), [
+        {'id': i + 1, 'name': f'Bench Subject {i + 1}', 'course_name': 'B.Tech', 'semester': 1}
+        for i in range(results_per_student)
+    ])
+    db.session.execute(insert(ExamEvent), [{
+        'id': 1, 'name': 'Bench Finals', 'academic_year': '2025-2026', 'course_name': 'B.Tech',
+        'semester': 1, 'start_date': date.today(), 'end_date': date.today()
+    }])
+    db.session.execute(insert(ExamPaper), [{
+        'id': i + 1, 'exam_event_id': 1, 'subject_id': i + 1, 'date': date.today(),
+        'start_time': dtime(9, 0), 'end_time': dtime(12, 0)
+    } for i in range(results_per_student)])
+
+    db.session.execute(insert(User), [
+        {'id': i + 1, 'email': f'bench{i + 1}@edu.com', 'role': 'student', 'password_hash': 'x'}
+        for i in range(num_students)
+    ])
+    db.session.execute(insert(StudentProfile), [{
+        'id': i + 1, 'user_id': i + 1, 'display_name': f'Bench Student {i + 1}',
+        'enrollment_number': f'BENCH{i + 1:06d}', 'course_name': 'B.Tech', 'semester': 1
+    } for i in range(num_students)])
+
+    rng = random.Random(42)
+    rows = []
+    for sid in range(1, num_students + 1):
+        base = rng.uniform(40, 95)
+        for pid in range(1, results_per_student + 1):
+            # A few absent (0) and un-graded (None) entries, like real data
+            roll = rng.random()
+            marks = None if roll < 0.02 else 0.0 if roll < 0.04 else round(min(100, max(0, rng.gauss(base, 8))), 1)
+            rows.append({'student_id': sid, 'exam_paper_id': pid, 'marks_obtained': marks})
+    db.session.execute(insert(StudentResult), rows)
+    db.session.commit()
+
+
+def grouped_engine():
+    return [project_career(row.mean, row.stdev) for row in student_mark_stats(exclude_zero=True)]
+
+
+def legacy_engine():
+    students = StudentProfile.query.all()
+    results = StudentResult.query.all()
+    projections = []
+    for s in students:
+        s_res = [r.marks_obtained for r in results if r.student_id == s.id and r.marks_obtained]
+        if not s_res: continue
+        s_var = statistics.stdev(s_res) if len(s_res) > 1 else 0
+        projections.append(project_career(statistics.mean(s_res), s_var))
+    return projections
+
+
+def timed(fn, repeat=3):
+    best = None
+    output = None
+    for _ in range(repeat):
+        db.session.expunge_all()
+        start = time.perf_counter()
+        output = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, output
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 2500, 5000, 10000])
+    parser.add_argument('--results', type=int, default=20, help='results per student')
+    parser.add_argument('--legacy-max', type=int, default=1000, help='skip the quadratic loop above this many students')
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        print(f"{'students':>9} {'results':>9} {'grouped (s)':>12} {'us/student':>11} {'legacy (s)':>11} {'speedup':>8}")
+        for n in args.sizes:
+            seed(n, args.results)
+            grouped_time, grouped_out = timed(grouped_engine)
+
+            legacy_col, speedup_col = '-', '-'
+            if n <= args.legacy_max:
+                legacy_time, legacy_out = timed(legacy_engine, repeat=1)
+                # Same roles, same packages (up to float summation order)
+                assert [r for r, _ in grouped_out] == [r for r, _ in legacy_out]
+                assert all(abs(a - b) < 1e-9 for (_, a), (_, b) in zip(grouped_out, legacy_out))
+                legacy_col = f"{legacy_time:.3f}"
+                speedup_col = f"{legacy_time / grouped_time:.0f}x"
+
+            print(f"{n:>9} {n * args.results:>9} {grouped_time:>12.3f} "
+                  f"{grouped_time / n * 1e6:>11.1f} {legacy_col:>11} {speedup_col:>8}")
+
+    os.remove(DB_FILE)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""
+Benchmark for keyset pagination (app.services.pagination).
+
+Grows the notice table of a throwaway SQLite database through the given
+sizes and times fetching one page of the newest-first feed at the start,
+middle and end of the table, with a keyset cursor against LIMIT/OFFSET.
+Keyset pages should take about the same time at every size and depth.
+
+Usage:
+    python scripts/bench_keyset_pagination.py [--sizes 1000 10000 100000 1000000] [--per-page 50]
+"""
+import sys
+import os
+import time
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+
+# The benchmark must never touch the real database: point the config at a
+# scratch file before the app (and its config) is imported. The DB_* variables
+# are blanked rather than removed, since load_dotenv() would restore them from .env.
+DB_FILE = os.path.join(tempfile.mkdtemp(), 'bench_pagination.db')
+os.environ['DATABASE_URL'] = 'sqlite:///' + DB_FILE
+for key in ('DB_USER', 'DB_PASSWORD', 'DB_HOST', 'DB_NAME'):
+    os.environ[key] = ''
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert
+from app import create_app, db
+from app.models import Notice
+from app.services.notices import NOTICE_ORDER
+from app.services.pagination import keyset_page, encode_cursor, order_clauses
+
+START = datetime(2020, 1, 1)
+CHUNK = 50000
+
+
+def assert_scratch_database():
+    """Refuses to go on unless the app is bound to the scratch SQLite file."""
+    url = db.engine.url
+    assert url.get_backend_name() == 'sqlite' and os.path.abspath(url.database or '') == DB_FILE, \
+        f"Benchmark refused to drop tables on {url.render_as_string(hide_password=True)}"
+
+
+def grow(current, target):
+    """Adds notices until the table holds `target` rows (several per second, some sharing a timestamp)."""
+    for first in range(current, target, CHUNK):
+        db.session.execute(insert(Notice), [{
+            'title': f'Bench notice {i}', 'content': 'Benchmark notice body', 'category': 'general',
+            'target_type': 'all', 'created_at': START + timedelta(seconds=i // 3)
+        } for i in range(first, min(first + CHUNK, target))])
+    db.session.commit()
+
+
+def cursor_at(position):
+    """Cursor of the row just before `position` in feed order (None for the first page)."""
+    if position == 0:
+        return None
+    row = Notice.query.order_by(*order_clauses(NOTICE_ORDER)).offset(position - 1).first()
+    return encode_cursor([row.created_at, row.id])
+
+
+def timed(fn, repeat=5):
+    best = None
+    for _ in range(repeat):
+        db.session.expunge_all()
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000, 1000000])
+    parser.add_argument('--per-page', type=int, default=50)
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        assert_scratch_database()
+        db.drop_all()
+        db.create_all()
+        query = Notice.query.filter(Notice.target_type == 'all')
+
+        print(f"{'rows':>9} {'depth':>7} {'keyset (ms)':>12} {'offset (ms)':>12}")
+        rows = 0
+        for size in sorted(args.sizes):
+            grow(rows, size)
+            rows = size
+            for label, position in (('first', 0), ('middle', size // 2), ('last', size - args.per_page)):
+                cursor = cursor_at(position)
+                keyset = keyset_page(query, NOTICE_ORDER, args.per_page, cursor)
+                offset = query.order_by(*order_clauses(NOTICE_ORDER)).offset(position).limit(args.per_page).all()
+                # Both strategies land on the same rows
+                assert [n.id for n in keyset.items] == [n.id for n in offset]
+
+                keyset_time = timed(lambda: keyset_page(query, NOTICE_ORDER, args.per_page, cursor))
+                offset_time = timed(lambda: query.order_by(*order_clauses(NOTICE_ORDER))
+                                    .offset(position).limit(args.per_page).all())
+                print(f"{size:>9} {label:>7} {keyset_time * 1000:>12.2f} {offset_time * 1000:>12.2f}")
+
+    os.remove(DB_FILE)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+Micro-benchmark for ScheduleSettings period times.
+
+Times resolving every period of a day (and a week's worth of slots) with
+the former per-call arithmetic, with get_period_times() reading the
+precomputed period table, and with get_period_times_batch(). No database
+is needed: the settings object is never persisted.
+
+Usage:
+    python scripts/bench_period_times.py [--slots 8] [--number 20000]
+"""
+import sys
+import os
+import timeit
+import argparse
+from datetime import datetime, date, time, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models import ScheduleSettings
+
+
+def per_call_period_times(settings, period_number):
+    """get_period_times() as it was before the period table: recomputed on every call."""
+    start_min = settings.start_time.hour * 60 + settings.start_time.minute
+    end_min = settings.end_time.hour * 60 + settings.end_time.minute
+    recess_dur = settings.recess_duration or 0
+    recess_after = settings.recess_after_slot or (settings.slots_per_day // 2)
+    total_minutes = (end_min - start_min) - recess_dur
+    if total_minutes <= 0:
+        total_minutes = settings.slots_per_day * 60
+    slot_duration = total_minutes // settings.slots_per_day
+    p_idx = period_number - 1
+    current_start_min = start_min + (p_idx * slot_duration)
+    if recess_after > 0 and p_idx >= recess_after:
+        current_start_min += recess_dur
+    start_dt = datetime.combine(date.today(), datetime.min.time()) + timedelta(minutes=current_start_min)
+    end_dt = start_dt + timedelta(minutes=slot_duration)
+    return start_dt.time(), end_dt.time()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--slots', type=int, default=8)
+    parser.add_argument('--number', type=int, default=20000)
+    args = parser.parse_args()
+
+    settings = ScheduleSettings(start_time=time(9, 0), end_time=time(17, 0), slots_per_day=args.slots,
+                                recess_duration=30, recess_after_slot=args.slots // 2)
+    day = list(range(1, args.slots + 1))
+    week = day * 6  # one lookup per slot of a six-day grid
+
+    # All three strategies agree
+    expected = [per_call_period_times(settings, p) for p in week]
+    assert [settings.get_period_times(p) for p in week] == expected
+    assert settings.get_period_times_batch(week) == expected
+
+    cases = [
+        ('per-call arithmetic', lambda periods: [per_call_period_times(settings, p) for p in periods]),
+        ('get_period_times', lambda periods: [settings.get_period_times(p) for p in periods]),
+        ('get_period_times_batch', lambda periods: settings.get_period_times_batch(periods)),
+    ]
+    print(f"{'strategy':<24} {'day (us)':>10} {'week (us)':>10}")
+    for label, fn in cases:
+        timings = []
+        for periods in (day, week):
+            best = min(timeit.repeat(lambda: fn(periods), number=args.number, repeat=5))
+            timings.append(best / args.number * 1e6)
+        print(f"{label:<24} {timings[0]:>10.2f} {timings[1]:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
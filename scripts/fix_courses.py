@@ -6,6 +6,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app import create_app, db
 from app.models import Course
+from app.services.courses import canonical_course, normalize_course_names
 
 app = create_app()
 
@@ -20,7 +21,8 @@ with app.app_context():
     ]
     
     for n in needed:
-        if n['code'] not in existing:
+        # Known by code or by name (aliases resolve to the existing code)
+        if canonical_course(n['code']) not in existing and canonical_course(n['name']) not in existing:
             c = Course(
                 name=n['name'], 
                 code=n['code'], 
@@ -32,4 +34,8 @@ with app.app_context():
             print(f'Added {n["code"]}')
     
     db.session.commit()
+    
+    # Rows saved with a course's full name now point at its code
+    for table, count in normalize_course_names().items():
+        print(f'{table}: {count} rows normalized')
     print('Done.')
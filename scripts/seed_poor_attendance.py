@@ -3,7 +3,7 @@ import os
 sys.path.append(os.getcwd())
 
 from app import create_app, db
-from app.models import StudentProfile, User, Attendance, Subject, FacultyProfile
+from app.models import StudentProfile, User, Attendance, AttendanceCounter, Subject, FacultyProfile
 from datetime import date, timedelta
 import random
 
@@ -48,8 +48,9 @@ with app.app_context():
     # 3. Add Attendance Records (Target: < 75%)
     # Let's add 20 days: 5 Present, 15 Absent = 25% Attendance
     
-    # Clear existing for fresh calc
+    # Clear existing for fresh calc (bulk deletes skip the counter hooks, so drop the counters too)
     Attendance.query.filter_by(student_id=s.id).delete()
+    AttendanceCounter.query.filter_by(student_id=s.id).delete()
     db.session.commit()
     
     start_date = date.today() - timedelta(days=30)
@@ -0,0 +1,102 @@
+import pytest
+from sqlalchemy.orm import Session
+from datetime import date
+from app import create_app, db
+from app.models import User, StudentProfile, FacultyProfile, Subject, Timetable, Attendance, AttendanceCounter
+from app.services.attendance_counters import subject_attendance, rebuild_attendance_counters
+
+@pytest.fixture
+def client():
+    app = create_app()
+    app.config['TESTING'] = True
+    app.config['WTF_CSRF_ENABLED'] = False
+    with app.test_client() as client:
+        with app.app_context():
+            db.create_all()
+            yield client
+            db.session.remove()
+
+def legacy_subject_stats(student):
+    """The per-record scan the attendance page used before the counters."""
+    subjects = Subject.query.filter_by(course_name=student.course_name, semester=student.semester).all()
+    day_map = {}
+    weekdays = {'Mon': 0, 'Tue': 1, 'Wed': 2, 'Thu': 3, 'Fri': 4, 'Sat': 5, 'Sun': 6}
+    for slot in Timetable.query.filter_by(course_name=student.course_name, semester=student.semester).all():
+        day_map.setdefault(weekdays[slot.day_of_week], []).append(slot.subject_id)
+
+    stats = {sub.id: {'name': sub.name, 'total': 0, 'present': 0} for sub in subjects}
+    for record in Attendance.query.filter_by(student_id=student.id).all():
+        targets = [record.subject_id] if record.subject_id else day_map.get(record.date.weekday(), [])
+        for sub_id in targets:
+            if sub_id in stats:
+                stats[sub_id]['total'] += 1
+                stats[sub_id]['present'] += record.status == 'Present'
+    return stats
+
+def test_counters_follow_writes_and_match_legacy_scan(client):
+    u = User.query.filter_by(email="counter_test@edu.com").first()
+    if not u:
+        u = User(email="counter_test@edu.com", role='student')
+        u.set_password('123')
+        db.session.add(u)
+        db.session.flush()
+        db.session.add(StudentProfile(user_id=u.id, display_name="Counter Tester", enrollment_number="CNT001", course_name="CounterCourse", semester=1))
+        fu = User(email="counter_fac@edu.com", role='faculty')
+        fu.set_password('123')
+        db.session.add(fu)
+        db.session.flush()
+        db.session.add(FacultyProfile(user_id=fu.id, display_name="Counter Faculty", designation="Professor", department="CS"))
+        db.session.flush()
+    student = u.student_profile
+    faculty = FacultyProfile.query.filter_by(display_name="Counter Faculty").first()
+
+    # Bulk deletes bypass the session hooks: drop the student's counters along with the records
+    Attendance.query.filter_by(student_id=student.id).delete()
+    AttendanceCounter.query.filter_by(student_id=student.id).delete()
+    Timetable.query.filter_by(course_name="CounterCourse").delete()
+    Subject.query.filter_by(course_name="CounterCourse").delete()
+    maths = Subject(name="Counter Maths", course_name="CounterCourse", semester=1)
+    physics = Subject(name="Counter Physics", course_name="CounterCourse", semester=1)
+    db.session.add_all([maths, physics])
+    db.session.flush()
+    # Maths twice on Monday, Physics on Monday and Tuesday
+    for day, period, sub in [('Mon', 1, maths), ('Mon', 2, maths), ('Mon', 3, physics), ('Tue', 1, physics)]:
+        db.session.add(Timetable(course_name="CounterCourse", semester=1, day_of_week=day, period_number=period, subject_id=sub.id, faculty_id=faculty.id))
+
+    # Subject-linked records plus legacy (day-based) ones on Mon 2024-01-01 and Tue 2024-01-02
+    db.session.add_all([
+        Attendance(student_id=student.id, course_name="CounterCourse", date=date(2024, 1, 3), status='Present', subject_id=maths.id),
+        Attendance(student_id=student.id, course_name="CounterCourse", date=date(2024, 1, 4), status='Absent', subject_id=maths.id),
+        Attendance(student_id=student.id, course_name="CounterCourse", date=date(2024, 1, 1), status='Present'),
+        Attendance(student_id=student.id, course_name="CounterCourse", date=date(2024, 1, 2), status='Absent'),
+    ])
+    db.session.commit()
+
+    assert subject_attendance(student) == legacy_subject_stats(student)
+    assert subject_attendance(student)[maths.id] == {'name': "Counter Maths", 'total': 4, 'present': 3}
+    # One row per subject plus one per legacy weekday
+    assert AttendanceCounter.query.filter_by(student_id=student.id).count() == 3
+
+    # Status changes are folded in on commit
+    Attendance.query.filter_by(student_id=student.id, date=date(2024, 1, 2)).first().status = 'Present'
+    db.session.commit()
+    assert subject_attendance(student)[physics.id] == {'name': "Counter Physics", 'total': 2, 'present': 2}
+
+    # Moving a record refreshes both the subject it left and the one it joined
+    Attendance.query.filter_by(student_id=student.id, date=date(2024, 1, 4)).first().subject_id = physics.id
+    db.session.commit()
+    assert subject_attendance(student) == legacy_subject_stats(student)
+
+    # Writes through any other session are counted in that session
+    with Session(db.engine) as other:
+        other.add(Attendance(student_id=student.id, course_name="CounterCourse", date=date(2024, 1, 5), status='Present', subject_id=physics.id))
+        other.commit()
+    assert not db.session.new and not db.session.dirty
+    db.session.expire_all()
+    assert subject_attendance(student) == legacy_subject_stats(student)
+    assert subject_attendance(student)[physics.id] == {'name': "Counter Physics", 'total': 4, 'present': 3}
+
+    # The backfill reproduces the maintained rows
+    before = subject_attendance(student)
+    rebuild_attendance_counters()
+    assert subject_attendance(student) == before == legacy_subject_stats(student)
@@ -0,0 +1,80 @@
+import pytest
+from datetime import date
+from sqlalchemy import event
+from app import create_app, db
+from app.models import User, StudentProfile, FacultyProfile, Subject, Attendance, AttendanceCounter
+from app.services.attendance_writer import write_attendance
+from app.services.attendance_counters import low_attendance, students_below_threshold
+
+@pytest.fixture
+def client():
+    app = create_app()
+    app.config['TESTING'] = True
+    app.config['WTF_CSRF_ENABLED'] = False
+    with app.test_client() as client:
+        with app.app_context():
+            db.create_all()
+            yield client
+            db.session.remove()
+
+def test_attendance_sheet_saves_in_bulk(client):
+    fu = User.query.filter_by(email="writer_fac@edu.com").first()
+    if not fu:
+        fu = User(email="writer_fac@edu.com", role='faculty')
+        db.session.add(fu)
+        db.session.flush()
+        db.session.add(FacultyProfile(user_id=fu.id, display_name="Writer Faculty", designation="Professor", department="CS"))
+        db.session.flush()
+    fu.set_password('123')
+    faculty = fu.faculty_profile
+
+    students = []
+    for i in range(3):
+        u = User.query.filter_by(email=f"writer_student{i}@edu.com").first()
+        if not u:
+            u = User(email=f"writer_student{i}@edu.com", role='student')
+            u.set_password('123')
+            db.session.add(u)
+            db.session.flush()
+            db.session.add(StudentProfile(user_id=u.id, display_name=f"Writer {i}", enrollment_number=f"WRT00{i}", course_name="WriterCourse", semester=1))
+            db.session.flush()
+        students.append(u.student_profile)
+    ids = [s.id for s in students]
+
+    Attendance.query.filter(Attendance.student_id.in_(ids)).delete(synchronize_session=False)
+    subject = Subject.query.filter_by(name="Writer Maths").first() or Subject(name="Writer Maths", course_name="WriterCourse", semester=1)
+    subject.faculty_id = faculty.id
+    db.session.add(subject)
+    db.session.commit()
+
+    # First save inserts the sheet through the faculty form
+    client.post('/auth/login', data={'email': 'writer_fac@edu.com', 'password': '123', 'role': 'faculty'})
+    form = {'subject_id': subject.id, 'date': '2031-03-03'}
+    form.update({f'status_{sid}': 'Present' for sid in ids})
+    assert client.post('/faculty/attendance', data=form).status_code == 302
+
+    # Re-saving with one change updates in place, with a fixed number of statements
+    statements = []
+    count = lambda *args: statements.append(args[2])
+    event.listen(db.engine, 'before_cursor_execute', count)
+    try:
+        written = write_attendance(subject, date(2031, 3, 3), {ids[0]: 'Absent', ids[1]: 'Present', ids[2]: 'Present'}, faculty.id)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', count)
+    db.session.commit()
+    assert written == (0, 1, 2)
+    # One executemany UPDATE for the changed mark, nothing for the unchanged ones
+    assert [s for s in statements if not s.startswith('SELECT')] == ['UPDATE attendance SET status=? WHERE attendance.id = ?']
+    # The watchlist counters are recounted for this sheet's (student, subject) pairs only, not whole histories
+    recounts = [s for s in statements if s.startswith('SELECT') and 'count(attendance.id)' in s]
+    assert len(recounts) == 1 and '(attendance.student_id, attendance.subject_id) IN' in recounts[0]
+
+    rows = Attendance.query.filter(Attendance.student_id.in_(ids)).all()
+    assert sorted((r.student_id, r.status) for r in rows) == [(ids[0], 'Absent'), (ids[1], 'Present'), (ids[2], 'Present')]
+    counters = {c.student_id: (c.present, c.total) for c in AttendanceCounter.query.filter(AttendanceCounter.student_id.in_(ids))}
+    assert counters == {ids[0]: (0, 1), ids[1]: (1, 1), ids[2]: (1, 1)}
+
+    # The watchlists read the same counters
+    assert [(row.student.id, row.present, row.total) for row in low_attendance(subject)] == [(ids[0], 0, 1)]
+    below = {row.student_id for row in students_below_threshold()}
+    assert ids[0] in below and ids[1] not in below
@@ -0,0 +1,65 @@
+import pytest
+from app import create_app, db
+from app.models import Course, ExamEvent, Notice
+from app.services import courses
+from app.services.courses import canonical_course, course_index, normalize_course_names
+from datetime import date
+
+@pytest.fixture
+def client():
+    app = create_app()
+    app.config['TESTING'] = True
+    app.config['WTF_CSRF_ENABLED'] = False
+    with app.test_client() as client:
+        with app.app_context():
+            db.create_all()
+            yield client
+            db.session.remove()
+
+def test_course_aliases_resolve_to_code(client):
+    if not Course.query.filter_by(code="TCX").first():
+        db.session.add(Course(name="Test Course Extended", code="TCX"))
+        db.session.commit()
+
+    assert canonical_course("TCX") == "TCX"
+    assert canonical_course("  test course EXTENDED ") == "TCX"
+    assert canonical_course("Unknown Course") == "Unknown Course"
+
+    # Rows written with the full name are stored under the code
+    ExamEvent.query.filter_by(name="TCX Midterm").delete()
+    event = ExamEvent(name="TCX Midterm", academic_year="2030-2031", course_name="Test Course Extended",
+                      semester=1, start_date=date(2030, 9, 1), end_date=date(2030, 9, 5))
+    db.session.add(event)
+    db.session.commit()
+    assert event.course_name == "TCX"
+
+    # Rows that bypassed the ORM are rewritten by the migration
+    Notice.query.filter_by(title="TCX notice").delete()
+    db.session.add(Notice(title="TCX notice", content="x", target_type='class'))
+    db.session.commit()
+    Notice.query.filter_by(title="TCX notice").update({Notice.target_course: "Test Course Extended"})
+    db.session.commit()
+    assert normalize_course_names()['notice'] >= 1
+    assert Notice.query.filter_by(title="TCX notice").one().target_course == "TCX"
+
+    # The index follows course deletes
+    db.session.delete(Course.query.filter_by(code="TCX").one())
+    db.session.commit()
+    assert "tcx" not in course_index()
+    assert canonical_course("Test Course Extended") == "Test Course Extended"
+
+def test_unknown_alias_reloads_course_index(client, monkeypatch):
+    monkeypatch.setattr(courses, 'RELOAD_ON_MISS_INTERVAL', 0)
+    Course.query.filter_by(code="RLX").delete()
+    db.session.commit()
+    assert canonical_course("Reload Course Extended") == "Reload Course Extended"
+
+    # Committed elsewhere (no invalidation reached this worker): the miss reloads the index
+    with db.engine.begin() as conn:
+        conn.execute(Course.__table__.insert().values(name="Reload Course Extended", code="RLX"))
+    ExamEvent.query.filter_by(name="RLX Midterm").delete()
+    event = ExamEvent(name="RLX Midterm", academic_year="2030-2031", course_name="reload course extended",
+                      semester=1, start_date=date(2030, 9, 1), end_date=date(2030, 9, 5))
+    db.session.add(event)
+    db.session.commit()
+    assert event.course_name == "RLX"
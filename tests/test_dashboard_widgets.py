@@ -0,0 +1,65 @@
+import pytest
+from datetime import datetime
+from sqlalchemy import event
+from app import create_app, db
+from app.models import User, StudentProfile, Notice
+from app.services.cache import ResponseCache
+from app.services.dashboard import load_widgets
+
+@pytest.fixture
+def client():
+    app = create_app()
+    app.config['TESTING'] = True
+    app.config['WTF_CSRF_ENABLED'] = False
+    with app.test_client() as client:
+        with app.app_context():
+            db.create_all()
+            yield client
+            db.session.remove()
+
+def test_dashboard_widgets_cached_until_write(client):
+    u = User.query.filter_by(email="widget_student@edu.com").first()
+    if not u:
+        u = User(email="widget_student@edu.com", role='student')
+        db.session.add(u)
+        db.session.flush()
+        db.session.add(StudentProfile(user_id=u.id, display_name="Widget Tester", enrollment_number="WDG001", course_name="WidgetCourse", semester=1))
+        db.session.flush()
+    u.set_password('123')
+    db.session.commit()
+    student = u.student_profile
+
+    widgets = load_widgets(student)
+    assert set(widgets) == {'attendance', 'notices', 'next_event', 'pending_fees', 'latest_spi'}
+
+    # Repeat visits are served from the cache
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(db.engine, 'before_cursor_execute', listener)
+    try:
+        assert load_widgets(student) == widgets
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', listener)
+    assert statements == []
+
+    # A new notice for the class shows up on the next load
+    Notice.query.filter(Notice.title.in_(["WDG class notice", "WDG other worker notice"])).delete()
+    db.session.add(Notice(title="WDG class notice", content="x", target_type='class', target_course="WidgetCourse", created_at=datetime(2040, 1, 1)))
+    db.session.commit()
+    assert load_widgets(student, ['notices'])['notices'][0].title == "WDG class notice"
+
+    # Another worker's write (its own in-memory cache, same VERSION file) shows up here too
+    load_widgets(student, ['notices'])
+    with db.engine.begin() as conn:
+        conn.execute(Notice.__table__.insert().values(title="WDG other worker notice", content="x", target_type='class',
+                                                      target_course="WidgetCourse", created_at=datetime(2041, 1, 1)))
+    other_worker = ResponseCache('DASHBOARD_CACHE')
+    other_worker.init_app(client.application)
+    other_worker.invalidate()
+    assert load_widgets(student, ['notices'])['notices'][0].title == "WDG other worker notice"
+
+    # All widgets in one JSON round trip
+    client.post('/auth/login', data={'email': 'widget_student@edu.com', 'password': '123', 'role': 'student'})
+    data = client.get('/student/dashboard/widgets').get_json()
+    assert data['notices'][0]['title'] == "WDG other worker notice"
+    assert client.get('/student/dashboard/widgets?widgets=nope').status_code == 400
@@ -0,0 +1,83 @@
+import pytest
+from contextlib import contextmanager
+from datetime import date, time
+from flask import g
+from sqlalchemy import event
+from app import create_app, db
+from app.models import User, StudentProfile, Subject, ExamEvent, ExamPaper, StudentResult
+from app.services.grading import load_results, grade_results
+from app.services.summaries import refresh_student_summaries
+
+@pytest.fixture
+def client():
+    app = create_app()
+    app.config['TESTING'] = True
+    app.config['WTF_CSRF_ENABLED'] = False
+    with app.test_client() as client:
+        with app.app_context():
+            db.create_all()
+            yield client
+            db.session.remove()
+
+@contextmanager
+def count_queries():
+    statements = []
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+
+def test_grading_engine_loads_results_in_one_query(client):
+    u = User.query.filter_by(email="grading_test@edu.com").first()
+    if not u:
+        u = User(email="grading_test@edu.com", role='student')
+        db.session.add(u)
+        db.session.flush()
+        db.session.add(StudentProfile(user_id=u.id, display_name="Grading Tester", enrollment_number="GRD001", course_name="GradingCourse", semester=1))
+    u.set_password('123')
+    student = u.student_profile or StudentProfile.query.filter_by(user_id=u.id).first()
+
+    # (bulk deletes bypass the session hooks, so refresh the summaries explicitly)
+    StudentResult.query.filter_by(student_id=student.id).delete()
+    refresh_student_summaries([student.id])
+    mid = ExamEvent(name="Grading Mid", academic_year="2024-2025", course_name="GradingCourse", semester=1, start_date=date(2024, 3, 1), end_date=date(2024, 3, 5))
+    final = ExamEvent(name="Grading Final", academic_year="2024-2025", course_name="GradingCourse", semester=1, start_date=date(2024, 6, 1), end_date=date(2024, 6, 5))
+    subjects = [Subject(name=f"Grading Subject {i}", course_name="GradingCourse", semester=1, weekly_lectures=i) for i in (2, 4, 0)]
+    db.session.add_all([mid, final] + subjects)
+    db.session.flush()
+    for exam, marks in [(mid, [95, 45, None]), (final, [72, 88, 30])]:
+        for sub, mark in zip(subjects, marks):
+            paper = ExamPaper(exam_event_id=exam.id, subject_id=sub.id, date=exam.start_date, start_time=time(10), end_time=time(13))
+            db.session.add(paper)
+            db.session.flush()
+            db.session.add(StudentResult(exam_paper_id=paper.id, student_id=student.id, marks_obtained=mark))
+    db.session.commit()
+    student_id, final_id = student.id, final.id
+    db.session.expire_all()
+
+    # One joined query, then grading never lazy loads
+    with count_queries() as statements:
+        exams, cgpi = grade_results(load_results(student_id))
+    assert len(statements) == 1
+
+    assert [e['event'].name for e in exams] == ["Grading Final", "Grading Mid"]
+    # Mid: 10*2 + 5*4 + 0*3 over 9 credits; Final: 8*2 + 9*4 + 0*3
+    assert exams[1]['spi'] == round(40 / 9, 2)
+    assert exams[0]['spi'] == round(52 / 9, 2)
+    assert cgpi == round(92 / 18, 2)
+    assert exams[1]['results'][2]['grade'] == 'FF' and exams[1]['results'][2]['credits'] == 3
+
+    # Routes: identity + the results query, however many results there are
+    client.post('/auth/login', data={'email': 'grading_test@edu.com', 'password': '123', 'role': 'student'})
+    for url in ['/student/academics', f'/student/academics/marksheet/{final_id}']:
+        for key in ('_login_user', '_identity', 'identity_queries'):
+            g.pop(key, None)
+        db.session.expire_all()
+        with count_queries() as statements:
+            resp = client.get(url)
+        assert resp.status_code == 200
+        assert str(exams[0]['spi']).encode() in resp.data
+        assert len(statements) == 2
@@ -0,0 +1,47 @@
+import pytest
+from flask import g
+from app import create_app, db
+from app.models import User, StudentProfile
+
+@pytest.fixture
+def client():
+    app = create_app()
+    app.config['TESTING'] = True
+    app.config['WTF_CSRF_ENABLED'] = False
+    app.config['IDENTITY_QUERY_HEADER'] = True
+    with app.test_client() as client:
+        with app.app_context():
+            db.create_all()
+            yield client
+            db.session.remove()
+
+def test_student_page_resolves_identity_in_one_query(client):
+    u = User.query.filter_by(email="identity_test@edu.com").first()
+    if not u:
+        u = User(email="identity_test@edu.com", role='student')
+        db.session.add(u)
+        db.session.flush()
+        db.session.add(StudentProfile(user_id=u.id, display_name="Identity Tester", enrollment_number="IDENT001", course_name="B.Tech", semester=1))
+    u.set_password('123')
+    db.session.commit()
+
+    # Anonymous requests never touch the users table
+    assert client.get('/auth/login').headers['X-Identity-Queries'] == '0'
+
+    client.post('/auth/login', data={'email': 'identity_test@edu.com', 'password': '123', 'role': 'student'})
+    # The fixture's app context (and so `g`) outlives each request; start the next one clean
+    for key in ('_login_user', '_identity', 'identity_queries'):
+        g.pop(key, None)
+
+    resp = client.get('/student/settings')
+    assert resp.status_code == 200
+    assert b"Identity Tester" in resp.data
+    # User + profile in one joined query, reused by the route
+    assert resp.headers['X-Identity-Queries'] == '1'
+
+
+def test_identity_header_is_off_outside_debug():
+    app = create_app()
+    app.debug = False
+    with app.test_client() as client:
+        assert 'X-Identity-Queries' not in client.get('/auth/login').headers
@@ -0,0 +1,62 @@
+import pytest
+from collections import namedtuple
+from datetime import date, timedelta
+from app import create_app, db
+from app.models import User, StudentProfile, Subject, Attendance
+from app.services.lecture_ledger import lecture_ledger
+
+Slot = namedtuple('Slot', ['id', 'day_of_week', 'period_number', 'subject'])
+
+@pytest.fixture
+def client():
+    app = create_app()
+    app.config['TESTING'] = True
+    app.config['WTF_CSRF_ENABLED'] = False
+    with app.test_client() as client:
+        with app.app_context():
+            db.create_all()
+            yield client
+            db.session.remove()
+
+def test_ledger_pages_match_full_listing(client):
+    u = User.query.filter_by(email="ledger_student@edu.com").first()
+    if not u:
+        u = User(email="ledger_student@edu.com", role='student')
+        u.set_password('123')
+        db.session.add(u)
+        db.session.flush()
+        db.session.add(StudentProfile(user_id=u.id, display_name="Ledger Tester", enrollment_number="LDG001", course_name="LedgerCourse", semester=1))
+        db.session.flush()
+    student = u.student_profile
+
+    subjects = []
+    for name in ("Ledger Maths", "Ledger Physics"):
+        sub = Subject.query.filter_by(name=name).first() or Subject(name=name, course_name="LedgerCourse", semester=1)
+        db.session.add(sub)
+        subjects.append(sub)
+    db.session.flush()
+    maths, physics = subjects
+    Attendance.query.filter_by(student_id=student.id).delete()
+
+    # 2031-03-03 is a Monday
+    dates = [date(2031, 3, 3) + timedelta(days=i) for i in range(14)]
+    slots = [Slot(1, 'Monday', 1, maths), Slot(2, 'Monday', 3, physics), Slot(3, 'Wednesday', 2, maths), Slot(4, 'Friday', 1, physics)]
+    marked = {(maths.id, date(2031, 3, 3)), (physics.id, date(2031, 3, 14))}
+    for sub_id, on_date in marked:
+        db.session.add(Attendance(student_id=student.id, course_name="LedgerCourse", date=on_date, status='Present', subject_id=sub_id))
+    db.session.commit()
+
+    expected = [
+        (d, slot.subject.id, 'Marked' if (slot.subject.id, d) in marked else 'Pending')
+        for d in sorted(dates, reverse=True) for slot in slots if d.strftime('%A') == slot.day_of_week
+    ]
+    seen, page = [], 1
+    while True:
+        ledger = lecture_ledger(slots, dates, page, per_page=5)
+        assert ledger.has_prev == (page > 1)
+        seen.extend((l.date, l.subject.id, l.status) for l in ledger.items)
+        if not ledger.has_next:
+            break
+        page += 1
+    assert seen == expected
+    assert ledger.total_pages == page == 2
@@ -0,0 +1,80 @@
+import io
+import pytest
+from datetime import date, time
+from app import create_app, db
+from app.models import User, StudentProfile, FacultyProfile, Subject, ExamEvent, ExamPaper, StudentResult, StudentAcademicSummary
+
+@pytest.fixture
+def client():
+    app = create_app()
+    app.config['TESTING'] = True
+    app.config['WTF_CSRF_ENABLED'] = False
+    with app.test_client() as client:
+        with app.app_context():
+            db.create_all()
+            yield client
+            db.session.remove()
+
+def test_marks_sheet_upload_saves_valid_rows_and_reports_the_rest(client):
+    fu = User.query.filter_by(email="marks_fac@edu.com").first()
+    if not fu:
+        fu = User(email="marks_fac@edu.com", role='faculty')
+        db.session.add(fu)
+        db.session.flush()
+        db.session.add(FacultyProfile(user_id=fu.id, display_name="Marks Faculty", designation="Professor", department="CS"))
+        db.session.flush()
+    fu.set_password('123')
+    faculty = fu.faculty_profile
+
+    students = []
+    for i in range(3):
+        u = User.query.filter_by(email=f"marks_student{i}@edu.com").first()
+        if not u:
+            u = User(email=f"marks_student{i}@edu.com", role='student')
+            u.set_password('123')
+            db.session.add(u)
+            db.session.flush()
+            db.session.add(StudentProfile(user_id=u.id, display_name=f"Marks {i}", enrollment_number=f"MRK00{i}", course_name="MarksCourse", semester=1))
+            db.session.flush()
+        students.append(u.student_profile)
+
+    subject = Subject.query.filter_by(name="Marks Maths").first() or Subject(name="Marks Maths", course_name="MarksCourse", semester=1)
+    subject.faculty_id = faculty.id
+    event = ExamEvent.query.filter_by(name="Marks Midterm").first() or ExamEvent(name="Marks Midterm", academic_year="2030-2031", course_name="MarksCourse", semester=1, start_date=date(2031, 3, 1), end_date=date(2031, 3, 5))
+    db.session.add_all([subject, event])
+    db.session.flush()
+    paper = ExamPaper.query.filter_by(exam_event_id=event.id).first() or ExamPaper(exam_event_id=event.id, subject_id=subject.id, date=event.start_date, start_time=time(10), end_time=time(13), total_marks=50)
+    db.session.add(paper)
+    db.session.flush()
+    StudentResult.query.filter_by(exam_paper_id=paper.id).delete()
+    db.session.commit()
+
+    client.post('/auth/login', data={'email': 'marks_fac@edu.com', 'password': '123', 'role': 'faculty'})
+    url = f'/faculty/marks?exam_id={event.id}&paper_id={paper.id}'
+    sheet = "\n".join([
+        "Enrollment_Number,Marks,Status",
+        "MRK000,45,",
+        "MRK001,10,present",
+        "MRK002,,Absent",
+        "MRK000,30,",      # duplicate
+        "NOPE999,20,",     # not in the class
+        "MRK001,60,",      # duplicate, also above the paper's total
+    ])
+    resp = client.post(url, data={'marks_file': (io.BytesIO(sheet.encode()), 'marks.csv')},
+                       content_type='multipart/form-data', headers={'Accept': 'application/json'})
+    report = resp.get_json()
+    assert (report['inserted'], report['updated'], report['unchanged']) == (3, 0, 0)
+    assert [(e['line'], e['enrollment_number']) for e in report['errors']] == [(5, 'MRK000'), (6, 'NOPE999'), (7, 'MRK001')]
+
+    results = {r.student_id: (r.marks_obtained, r.status, r.is_fail) for r in StudentResult.query.filter_by(exam_paper_id=paper.id)}
+    assert results == {students[0].id: (45.0, 'Present', False), students[1].id: (10.0, 'Present', True),
+                       students[2].id: (None, 'Absent', False)}
+    summary = StudentAcademicSummary.query.filter_by(student_id=students[0].id, exam_event_id=event.id).one()
+    assert summary.marks_sum == 45.0
+
+    # The form updates in place; invalid fields come back as a report on the page
+    html = client.post(url, data={f'marks_{students[0].id}': '40', f'marks_{students[1].id}': 'abc'}).get_data(as_text=True)
+    assert 'marks-errors' in html and 'Invalid number: abc' in html
+    db.session.expire_all()
+    assert StudentResult.query.filter_by(exam_paper_id=paper.id).count() == 3
+    assert summary.marks_sum == 40.0
@@ -0,0 +1,140 @@
+import os
+import re
+import base64
+import hashlib
+import pytest
+from app import create_app, db
+from app.models import User, FacultyProfile, Subject, Syllabus, MediaDigest
+from app.services.media import get_digest
+
+@pytest.fixture
+def client():
+    app = create_app()
+    app.config['TESTING'] = True
+    app.config['WTF_CSRF_ENABLED'] = False
+    with app.test_client() as client:
+        with app.app_context():
+            db.create_all()
+            yield client
+            db.session.remove()
+
+def test_syllabus_download_streams_with_etag_and_range(client):
+    u = User.query.filter_by(email="media_fac@edu.com").first()
+    if not u:
+        u = User(email="media_fac@edu.com", role='faculty')
+        db.session.add(u)
+        db.session.flush()
+        db.session.add(FacultyProfile(user_id=u.id, display_name="Media Faculty", designation="Professor", department="CS"))
+    u.set_password('123')
+
+    sub = Subject(name="MediaSubject", course_name="B.Tech", semester=1)
+    db.session.add(sub)
+    db.session.flush()
+
+    # Bigger than one streaming chunk
+    pdf = b'%PDF-1.4' + os.urandom(600 * 1024)
+    syllabus = Syllabus(subject_id=sub.id, filename="media.pdf", file_data=pdf)
+    db.session.add(syllabus)
+    db.session.commit()
+
+    client.post('/auth/login', data={'email': 'media_fac@edu.com', 'password': '123', 'role': 'faculty'})
+    url = f'/faculty/classes/syllabus/{sub.id}'
+
+    resp = client.get(url)
+    assert resp.status_code == 200
+    assert resp.data == pdf
+    assert resp.headers['ETag'] == f'"{hashlib.sha256(pdf).hexdigest()}"'
+    assert 'attachment' in resp.headers['Content-Disposition']
+    assert resp.headers['Last-Modified']
+
+    # Conditional requests
+    assert client.get(url, headers={'If-None-Match': resp.headers['ETag']}).status_code == 304
+    assert client.get(url, headers={'If-Modified-Since': resp.headers['Last-Modified']}).status_code == 304
+
+    # Ranges
+    partial = client.get(url, headers={'Range': 'bytes=100-299'})
+    assert partial.status_code == 206
+    assert partial.data == pdf[100:300]
+    assert partial.headers['Content-Range'] == f'bytes 100-299/{len(pdf)}'
+    assert client.get(url, headers={'Range': f'bytes={len(pdf) + 10}-'}).status_code == 416
+
+    # New bytes, new validator
+    syllabus.file_data = b'%PDF-1.4 replaced'
+    db.session.commit()
+    fresh = client.get(url, headers={'If-None-Match': resp.headers['ETag']})
+    assert fresh.status_code == 200
+    assert fresh.data == b'%PDF-1.4 replaced'
+
+# 1x1 PNG
+PIXEL_PNG = base64.b64decode(
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNkYPhfDwAChwGA60e6kgAAAABJRU5ErkJggg=="
+)
+
+def test_faculty_list_links_content_addressed_photos(client):
+    u_admin = User.query.filter_by(email="media_admin@edu.com").first()
+    if not u_admin:
+        u_admin = User(email="media_admin@edu.com", role='admin')
+        db.session.add(u_admin)
+    u_admin.set_password('admin')
+
+    u = User.query.filter_by(email="media_photo@edu.com").first()
+    if not u:
+        u = User(email="media_photo@edu.com", role='faculty')
+        u.set_password('123')
+        db.session.add(u)
+        db.session.flush()
+        db.session.add(FacultyProfile(user_id=u.id, display_name="Photo Faculty", designation="Professor", department="CS"))
+        db.session.flush()
+    u.faculty_profile.photo_data = PIXEL_PNG
+    u.faculty_profile.photo_mimetype = 'image/png'
+    db.session.commit()
+    fac_id = u.faculty_profile.id
+
+    client.post('/auth/login', data={'email': 'media_admin@edu.com', 'password': 'admin', 'role': 'admin'})
+    page = client.get('/admin/faculty').get_data(as_text=True)
+    assert 'base64' not in page
+
+    sha = hashlib.sha256(PIXEL_PNG).hexdigest()
+    match = re.search(rf'/media/faculty_photo/{fac_id}/{sha}(/\d+)?', page)
+    assert match
+
+    resp = client.get(match.group(0))
+    assert resp.status_code == 200
+    assert 'immutable' in resp.headers['Cache-Control']
+    assert resp.mimetype.startswith('image/')
+
+    # The full size original is always reachable at the bare URL
+    original = client.get(f'/media/faculty_photo/{fac_id}/{sha}')
+    assert original.data == PIXEL_PNG
+
+    # Stale hashes redirect to the current content
+    stale = client.get(f'/media/faculty_photo/{fac_id}/{"0" * 64}')
+    assert stale.status_code == 302
+    assert sha in stale.headers['Location']
+
+def test_digest_of_uncommitted_upload_is_stored_after_commit(client):
+    u = User.query.filter_by(email="media_photo@edu.com").first()
+    if not u:
+        pytest.skip("photo faculty missing")
+    fac_id = u.faculty_profile.id
+    photo = PIXEL_PNG + b'\0'
+
+    # Upload flushed, not committed: the digest must not be written on another connection yet
+    u.faculty_profile.photo_data = photo
+    db.session.flush()
+    digest = get_digest('faculty_photo', fac_id)
+    assert digest.sha256 == hashlib.sha256(photo).hexdigest()
+    stored = lambda: db.engine.connect().execute(
+        MediaDigest.__table__.select().where(MediaDigest.owner_type == 'faculty_photo', MediaDigest.owner_id == fac_id)
+    ).first()
+    assert stored() is None or stored().sha256 != digest.sha256
+
+    db.session.commit()
+    assert stored().sha256 == digest.sha256
+
+    # Rolled back uploads leave nothing behind
+    u.faculty_profile.photo_data = PIXEL_PNG
+    db.session.flush()
+    get_digest('faculty_photo', fac_id)
+    db.session.rollback()
+    assert stored().sha256 == digest.sha256
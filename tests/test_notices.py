@@ -0,0 +1,75 @@
+import pytest
+from datetime import datetime
+from app import create_app, db
+from app.models import User, StudentProfile, FacultyProfile, Notice
+from app.services.notices import student_notices, notice_page
+
+@pytest.fixture
+def client():
+    app = create_app()
+    app.config['TESTING'] = True
+    app.config['WTF_CSRF_ENABLED'] = False
+    with app.test_client() as client:
+        with app.app_context():
+            db.create_all()
+            yield client
+            db.session.remove()
+
+def test_student_notice_feed_targets_and_pages(client):
+    fu = User.query.filter_by(email="notice_mentor@edu.com").first()
+    if not fu:
+        fu = User(email="notice_mentor@edu.com", role='faculty')
+        fu.set_password('123')
+        db.session.add(fu)
+        db.session.flush()
+        db.session.add(FacultyProfile(user_id=fu.id, display_name="Notice Mentor", designation="Professor", department="CS"))
+        db.session.flush()
+    mentor = fu.faculty_profile
+
+    u = User.query.filter_by(email="notice_student@edu.com").first()
+    if not u:
+        u = User(email="notice_student@edu.com", role='student')
+        db.session.add(u)
+        db.session.flush()
+        db.session.add(StudentProfile(user_id=u.id, display_name="Notice Tester", enrollment_number="NTC001", course_name="NoticeCourse", semester=2, mentor_id=mentor.id))
+        db.session.flush()
+    u.set_password('123')
+    student = u.student_profile
+
+    Notice.query.filter(Notice.title.like('NT %')).delete(synchronize_session=False)
+    same_time = datetime(2031, 1, 1, 9, 0)
+    visible = [
+        Notice(title="NT all", content="x", target_type='all', created_at=datetime(2031, 1, 2)),
+        Notice(title="NT course", content="x", target_type='class', target_course="NoticeCourse", created_at=same_time),
+        Notice(title="NT semester", content="x", target_type='class', target_course="NoticeCourse", target_semester=2, created_at=same_time),
+        Notice(title="NT mentees", content="x", target_type='mentees', sender_faculty_id=mentor.id, created_at=same_time),
+        Notice(title="NT individual", content="x", target_type='individual', target_student_id=student.id, created_at=datetime(2030, 12, 31)),
+    ]
+    hidden = [
+        Notice(title="NT other semester", content="x", target_type='class', target_course="NoticeCourse", target_semester=3, created_at=same_time),
+        Notice(title="NT other course", content="x", target_type='class', target_course="OtherCourse", created_at=same_time),
+        Notice(title="NT faculty", content="x", target_type='faculty', created_at=same_time),
+        Notice(title="NT other mentees", content="x", target_type='mentees', sender_faculty_id=mentor.id + 1000, created_at=same_time),
+        Notice(title="NT other student", content="x", target_type='individual', target_student_id=student.id + 1000, created_at=same_time),
+    ]
+    db.session.add_all(visible + hidden)
+    db.session.commit()
+
+    query = student_notices(student).filter(Notice.title.like('NT %'))
+    expected = [n.title for n in sorted(visible, key=lambda n: (n.created_at, n.id), reverse=True)]
+    assert [n.title for n in query.all()] == expected
+
+    # Pages of two walk the whole feed once, ties on created_at included
+    seen, cursor = [], None
+    while True:
+        page = notice_page(query, 2, cursor)
+        seen.extend(n.title for n in page.items)
+        cursor = page.next_cursor
+        if not cursor:
+            break
+    assert seen == expected
+
+    # The page itself only lists the student's notices
+    client.post('/auth/login', data={'email': 'notice_student@edu.com', 'password': '123', 'role': 'student'})
+    html = client.get('/student/notices').get_data(as_text=True)
+    assert "NT all" in html and "NT other course" not in html
@@ -0,0 +1,35 @@
+import pytest
+from app import create_app, db
+from app.models import ExamEvent
+from app.services.pagination import keyset_page, asc, desc
+
+@pytest.fixture
+def client():
+    app = create_app()
+    app.config['TESTING'] = True
+    app.config['WTF_CSRF_ENABLED'] = False
+    with app.test_client() as client:
+        with app.app_context():
+            db.create_all()
+            yield client
+            db.session.remove()
+
+def test_keyset_pages_cover_query_once(client):
+    order = [desc(ExamEvent.start_date), asc(ExamEvent.name), desc(ExamEvent.id)]
+    query = ExamEvent.query
+    expected = [e.id for e in query.order_by(ExamEvent.start_date.desc(), ExamEvent.name.asc(), ExamEvent.id.desc()).all()]
+
+    seen, cursor = [], None
+    while True:
+        page = keyset_page(query, order, per_page=3, cursor=cursor)
+        assert page.cursor == cursor
+        seen.extend(e.id for e in page.items)
+        cursor = page.next_cursor
+        if not cursor:
+            break
+    assert seen == expected
+
+    # Garbage cursors fall back to the first page
+    page = keyset_page(query, order, per_page=3, cursor='not-a-cursor')
+    assert page.cursor is None
+    assert [e.id for e in page.items] == expected[:3]
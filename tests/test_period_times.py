@@ -0,0 +1,39 @@
+from datetime import datetime, date, time, timedelta
+from app.models import ScheduleSettings
+
+def reference_period_times(settings, period_number):
+    # Per-call arithmetic the precomputed table replaces
+    start_min = settings.start_time.hour * 60 + settings.start_time.minute
+    end_min = settings.end_time.hour * 60 + settings.end_time.minute
+    recess_dur = settings.recess_duration or 0
+    recess_after = settings.recess_after_slot or (settings.slots_per_day // 2)
+    total_minutes = (end_min - start_min) - recess_dur
+    if total_minutes <= 0:
+        total_minutes = settings.slots_per_day * 60
+    slot_duration = total_minutes // settings.slots_per_day
+    p_idx = period_number - 1
+    current_start_min = start_min + (p_idx * slot_duration)
+    if recess_after > 0 and p_idx >= recess_after:
+        current_start_min += recess_dur
+    start_dt = datetime.combine(date.today(), datetime.min.time()) + timedelta(minutes=current_start_min)
+    return start_dt.time(), (start_dt + timedelta(minutes=slot_duration)).time()
+
+def test_period_table_matches_per_call_arithmetic():
+    schedules = [
+        ScheduleSettings(start_time=time(9, 0), end_time=time(17, 0), slots_per_day=8, recess_duration=30, recess_after_slot=4),
+        ScheduleSettings(start_time=time(8, 15), end_time=time(14, 40), slots_per_day=7, recess_duration=0, recess_after_slot=0),
+        ScheduleSettings(start_time=time(20, 0), end_time=time(9, 0), slots_per_day=6, recess_duration=15, recess_after_slot=0),
+    ]
+    periods = list(range(1, 13))
+    for settings in schedules:
+        expected = [reference_period_times(settings, p) for p in periods]
+        assert [settings.get_period_times(p) for p in periods] == expected
+        assert settings.get_period_times_batch(periods) == expected
+        assert len(settings.period_table) == settings.slots_per_day
+
+    # Equal settings share one table; changed settings get their own
+    same = ScheduleSettings(start_time=time(9, 0), end_time=time(17, 0), slots_per_day=8, recess_duration=30, recess_after_slot=4)
+    assert same.period_table is schedules[0].period_table
+    same.recess_duration = 45
+    assert same.period_table is not schedules[0].period_table
+    assert same.get_period_times(5) == reference_period_times(same, 5)
@@ -0,0 +1,95 @@
+import pytest
+from app import create_app, db
+from app.models import User, StudentProfile, FacultyProfile, StudentQuery, QueryMessage
+from app.services.messages import thread_page, thread_event_stream
+
+@pytest.fixture
+def client():
+    app = create_app()
+    app.config['TESTING'] = True
+    app.config['WTF_CSRF_ENABLED'] = False
+    app.config['MESSAGES_PER_PAGE'] = 2
+    with app.test_client() as client:
+        with app.app_context():
+            db.create_all()
+            yield client
+            db.session.remove()
+
+def test_query_chat_pages_and_polls(client):
+    fu = User.query.filter_by(email="chat_faculty@edu.com").first()
+    if not fu:
+        fu = User(email="chat_faculty@edu.com", role='faculty')
+        fu.set_password('123')
+        db.session.add(fu)
+        db.session.flush()
+        db.session.add(FacultyProfile(user_id=fu.id, display_name="Chat Faculty", designation="Professor", department="CS"))
+        db.session.flush()
+    u = User.query.filter_by(email="chat_student@edu.com").first()
+    if not u:
+        u = User(email="chat_student@edu.com", role='student')
+        db.session.add(u)
+        db.session.flush()
+        db.session.add(StudentProfile(user_id=u.id, display_name="Chat Student", enrollment_number="CHT001", course_name="ChatCourse", semester=1))
+        db.session.flush()
+    u.set_password('123')
+
+    thread = StudentQuery(student_id=u.student_profile.id, faculty_id=fu.faculty_profile.id, title="Paging doubt")
+    db.session.add(thread)
+    db.session.flush()
+    for i in range(5):
+        db.session.add(QueryMessage(query_id=thread.id, sender_type='student' if i % 2 == 0 else 'faculty',
+                                    content=f"chat line {i}", image_data=b'x' if i == 4 else None))
+    db.session.commit()
+    ids = [m.id for m in db.session.query(QueryMessage).filter_by(query_id=thread.id).order_by(QueryMessage.id)]
+    db.session.expire_all()
+
+    # Newest page first, each page in chronological order, image bytes never loaded
+    seen, cursor = [], None
+    while True:
+        page = thread_page(thread.id, 2, cursor)
+        assert all('image_data' not in m.__dict__ for m in page.items)
+        seen = [m.id for m in page.items] + seen
+        cursor = page.next_cursor
+        if not cursor:
+            break
+    assert seen == ids
+
+    client.post('/auth/login', data={'email': 'chat_student@edu.com', 'password': '123', 'role': 'student'})
+    html = client.get(f'/student/queries/{thread.id}').get_data(as_text=True)
+    assert "chat line 4" in html and "chat line 2" not in html and "Older messages" in html
+    # Polling by default: event streams need CHAT_EVENT_STREAM and a shared pubsub backend
+    assert "new EventSource" not in html
+    assert client.get(f'/student/queries/{thread.id}/events').status_code == 404
+
+    # Polling returns only what came after the given id
+    data = client.get(f'/student/queries/{thread.id}/messages?since={ids[2]}').get_json()
+    assert [m['id'] for m in data['messages']] == ids[3:]
+    assert data['last_id'] == ids[4] and not data['has_more']
+    assert data['messages'][1]['has_image'] and "chat line 3" in data['html']
+
+def test_query_chat_live_events(client):
+    from app.extensions import pubsub
+    from app.services.messages import query_channel
+
+    client.post('/auth/login', data={'email': 'chat_student@edu.com', 'password': '123', 'role': 'student'})
+    thread = StudentQuery.query.filter_by(title="Paging doubt").order_by(StudentQuery.id.desc()).first()
+    last_id = db.session.query(QueryMessage.id).filter_by(query_id=thread.id).order_by(QueryMessage.id.desc()).limit(1).scalar()
+
+    # Posting from a live chat returns just the new message; open chats are notified once committed
+    subscription = pubsub.subscribe(query_channel(thread.id))
+    try:
+        resp = client.post(f'/student/queries/{thread.id}/message', data={'content': 'live line'},
+                           headers={'Accept': 'application/json'})
+        assert resp.status_code == 201
+        posted = resp.get_json()
+        assert posted['content'] == 'live line' and 'live line' in posted['html']
+        assert subscription.get(timeout=1) == {'type': 'message', 'id': posted['id']}
+        client.post(f'/student/queries/{thread.id}/resolve')
+        assert subscription.get(timeout=1) == {'type': 'status', 'status': 'Resolved'}
+    finally:
+        subscription.close()
+
+    # The event stream resumes after the given id (ends at once with no time budget)
+    with client.application.test_request_context():
+        body = ''.join(thread_event_stream(thread.id, 'student', last_id, 30, 15, 0))
+    assert f"id: {posted['id']}\nevent: message\n" in body and body.count('event: message') == 1
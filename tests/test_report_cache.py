@@ -0,0 +1,82 @@
+import pytest
+from datetime import date
+from app import create_app, db
+from app.extensions import report_cache
+from app.models import User, StudentProfile, Attendance
+from app.services.cache import FileSystemBackend, MemoryBackend
+
+@pytest.fixture
+def client():
+    app = create_app()
+    app.config['TESTING'] = True
+    app.config['WTF_CSRF_ENABLED'] = False
+    with app.test_client() as client:
+        with app.app_context():
+            db.create_all()
+            yield client
+            db.session.remove()
+
+def test_report_cache_hits_and_invalidates_on_attendance_write(client):
+    u_admin = User.query.filter_by(email="cache_admin@edu.com").first()
+    if not u_admin:
+        u_admin = User(email="cache_admin@edu.com", role='admin')
+        db.session.add(u_admin)
+    u_admin.set_password('admin')
+
+    u = User.query.filter_by(email="cache_test@edu.com").first()
+    if not u:
+        u = User(email="cache_test@edu.com", role='student')
+        u.set_password('123')
+        db.session.add(u)
+        db.session.flush()
+    s = u.student_profile
+    if not s:
+        s = StudentProfile(user_id=u.id, display_name="Cache Tester", enrollment_number="CACHE001", course_name="B.Tech", semester=1)
+        db.session.add(s)
+    db.session.commit()
+
+    client.post('/auth/login', data={'email': 'cache_admin@edu.com', 'password': 'admin', 'role': 'admin'})
+    report_cache.reset_stats()
+
+    first = client.get('/admin/api/reports/attendance')
+    second = client.get('/admin/api/reports/attendance')
+    assert first.headers['X-Cache'] == 'MISS'
+    assert second.headers['X-Cache'] == 'HIT'
+    assert first.get_json() == second.get_json()
+
+    # Any committed attendance write must drop the cached response
+    db.session.add(Attendance(student_id=s.id, course_name="B.Tech", date=date.today(), status='Absent'))
+    db.session.commit()
+    assert client.get('/admin/api/reports/attendance').headers['X-Cache'] == 'MISS'
+
+    stats = client.get('/admin/api/reports/cache-stats').get_json()
+    assert stats['hits'] == 1
+    assert stats['misses'] == 2
+    assert stats['invalidations'] >= 1
+
+def test_filesystem_backend_roundtrip(tmp_path):
+    backend = FileSystemBackend(str(tmp_path))
+    version = backend.get_version()
+
+    backend.set('future:v1:', (b'{}', 'application/json'), ttl=60)
+    assert backend.get('future:v1:') == (b'{}', 'application/json')
+    assert backend.get('missing') is None
+
+    backend.set('stale', b'x', ttl=-1)
+    assert backend.get('stale') is None
+
+    backend.bump_version()
+    backend.clear()
+    assert backend.get_version() != version
+    assert len(backend) == 0
+
+def test_memory_backend_follows_other_workers_invalidations(tmp_path):
+    # Two workers: separate entries, one VERSION file
+    worker_a, worker_b = MemoryBackend(version_dir=str(tmp_path)), MemoryBackend(version_dir=str(tmp_path))
+    key = f"report:{worker_b.get_version()}:"
+    worker_b.set(key, b'old', ttl=60)
+    assert worker_b.get(key) == b'old'
+
+    worker_a.bump_version()
+    assert worker_b.get_version() == worker_a.get_version()
+    assert worker_b.get(key) is None and len(worker_b) == 0
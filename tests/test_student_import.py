@@ -0,0 +1,82 @@
+import io
+import time
+import uuid
+import pytest
+from app import create_app, db
+from datetime import datetime, timedelta, timezone
+from app.models import User, StudentProfile, ImportJob, Course
+from app.services.student_import import get_job
+
+@pytest.fixture
+def client():
+    app = create_app()
+    app.config['TESTING'] = True
+    app.config['WTF_CSRF_ENABLED'] = False
+    app.config['STUDENT_IMPORT_HASH_WORKERS'] = 2
+    with app.test_client() as client:
+        with app.app_context():
+            db.create_all()
+            yield client
+            db.session.remove()
+
+def test_csv_import_runs_in_background_and_reports_row_errors(client):
+    u_admin = User.query.filter_by(email="import_admin@edu.com").first()
+    if not u_admin:
+        u_admin = User(email="import_admin@edu.com", role='admin')
+        db.session.add(u_admin)
+    u_admin.set_password('admin')
+    if not Course.query.filter_by(code="ICX").first():
+        db.session.add(Course(name="Import Course Extended", code="ICX"))
+    db.session.commit()
+    client.post('/auth/login', data={'email': 'import_admin@edu.com', 'password': 'admin', 'role': 'admin'})
+
+    tag = uuid.uuid4().hex[:8]
+    csv_data = "\n".join([
+        "name,email,password,enrollment_number,course_name,semester",
+        f"Ada Import,ada_{tag}@edu.com,pass123,IMP{tag}1,B.Tech,1",
+        f"Bob Import,bob_{tag}@edu.com,pass123,IMP{tag}2, import course extended ,3",  # course by name
+        f"Ada Again,ada_{tag}@edu.com,pass123,IMP{tag}3,B.Tech,1",   # duplicate email in file
+        f"No Password,nopw_{tag}@edu.com,,IMP{tag}4,B.Tech,1",        # missing field
+        "Existing,import_admin@edu.com,pass123,IMPEXISTING,B.Tech,1", # already registered
+    ])
+
+    resp = client.post('/admin/students/import',
+                       data={'file': (io.BytesIO(csv_data.encode()), 'students.csv')},
+                       content_type='multipart/form-data')
+    assert resp.status_code == 302
+    job_id = resp.headers['Location'].split('job=')[1]
+
+    deadline = time.time() + 60
+    while True:
+        job = client.get(f'/admin/students/import/status/{job_id}').get_json()
+        if job['status'] not in ('queued', 'running') or time.time() > deadline:
+            break
+        time.sleep(0.2)
+
+    assert job['status'] == 'done'
+    assert job['rows'] == 5
+    assert job['imported'] == 2
+    assert job['skipped'] == 3
+    assert sorted(err['line'] for err in job['errors']) == [4, 5, 6]
+
+    # Progress lives in the database, where every worker process can read it
+    db.session.expire_all()
+    assert db.session.get(ImportJob, job_id).imported == 2
+
+    # A running job whose worker stopped updating it is reported as failed
+    lost = ImportJob(id=uuid.uuid4().hex, status='running', errors=[], updated_at=datetime.now(timezone.utc) - timedelta(hours=1))
+    db.session.add(lost)
+    db.session.commit()
+    assert get_job(lost.id)['status'] == 'failed'
+
+    db.session.expire_all()
+    student = StudentProfile.query.filter_by(enrollment_number=f"IMP{tag}2").first()
+    assert student.display_name == "Bob Import"
+    assert student.semester == 3
+    assert student.course_name == "ICX"
+    assert student.user.check_password('pass123')
+
+    # The progress page polls the job once, from the page body
+    html = client.get(f'/admin/students/import?job={job_id}').get_data(as_text=True)
+    assert '<title>Import Students - EduPortal</title>' in html
+    assert html.count(f'/admin/students/import/status/{job_id}') == 1
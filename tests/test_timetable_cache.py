@@ -0,0 +1,64 @@
+import pytest
+from sqlalchemy import event
+from app import create_app, db
+from app.models import User, FacultyProfile, Subject, Timetable
+from app.services.cache import ResponseCache
+from app.services.timetable import cohort_timetable
+
+@pytest.fixture
+def client():
+    app = create_app()
+    app.config['TESTING'] = True
+    app.config['WTF_CSRF_ENABLED'] = False
+    with app.test_client() as client:
+        with app.app_context():
+            db.create_all()
+            yield client
+            db.session.remove()
+
+def test_cohort_timetable_cached_until_commit(client):
+    fu = User.query.filter_by(email="tt_cache_faculty@edu.com").first()
+    if not fu:
+        fu = User(email="tt_cache_faculty@edu.com", role='faculty')
+        fu.set_password('123')
+        db.session.add(fu)
+        db.session.flush()
+        db.session.add(FacultyProfile(user_id=fu.id, display_name="Cache Teacher", designation="Professor", department="CS"))
+        db.session.flush()
+    faculty = fu.faculty_profile
+    subject = Subject.query.filter_by(name="Cache Theory", course_name="TTC").first()
+    if not subject:
+        subject = Subject(name="Cache Theory", course_name="TTC", semester=1, faculty_id=faculty.id)
+        db.session.add(subject)
+        db.session.flush()
+    Timetable.query.filter_by(course_name="TTC", semester=1).delete()
+    db.session.add(Timetable(course_name="TTC", semester=1, day_of_week="Monday", period_number=2, subject_id=subject.id, faculty_id=faculty.id))
+    db.session.commit()
+
+    grid = cohort_timetable("TTC", 1)
+    assert [(s.day_of_week, s.period_number, s.subject.name) for s in grid.slots] == [("Monday", 2, "Cache Theory")]
+    assert grid.slots[0].start_time.strftime('%H:%M') == '10:00'
+
+    # Served from the cache: no queries on the second read
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(db.engine, 'before_cursor_execute', listener)
+    try:
+        assert cohort_timetable("TTC", 1) == grid
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', listener)
+    assert statements == []
+
+    # A committed Timetable write drops the cached grid
+    db.session.add(Timetable(course_name="TTC", semester=1, day_of_week="Tuesday", period_number=1, subject_id=subject.id, faculty_id=faculty.id))
+    db.session.commit()
+    assert len(cohort_timetable("TTC", 1).slots) == 2
+
+    # Another worker's write (its own in-memory cache, same VERSION file) reaches this worker too
+    other_worker = ResponseCache('TIMETABLE_CACHE')
+    other_worker.init_app(client.application)
+    with db.engine.begin() as conn:
+        conn.execute(Timetable.__table__.delete().where(Timetable.course_name == "TTC", Timetable.day_of_week == "Tuesday"))
+    assert len(cohort_timetable("TTC", 1).slots) == 2
+    other_worker.invalidate()
+    assert len(cohort_timetable("TTC", 1).slots) == 1